@@ -0,0 +1,62 @@
+import hashlib
+
+import pandas as pd
+
+# the dimensions every dashboard count is a roll-up of
+CUBE_DIMENSIONS = ['Day of Week', 'Time of Day', 'Nature', 'Side of Town', 'WMO Code']
+
+
+def dataset_version(df):
+    """Content fingerprint of a frame, used to key cached aggregates."""
+    digest = hashlib.sha1(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _ranked(counts):
+    # same ordering as value_counts: most frequent first
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+
+class IncidentCubes:
+    """Incident counts pre-aggregated once per dataset version.
+
+    The base cube holds one count per combination of CUBE_DIMENSIONS that occurs, so it
+    is bounded by the distinct combinations rather than the row count. The charts read
+    roll-ups of it (the weekday x hour heatmap, the Nature, Side of Town and WMO Code
+    counts) and the correlation matrix of the numeric columns, all computed here once.
+    """
+
+    def __init__(self, df, version=None):
+        self.version = version if version is not None else dataset_version(df)
+        self.rows = len(df)
+        dimensions = [column for column in CUBE_DIMENSIONS if column in df.columns]
+        if dimensions:
+            self.cube = df.groupby(dimensions, observed=True, dropna=False).size().rename('count')
+        else:
+            self.cube = pd.Series(dtype='int64', name='count')
+        self._heatmap = self._rollup(['Day of Week', 'Time of Day'])
+        if self._heatmap is not None:
+            self._heatmap = self._heatmap.unstack().fillna(0)
+        self._counts = {column: _ranked(self._rollup([column])) for column in dimensions}
+        self._correlation = df.select_dtypes(include='number').corr()
+
+    def _rollup(self, dimensions):
+        if not set(dimensions) <= set(self.cube.index.names):
+            return None
+        # missing keys are dropped here, the same way groupby and value_counts drop them
+        return self.cube.groupby(level=dimensions, observed=True).sum()
+
+    def heatmap(self):
+        """Incidents per Day of Week (rows) and Time of Day (columns)."""
+        return self._heatmap
+
+    def counts(self, column, values=None):
+        """Incident counts per value of column, most frequent first, optionally only for values."""
+        counts = self._counts[column]
+        if values is not None:
+            counts = counts[counts.index.isin(list(values))]
+        return counts.rename_axis(column).rename('count')
+
+    def correlation(self):
+        return self._correlation
@@ -1,196 +1,433 @@
 import argparse
-import urllib.request
+import contextlib
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import fitz  # PyMuPDF
-from datetime import datetime
+from datetime import datetime, date
 import math
-import requests
 import re
-import requests_cache
-from retry_requests import retry
-import openmeteo_requests
-
-#for Historical Weather api data.
-cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+import warnings
+from collections import Counter
+from downloader import PdfDownloader, pooled_session, stream_to_file
+from geocoding import DEFAULT_APPEND_INFO, GeocodeClient, GeocodeStore
+from ranking import FrequencyRanker
+from augmentation_ledger import ENRICHED_COLUMNS, AugmentationLedger
+from instrumentation import RunReport, stage
+from weather_archive import WEATHER_ARCHIVE_URL, WeatherArchive
+from export import EXPORT_FORMATS, export_incidents, export_summary, format_for_path
+
+# the http clients are built on first use (see get_weather_client / get_download_session),
+# importing this module for parsing alone shouldn't open the response cache or load requests_cache
+_clients = {}
+
+# bump whenever the extractor output changes so cached parses are thrown away
+PARSER_VERSION = 4
+
+INCIDENT_FIELDS = ['Date/Time', 'Incident Number', 'Location', 'Nature', 'Incident ORI']
+DATE_TIME_FORMAT = '%m/%d/%Y %H:%M'
+# Date/Time parsed once into datetime64, every time based feature reads this column
+TIMESTAMP_COLUMN = 'Timestamp'
+
+# compact in-memory dtypes for incident frames: repeated strings are dictionary encoded,
+# small numbers get small (nullable) integers and coordinates float32
+INCIDENT_SCHEMA = {
+    'Location': 'category',
+    'Nature': 'category',
+    'Incident ORI': 'category',
+    'Side of Town': 'category',
+    'Time of Day': 'Int8',
+    'Day of Week': 'Int8',
+    'Location Rank': 'Int32',
+    'Incident Rank': 'Int32',
+    'Latitude': 'Float32',
+    'Longitude': 'Float32',
+    'WMO Code': 'Int8',
+    'Link ID': 'Int32',
+}
+
+def apply_incident_schema(df, columns=None):
+    """Cast the incident columns of df (or just `columns`) to INCIDENT_SCHEMA, in place."""
+    for column in columns or INCIDENT_SCHEMA:
+        if column in df.columns and str(df[column].dtype) != INCIDENT_SCHEMA[column]:
+            if INCIDENT_SCHEMA[column] in ('Int8', 'Int32'):
+                # rounding guards against float noise like 2.9999999 before the cast
+                df[column] = pd.to_numeric(df[column], errors='coerce').round().astype(INCIDENT_SCHEMA[column])
+            else:
+                df[column] = df[column].astype(INCIDENT_SCHEMA[column])
+    return df
 
-def extract_incidents_from_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
-    all_text = ""
+def uses_incident_schema(df):
+    return 'Location' in df.columns and isinstance(df['Location'].dtype, pd.CategoricalDtype)
+
+def _keep_schema(df, *columns):
+    # stages only re-encode what they wrote, and only for frames that already use the schema
+    if uses_incident_schema(df):
+        apply_incident_schema(df, columns)
+
+def memory_report(df):
+    """Bytes used by every column of df (deep), with a total row."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage})
+    report.loc['Total'] = ['', int(usage.sum())]
+    report['bytes per row'] = (report['bytes'] / max(len(df), 1)).round(1)
+    return report
+
+def parse_incident_timestamps(date_strings):
+    """Parse 'm/d/yyyy h:mm' strings in one vectorized pass; values that don't match become NaT and are reported."""
+    timestamps = pd.to_datetime(date_strings, format=DATE_TIME_FORMAT, errors='coerce')
+    bad = timestamps.isna() & date_strings.notna() & (date_strings.astype(str).str.strip() != '')
+    if bad.any():
+        examples = ', '.join(repr(value) for value in date_strings[bad].unique()[:5])
+        warnings.warn(f"{int(bad.sum())} Date/Time value(s) do not match {DATE_TIME_FORMAT!r}: {examples}", stacklevel=2)
+    return timestamps
+
+def incident_timestamps(df):
+    """The parsed Date/Time of every row, parsing (and storing) it only if the frame doesn't have it yet."""
+    if TIMESTAMP_COLUMN not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[TIMESTAMP_COLUMN]):
+        df[TIMESTAMP_COLUMN] = parse_incident_timestamps(df['Date/Time'])
+    return df[TIMESTAMP_COLUMN]
+
+def _is_record_start(line):
+    # every record starts with its "m/d/yyyy h:mm" line
+    return '/' in line and ':' in line
+
+def iter_pdf_lines(doc):
+    """Yield the text lines of an open fitz document one page at a time."""
+    # a page might not end with a newline, so carry the unfinished piece over
+    # to the next page exactly like joining all the page texts would
+    carry = ""
     for page in doc:
-        all_text += page.get_text()
-    doc.close()
-
-    lines = all_text.split('\n')
-    data = {'Date/Time': [], 'Incident Number': [], 'Location': [], 'Nature': [], 'Incident ORI': []}
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if '/' in line and ':' in line:  
-            data['Date/Time'].append(line)
-            i += 1 
-            
-          
-            for field in ['Incident Number', 'Location', 'Nature', 'Incident ORI']:
-                # if field == 'Nature' and 'RAMP' in lines[i].upper():
-                #         data[field].append(lines[i+1].strip() if lines[i+1].strip() else "null")
-                if i < len(lines) and not ('/' in lines[i] and ':' in lines[i]):
-                    if(field=='Nature' and lines[i]=="RAMP"):
-                        data[field].append(lines[i+1].strip() if lines[i+1].strip() else "")
-                    else:
-                        data[field].append(lines[i].strip() if lines[i].strip() else "")
-                    i += 1
+        pieces = (carry + page.get_text()).split('\n')
+        carry = pieces.pop()
+        yield from pieces
+    yield carry
+
+def parse_incident_lines(lines):
+    """Turn a stream of report lines into incident records (dicts)."""
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        if not _is_record_start(line.strip()):
+            line = next(lines, None)
+            continue
+        record = {'Date/Time': line.strip()}
+        line = next(lines, None)
+        for field in INCIDENT_FIELDS[1:]:
+            if line is not None and not _is_record_start(line):
+                if field == 'Nature' and line == "RAMP":
+                    # location wrapped onto a "RAMP" line, the nature is the line after it
+                    line = next(lines, None)
+                    record[field] = line.strip() if line is not None else ""
+                    if line is not None:
+                        line = next(lines, None)
                 else:
-                   
-                    data[field].append("")
-        else:
-            # If the line doesn't match the expected start of a new record, increment 'i' to check the next line
-            i += 1
+                    record[field] = line.strip()
+                    line = next(lines, None)
+            else:
+                record[field] = ""
+        yield record
 
-    # Validate lengths of lists before creating DataFrame
-    if not all(len(lst) == len(data['Date/Time']) for lst in data.values()):
-        raise ValueError("Error: Mismatch in list lengths within the data dictionary.")
-    
-    if data['Date/Time']:  # Ensure there's at least one record
-        for key in data:
-            data[key].pop(-1)
-    return pd.DataFrame(data)
-
-def calculate_location_rank(df):
-    # Calculate frequency of each location
-    location_counts = df['Location'].value_counts().reset_index()
-    location_counts.columns = ['Location', 'Counts']
-    location_counts.sort_values('Counts', ascending=False, inplace=True)
-    # print(location_counts[['Location', 'Counts']])
-    # Making my open rank so that i can satisfy the condition in assignment2 doc
-    location_counts['Rank'] = 1  
-    rank = 1
-    for i in range(1, len(location_counts)):
-        if location_counts.at[i, 'Counts'] < location_counts.at[i-1, 'Counts']:
-            rank = i + 1  
-        location_counts.at[i, 'Rank'] = rank
-    
-    location_to_rank = pd.Series(location_counts.Rank.values,index=location_counts.Location).to_dict()
-   
-    df['Location Rank'] = df['Location'].map(location_to_rank)
+def iter_incidents_from_pdf(pdf_path):
+    """Yield incident records from a PDF as soon as each one is complete."""
+    doc = fitz.open(pdf_path)
+    try:
+        pending = None
+        for record in parse_incident_lines(iter_pdf_lines(doc)):
+            if pending is not None:
+                yield pending
+            pending = record
+        # the last "record" is the report footer, it is never yielded
+    finally:
+        doc.close()
+
+class IncidentBuffer:
+    """Columnar buffer that incident records are appended into."""
+
+    def __init__(self):
+        self.columns = {field: [] for field in INCIDENT_FIELDS}
+
+    def __len__(self):
+        return len(self.columns['Date/Time'])
+
+    def append(self, record):
+        for field in INCIDENT_FIELDS:
+            self.columns[field].append(record[field])
+
+    def to_frame(self):
+        df = pd.DataFrame(self.columns, columns=INCIDENT_FIELDS)
+        df[TIMESTAMP_COLUMN] = parse_incident_timestamps(df['Date/Time'])
+        return apply_incident_schema(df)
+
+def iter_incident_frames(pdf_path, chunk_size=500):
+    """Yield the incidents of a PDF as DataFrames of at most chunk_size rows."""
+    buffer = IncidentBuffer()
+    for record in iter_incidents_from_pdf(pdf_path):
+        buffer.append(record)
+        if len(buffer) >= chunk_size:
+            yield buffer.to_frame()
+            buffer = IncidentBuffer()
+    if len(buffer):
+        yield buffer.to_frame()
+
+def extract_incidents_from_pdf(pdf_path):
+    buffer = IncidentBuffer()
+    for record in iter_incidents_from_pdf(pdf_path):
+        buffer.append(record)
+    return buffer.to_frame()
+
+def _pdf_sort_key(pdf_path):
+    # daily reports are named YYYY-MM-DD_daily_incident_summary.pdf, undated files go last
+    match = re.search(r'(\d{4}-\d{2}-\d{2})', os.path.basename(pdf_path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return date.max
+
+def _parse_pdf_columns(pdf_path):
+    # runs inside a worker process: send back plain column lists, not a DataFrame,
+    # and never raise so one bad PDF can't take the whole batch down
+    try:
+        buffer = IncidentBuffer()
+        for record in iter_incidents_from_pdf(pdf_path):
+            buffer.append(record)
+        return pdf_path, buffer.columns, None
+    except Exception as e:
+        return pdf_path, None, f"{type(e).__name__}: {e}"
+
+def ingest_pdfs(pdf_paths, max_workers=None, cache=None):
+    """Parse many PDFs across a process pool and build one DataFrame, ordered by report date.
+
+    If a ParsedPdfCache is given, PDFs it already knows are read from it and only the
+    rest are parsed (and then stored). Returns (incidents_df, errors) where errors maps
+    each failed pdf path to its error message (a PDF that parsed but couldn't be cached
+    keeps its rows and is reported as "not cached, ...").
+    """
+    pdf_paths = sorted(pdf_paths, key=_pdf_sort_key)
+    frames = dict.fromkeys(pdf_paths)
+    errors = {}
+    keys = {}
+    if cache is not None:
+        for pdf_path in pdf_paths:
+            # hashing opens the file, a missing or unreadable one only fails itself
+            try:
+                keys[pdf_path] = cache.key_for(pdf_path)
+                frames[pdf_path] = cache.get(pdf_path, key=keys[pdf_path])
+            except Exception as e:
+                errors[pdf_path] = f"{type(e).__name__}: {e}"
+                del frames[pdf_path]
+    to_parse = [pdf_path for pdf_path in frames if frames[pdf_path] is None]
+
+    if max_workers is None:
+        max_workers = min(len(to_parse), os.cpu_count() or 1)
+    if max_workers <= 1 or len(to_parse) <= 1:
+        results = [_parse_pdf_columns(path) for path in to_parse]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_parse_pdf_columns, to_parse))
+
+    for pdf_path, pdf_columns, error in results:
+        if error is not None:
+            errors[pdf_path] = error
+            del frames[pdf_path]
+            continue
+        buffer = IncidentBuffer()
+        buffer.columns = pdf_columns
+        frames[pdf_path] = buffer.to_frame()
+        if cache is not None:
+            try:
+                cache.put(pdf_path, frames[pdf_path], key=keys[pdf_path])
+            except Exception as e:
+                # the rows are parsed fine and kept, only storing them failed
+                errors[pdf_path] = f"not cached, {type(e).__name__}: {e}"
+
+    # concatenate once at the end instead of growing a DataFrame per file
+    if not frames:
+        return IncidentBuffer().to_frame(), errors
+    # per-file categories differ, so encode the combined frame once more
+    return apply_incident_schema(pd.concat(frames.values(), ignore_index=True)), errors
+
+def calculate_location_rank(df, ranker=None):
+    # Rank locations by frequency, ties share the lowest rank like the assignment2 doc asks.
+    # With an IncidentRanker (e.g. the history store's) ranks come from its running counts
+    if ranker is not None:
+        df['Location Rank'] = ranker.ranks(df, 'Location')
+    else:
+        frequencies = FrequencyRanker()
+        frequencies.add(df['Location'])
+        df['Location Rank'] = frequencies.ranks_for(df['Location'])
+    _keep_schema(df, 'Location Rank')
     return df['Location Rank']
 
-def calculate_incident_rank(df): #done in almost same way as location rank is done 
-    # Calculate frequency of each incident nature
-    nature_counts = df['Nature'].value_counts().reset_index()
-    nature_counts.columns = ['Nature', 'Counts']
-    nature_counts.sort_values('Counts', ascending=False, inplace=True)
-    
-    nature_counts['Rank'] = 1  
-    rank = 1
-    for i in range(1, len(nature_counts)):
-        if nature_counts.at[i, 'Counts'] < nature_counts.at[i-1, 'Counts']:
-            rank = i + 1 
-        nature_counts.at[i, 'Rank'] = rank
-    
-    # Create a dictionary mapping natures to their ranks
-    nature_to_rank = pd.Series(nature_counts.Rank.values,index=nature_counts.Nature).to_dict()
-    # Use the dictionary to map each nature in the DataFrame to its rank
-    df['Incident Rank'] = df['Nature'].map(nature_to_rank)
+def calculate_incident_rank(df, ranker=None): #done in almost same way as location rank is done 
+    if ranker is not None:
+        df['Incident Rank'] = ranker.ranks(df, 'Nature')
+    else:
+        frequencies = FrequencyRanker()
+        frequencies.add(df['Nature'])
+        df['Incident Rank'] = frequencies.ranks_for(df['Nature'])
+    _keep_schema(df, 'Incident Rank')
     return df['Incident Rank']
 
 
-#for day of the week code 
-def get_day_of_week(date_str):
-    date_obj = datetime.strptime(date_str, "%m/%d/%Y %H:%M")
-    return (date_obj.weekday() + 1) % 7 + 1
+def _whole_numbers(values):
+    # plain int64 unless some timestamps were unparseable
+    return values.astype('int64') if values.notna().all() else values.astype('Int64')
 
 def calculate_day_of_week(df):
-    df['Day of Week'] = df['Date/Time'].apply(get_day_of_week)
+    # Sunday is 1, Saturday is 7
+    df['Day of Week'] = _whole_numbers((incident_timestamps(df).dt.dayofweek + 1) % 7 + 1)
+    _keep_schema(df, 'Day of Week')
     return df['Day of Week'].reset_index(drop=True)
 
 
 #code for calculating time of day 
-def get_time_of_day(date_str):
-    # Parse the date string into a datetime object using the correct format
-    date_obj = datetime.strptime(date_str, "%m/%d/%Y %H:%M")
-    # Extract and return the hour component
-    return date_obj.hour
-    
 def calculate_time_of_day(df):
-    df['Time of Day'] = df['Date/Time'].apply(get_time_of_day)
+    df['Time of Day'] = _whole_numbers(incident_timestamps(df).dt.hour)
+    _keep_schema(df, 'Time of Day')
     return df
 
 
 def extract_nature_column(df):
     return df['Nature']
 
-def calculate_emsstat(df):
-    #EMsstat col creat
-    df['EMSSTAT'] = False
-    # Iterate over the DataFrame to mark direct EMSSTAT occurrences
-    for i in range(len(df)):
-        if df.loc[i, 'Incident ORI'] == 'EMSSTAT':
-            df.loc[i, 'EMSSTAT'] = True
-    
-    # Identify groups by 'Date/Time' and 'Location' that contain any EMSSTAT and mark all records in those groups
-    emsstat_groups = df[df['EMSSTAT'] == True].groupby(['Date/Time', 'Location']).groups #got every of them and then mark as true
-    for (date_time, location), indexes in emsstat_groups.items():
-        df.loc[df[(df['Date/Time'] == date_time) & (df['Location'] == location)].index, 'EMSSTAT'] = True
+def calculate_emsstat(df, window=None):
+    """Mark EMSSTAT records and every record that shares their Date/Time and Location.
 
+    With a window (e.g. pd.Timedelta(minutes=1)) records at the same Location within that
+    much time of an EMSSTAT record are marked as well.
+    """
+    is_ems = (df['Incident ORI'] == 'EMSSTAT').fillna(False).astype(bool)
+    if window is None:
+        # one groupby pass instead of a boolean scan of the frame per EMSSTAT group
+        linked = is_ems.groupby([df['Date/Time'], df['Location']], sort=False, observed=True).transform('any')
+    else:
+        linked = _near_emsstat(df, is_ems, pd.Timedelta(window))
+    df['EMSSTAT'] = is_ems | linked.fillna(False).astype(bool)
     return df['EMSSTAT']
 
-geocode_cache = {}
-def geocode_address_google(address, api_key, append_info="Norman, OK"):
-    #if we already have lang and lat just use them and not hit api for it.
-    if address in geocode_cache:
-        return geocode_cache[address]
-    if ';' in address:
-        try:
-            lat_str, lon_str = address.split(';')
-            lat, lon = float(lat_str), float(lon_str)
-            geocode_cache[address] = (lat, lon)
-            return float(lat_str), float(lon_str)
-        except ValueError:
-            # print(f"Invalid coordinate format for address: {address}")
-            return None, None
-
-    full_address = f"{address}, {append_info}"
-    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {"address": full_address, "key": api_key}
-    response = requests.get(base_url, params=params)
-    #if works then it will go here to give long and latitude
-    if response.status_code == 200:
-        data = response.json()
-        if data["status"] == "OK":
-            lat = data["results"][0]["geometry"]["location"]["lat"]
-            lon = data["results"][0]["geometry"]["location"]["lng"]
-            geocode_cache[address] = (lat, lon)
-            return lat, lon
+def _near_emsstat(df, is_ems, window):
+    # nearest EMSSTAT record at the same location, found with one as-of join
+    records = pd.DataFrame({'time': incident_timestamps(df), 'Location': df['Location'],
+                            'row': np.arange(len(df))}).dropna(subset=['time', 'Location'])
+    records = records.sort_values('time')
+    ems = records[is_ems.to_numpy()[records['row'].to_numpy()]]
+    ems = ems[['time', 'Location']].assign(ems_time=ems['time'])
+    matched = pd.merge_asof(records, ems, on='time', by='Location', direction='nearest', tolerance=window)
+    linked = np.zeros(len(df), dtype=bool)
+    linked[matched.loc[matched['ems_time'].notna(), 'row'].to_numpy()] = True
+    return pd.Series(linked, index=df.index)
+
+def link_incidents(df, window=pd.Timedelta(minutes=1), by='Location'):
+    """Give records at the same `by` value that follow each other within `window` a shared 'Link ID'.
+
+    This catches co-responses such as police and EMS logging the same call a minute apart.
+    Records without a time or location get no link id.
+    """
+    records = pd.DataFrame({'time': incident_timestamps(df), 'key': df[by], 'row': np.arange(len(df))})
+    records = records.dropna(subset=['time', 'key']).sort_values(['key', 'time'], kind='stable')
+    new_key = records['key'].ne(records['key'].shift())
+    gap = records['time'].diff() > pd.Timedelta(window)
+    link_ids = (new_key | gap).cumsum().to_numpy() - 1
+    result = np.full(len(df), -1, dtype=np.int64)
+    result[records['row'].to_numpy()] = link_ids
+    df['Link ID'] = pd.Series(result, index=df.index).replace(-1, pd.NA).astype('Int64')
+    _keep_schema(df, 'Link ID')
+    return df['Link ID']
+
+# geocodes are kept on disk so they survive CLI runs and Streamlit restarts
+GEOCODE_DB = os.environ.get('NORMAN_GEOCODE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.geocode.sqlite'))
+_geocode_store = None
+_geocode_clients = {}
+# requests sent to the external APIs by this process, read by the run report
+api_calls = Counter()
+
+def get_geocode_store():
+    global _geocode_store
+    if _geocode_store is None:
+        _geocode_store = GeocodeStore(GEOCODE_DB)
+    return _geocode_store
+
+def get_geocode_client(api_key, append_info=DEFAULT_APPEND_INFO):
+    # one client per key and address suffix for the life of the process, the clients
+    # of one key share its connection pool and rate limit
+    if (api_key, append_info) not in _geocode_clients:
+        shared = next((client for (key, _), client in _geocode_clients.items() if key == api_key), None)
+        if shared is None:
+            client = GeocodeClient(api_key, append_info=append_info)
         else:
-            #otherwise will return NONE in both the cases
-            return None, None
-    else:
-        # print(f"HTTP error: {response.status_code} for address {address}")
+            client = GeocodeClient(api_key, append_info=append_info, max_workers=shared.max_workers,
+                                   session=shared.session, limiter=shared.limiter)
+        _geocode_clients[(api_key, append_info)] = client
+    return _geocode_clients[(api_key, append_info)]
+
+def _parse_coordinates(address):
+    # some locations are already "lat;lon", no need to hit the api for those
+    try:
+        lat_str, lon_str = address.split(';')
+        return float(lat_str), float(lon_str)
+    except ValueError:
         return None, None
 
-def ensure_geocoding(df, api_key):
-    if 'Latitude' not in df.columns:
-        #store in df for further use
-        df['Latitude'] = pd.Series([None]*len(df), index=df.index)
-    if 'Longitude' not in df.columns:
-        #store in df for further use
-        df['Longitude'] = pd.Series([None]*len(df), index=df.index)
-
-    for index, row in df.iterrows():
-        # Now safely check if Latitude or Longitude needs to be geocoded
-        if pd.isnull(row['Latitude']) or pd.isnull(row['Longitude']):
-            lat, lon = geocode_address_google(row['Location'], api_key)
-            if lat is not None and lon is not None:
-                df.at[index, 'Latitude'] = lat
-                df.at[index, 'Longitude'] = lon
-            else:
-                # Explicitly set to None if geocoding fails
-                df.at[index, 'Latitude'] = None
-                df.at[index, 'Longitude'] = None
+def geocode_address_google(address, api_key, append_info=DEFAULT_APPEND_INFO, store=None):
+    if ';' in address:
+        return _parse_coordinates(address)
+    if store is None:
+        store = get_geocode_store()
+    # the default suffix keeps the bare address as key, the same entries ensure_geocoding uses
+    key = address if append_info == DEFAULT_APPEND_INFO else f"{address}, {append_info}"
+    cached = store.get(key)
+    if cached is not None:
+        return cached
+    client = get_geocode_client(api_key, append_info)
+    lat, lon, found = client.geocode(address)
+    # failed lookups (http errors, quota) are not the address's fault, don't remember them
+    if found is not None:
+        store.put(key, lat, lon)
+    return lat, lon
+
+def ensure_geocoding(df, api_key, store=None, client=None, progress_callback=None):
+    """Fill missing Latitude/Longitude, geocoding each distinct Location only once.
+
+    New addresses are looked up concurrently by a GeocodeClient; progress_callback(done, total)
+    is called as they finish.
+    """
+    for column in ('Latitude', 'Longitude'):
+        if column not in df.columns:
+            df[column] = np.nan
+        else:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+
+    missing = df['Latitude'].isna() | df['Longitude'].isna()
+    if not missing.any():
+        _keep_schema(df, 'Latitude', 'Longitude')
+        return df
+    # the store and client are only opened when something needs geocoding
+    if store is None:
+        store = get_geocode_store()
+    if client is None:
+        client = get_geocode_client(api_key)
+    addresses = df.loc[missing, 'Location'].dropna().unique()
+    coords = {address: _parse_coordinates(address) for address in addresses if ';' in address}
+    to_lookup = [address for address in addresses if address not in coords]
+    coords.update(store.get_many(to_lookup))
+
+    new_addresses = [address for address in to_lookup if address not in coords]
+    requests_before = client.requests_made
+    fetched = client.geocode_many(new_addresses, progress_callback=progress_callback)
+    api_calls['geocode'] += client.requests_made - requests_before
+    coords.update({address: (lat, lon) for address, (lat, lon, _) in fetched.items()})
+    store.put_many({address: (lat, lon) for address, (lat, lon, found) in fetched.items() if found is not None})
+
+    # join the per-address results back onto every row that needed them
+    locations = df.loc[missing, 'Location']
+    df.loc[missing, 'Latitude'] = locations.map({a: c[0] for a, c in coords.items()}).astype(float)
+    df.loc[missing, 'Longitude'] = locations.map({a: c[1] for a, c in coords.items()}).astype(float)
+    _keep_schema(df, 'Latitude', 'Longitude')
     return df
 
 def calculate_compass_bearing(start_point, end_point):
@@ -240,80 +477,223 @@ def determine_side_of_town(lat, lon):
     else:
         return "Could not determine side of town"
 
-def side_of_town(df):
-    for index, row in df.iterrows():
-        lat = row['Latitude']
-        lon = row['Longitude']
-        location = row.get('Location', '')  
-
-       
-        if pd.notna(lat) and pd.notna(lon):
-            side = determine_side_of_town(lat, lon)
-            # If no valid side found from lat/lon, try to get it from location
-            if side is None or side == "":
-                cardinal_direction = extract_cardinal_direction(location)
-                if cardinal_direction:
-                    # If we got a cardinal direction, use it
-                    df.at[index, 'Side of Town'] = cardinal_direction
-                else:
-                    
-                    df.at[index, 'Side of Town'] = "Could not determine"
-            else:
-                # Valid side found, assign it
-                df.at[index, 'Side of Town'] = side
-        else:
-           
-            cardinal_direction = extract_cardinal_direction(location)
-            if cardinal_direction:
-                df.at[index, 'Side of Town'] = cardinal_direction
-            else:
-                # If everything fails, we can't determine the side of town
-                df.at[index, 'Side of Town'] = "Could not determine"
-    
+TOWN_CENTER = (35.220833, -97.443611)
+CARDINAL_PATTERN = r'\b(N|S|E|W|NW|NE|SW|SE)\b'
+SIDE_UNKNOWN = "Could not determine"
+
+def compass_bearings(lat, lon, center=TOWN_CENTER):
+    """Bearing in degrees from center to every (lat, lon) pair, computed on whole arrays."""
+    lat1 = np.radians(center[0])
+    lat2 = np.radians(np.asarray(lat, dtype=float))
+    longitude_difference = np.radians(np.asarray(lon, dtype=float) - center[1])
+    x = np.sin(longitude_difference) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(longitude_difference)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+def compass_sector_labels(sectors=8):
+    """Names of the compass sectors clockwise from north, for 4, 8 or 16 sectors."""
+    labels = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+    if sectors not in (4, 8, 16):
+        raise ValueError(f"sectors must be 4, 8 or 16, got {sectors}")
+    return labels[::16 // sectors]
+
+def bearings_to_sides(bearings, sectors=8):
+    # each sector is centred on its direction, so north covers the last and first half sector
+    width = 360 / sectors
+    index = np.floor(((np.asarray(bearings) + width / 2) % 360) / width).astype(np.int64)
+    return np.asarray(compass_sector_labels(sectors), dtype=object)[index]
+
+def side_of_town(df, center=TOWN_CENTER, sectors=8):
+    """Set df['Side of Town'] from the bearing to each incident, or a direction in its Location."""
+    lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+    lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+    located = ~(np.isnan(lat) | np.isnan(lon))
+
+    sides = np.full(len(df), SIDE_UNKNOWN, dtype=object)
+    sides[located] = bearings_to_sides(compass_bearings(lat[located], lon[located], center), sectors)
+    if 'Location' in df.columns and not located.all():
+        # no coordinates: fall back to a direction written in the address ("24TH AVE NW")
+        fallback = df['Location'][~located].astype(str).str.extract(CARDINAL_PATTERN, expand=False)
+        sides[~located] = fallback.fillna(SIDE_UNKNOWN).to_numpy(dtype=object)
+    df['Side of Town'] = sides
+    _keep_schema(df, 'Side of Town')
     return df
 
-def fetch_weather_code_for_df(df):
-    for index, row in df.iterrows():
-       
-        datetime_obj = pd.to_datetime(row['Date/Time'], format='%m/%d/%Y %H:%M')
-
-        # Convert datetime object to date string in ISO format for the API request
-        start_date = datetime_obj.date().isoformat()
-       
+# hourly weather codes already downloaded, per grid cell (see weather_archive.py)
+WEATHER_ARCHIVE_DIR = os.environ.get('NORMAN_WEATHER_ARCHIVE',
+                                     os.path.join(os.path.dirname(os.path.abspath(__file__)), '.weather_archive'))
+_weather_archive = None
+
+def get_weather_archive():
+    global _weather_archive
+    if _weather_archive is None:
+        _weather_archive = WeatherArchive(WEATHER_ARCHIVE_DIR)
+    return _weather_archive
+
+def get_weather_client():
+    """Open-Meteo client on a cached, retrying session (historical weather never changes)."""
+    if 'openmeteo' not in _clients:
+        import openmeteo_requests
+        import requests_cache
+        from retry_requests import retry
+        cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
+        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+        _clients['cache_session'] = cache_session
+        _clients['openmeteo'] = openmeteo_requests.Client(session=retry_session)
+    return _clients['openmeteo']
+
+def get_download_session():
+    # one pooled session for every PDF download instead of a fresh connection per URL
+    if 'download_session' not in _clients:
+        _clients['download_session'] = pooled_session()
+    return _clients['download_session']
+
+def __getattr__(name):
+    # the old module level clients, still reachable as assignment2.openmeteo etc.
+    if name in ('openmeteo', 'cache_session'):
+        get_weather_client()
+        return _clients[name]
+    if name == 'download_session':
+        return get_download_session()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _fetch_weather_code_per_row(df, client):
+    # one request per row, the date and hour come from the parsed Timestamp
+    when = incident_timestamps(df)
+    codes = pd.Series(np.nan, index=df.index)
+    for index in df.index[when.notna() & df['Latitude'].notna() & df['Longitude'].notna()]:
+        start_date = when[index].date().isoformat()
         params = {
-            "latitude": row['Latitude'],
-            "longitude": row['Longitude'],
+            "latitude": df.at[index, 'Latitude'],
+            "longitude": df.at[index, 'Longitude'],
             "start_date": start_date,
-            "end_date": start_date, 
+            "end_date": start_date,
             "hourly": ["weather_code"]
         }
 
         # Use the Open-Meteo API client to retrieve weather data
-        responses = openmeteo.weather_api("https://archive-api.open-meteo.com/v1/archive", params=params)
-
+        responses = client.weather_api(WEATHER_ARCHIVE_URL, params=params)
+        api_calls['weather'] += 1
 
         if responses:
-            response = responses[0]
-            hourly_weather_code = response.Hourly().Variables(0).ValuesAsNumpy()
+            hourly_weather_code = responses[0].Hourly().Variables(0).ValuesAsNumpy()
+            if len(hourly_weather_code) > when[index].hour:
+                codes[index] = hourly_weather_code[when[index].hour]
 
-            # Example to extract a single weather code, adjust as needed
-            time_of_day = int(row['Time of Day'])
-            if len(hourly_weather_code) > 0:
-                df.at[index, 'WMO Code'] = hourly_weather_code[time_of_day]
-            else:
-                df.at[index, 'WMO Code'] = None
-        else:
-            df.at[index, 'WMO Code'] = None
+    df['WMO Code'] = codes
+    _keep_schema(df, 'WMO Code')
+    return df['WMO Code']
 
+def _plan_weather_runs(cells, max_gap_days, max_span_days):
+    # cells: unique (cell_lat, cell_lon, day) rows sorted by cell then day.
+    # consecutive days of one cell are merged into a run unless the gap or span gets too big
+    run_ids = []
+    runs = []  # [cell_lat, cell_lon, start_day, end_day]
+    for cell_lat, cell_lon, day in cells.itertuples(index=False):
+        if runs:
+            last = runs[-1]
+            same_cell = (last[0], last[1]) == (cell_lat, cell_lon)
+            if (same_cell and (day - last[3]).days <= max_gap_days
+                    and (day - last[2]).days < max_span_days):
+                last[3] = day
+                run_ids.append(len(runs) - 1)
+                continue
+        runs.append([cell_lat, cell_lon, day, day])
+        run_ids.append(len(runs) - 1)
+    return run_ids, runs
+
+def _fetch_weather_code_batched(df, client, cell_size, max_locations, max_gap_days, max_span_days):
+    codes = np.full(len(df), np.nan)
+    lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+    lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+    when = incident_timestamps(df)
+    hour = when.dt.hour.to_numpy(dtype=float, na_value=np.nan)
+    usable = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(hour)) & when.notna().to_numpy()
+    if not usable.any():
+        # nothing geocoded (or timed), nothing to ask for
+        return codes
+
+    # snap every incident to a grid cell, rows in the same cell share one weather series
+    work = pd.DataFrame({
+        'cell_lat': np.round(lat[usable] / cell_size).astype(np.int64),
+        'cell_lon': np.round(lon[usable] / cell_size).astype(np.int64),
+        'day': when[usable].dt.normalize().to_numpy(),
+    })
+    cells = work.drop_duplicates().sort_values(['cell_lat', 'cell_lon', 'day'])
+    run_ids, runs = _plan_weather_runs(cells, max_gap_days, max_span_days)
+    cells['run'] = run_ids
+    work = work.merge(cells, on=['cell_lat', 'cell_lon', 'day'], how='left')
+
+    # one request per (day range, up to max_locations cells)
+    by_range = {}
+    for run_id, (cell_lat, cell_lon, start_day, end_day) in enumerate(runs):
+        by_range.setdefault((start_day, end_day), []).append(run_id)
+    run_values = {}
+    for (start_day, end_day), range_runs in by_range.items():
+        for i in range(0, len(range_runs), max_locations):
+            batch = range_runs[i:i + max_locations]
+            params = {
+                "latitude": [round(runs[r][0] * cell_size, 6) for r in batch],
+                "longitude": [round(runs[r][1] * cell_size, 6) for r in batch],
+                "start_date": start_day.date().isoformat(),
+                "end_date": end_day.date().isoformat(),
+                "hourly": ["weather_code"]
+            }
+            responses = client.weather_api(WEATHER_ARCHIVE_URL, params=params)
+            api_calls['weather'] += 1
+            for run_id, response in zip(batch, responses or []):
+                run_values[run_id] = response.Hourly().Variables(0).ValuesAsNumpy()
+
+    # pick each row's hour out of its run's series with one index per run
+    positions = np.flatnonzero(usable)
+    run_start = np.array([run[2] for run in runs], dtype='datetime64[D]')
+    run_of_row = work['run'].to_numpy(dtype=np.int64)
+    days_in = (work['day'].to_numpy().astype('datetime64[D]') - run_start[run_of_row]).astype(np.int64)
+    offsets = days_in * 24 + hour[usable].astype(np.int64)
+    for run_id, idx in work.groupby('run').indices.items():
+        values = run_values.get(run_id)
+        if values is None:
+            continue
+        run_offsets = offsets[idx]
+        inside = (run_offsets >= 0) & (run_offsets < len(values))
+        codes[positions[idx[inside]]] = values[run_offsets[inside]]
+    return codes
+
+def fetch_weather_code_for_df(df, batched=True, client=None, cell_size=0.05, max_locations=50,
+                              max_gap_days=3, max_span_days=92, archive=None):
+    """Fill df['WMO Code'] with the hourly weather code at each incident's place and hour.
+
+    The batched mode snaps incidents to cell_size degree cells, merges the days of each
+    cell into date ranges and asks Open-Meteo for up to max_locations cells per request,
+    so the number of calls follows the unique (cell, date range) pairs instead of rows.
+    batched=False keeps the old one-request-per-row lookup. With a WeatherArchive only
+    days it doesn't hold yet are downloaded (into the archive) and the codes are joined
+    from there.
+    """
+    if client is None:
+        client = get_weather_client()
+    if archive is not None:
+        incident_timestamps(df)
+        requests_before = archive.requests_made
+        archive.fill_for(df, client)
+        api_calls['weather'] += archive.requests_made - requests_before
+        df['WMO Code'] = archive.lookup(df).astype(float)
+        _keep_schema(df, 'WMO Code')
+        return df['WMO Code']
+    if not batched:
+        return _fetch_weather_code_per_row(df, client)
+    df['WMO Code'] = _fetch_weather_code_batched(df, client, cell_size, max_locations,
+                                                 max_gap_days, max_span_days)
+    _keep_schema(df, 'WMO Code')
     return df['WMO Code']
 
-def download_pdf(url, save_path='/tmp/incident_report.pdf'):
-    headers = {'User-Agent': "Mozilla/5.0"}
-    request = urllib.request.Request(url, headers=headers)
-    response = urllib.request.urlopen(request)
-    data = response.read()
-    with open(save_path, 'wb') as file:
-        file.write(data)
+def download_pdf(url, save_path=None):
+    # default to the URL's own file name so parallel downloads don't overwrite each other
+    if save_path is None:
+        save_path = os.path.join(tempfile.gettempdir(), url.split('/')[-1])
+    with get_download_session().get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        stream_to_file(response, save_path)
     return save_path
 
 def read_urls_from_file(filename):
@@ -321,55 +701,178 @@ def read_urls_from_file(filename):
     with open(filename, 'r') as file:
         urls = file.read().splitlines()
     return urls
-def create_augmented_dataframe(all_incidents_df):
+def create_augmented_dataframe(all_incidents_df, report=None, weather_archive=None):
     # augmented_df = pd.DataFrame()
     
     
-    calculate_day_of_week(all_incidents_df)
+    with stage(report, 'day of week', all_incidents_df):
+        calculate_day_of_week(all_incidents_df)
     # augmented_df['Time of Day'] = all_incidents_df['Time of Day'].copy()
-    fetch_weather_code_for_df(all_incidents_df)
-    all_incidents_df['Location Rank'] = calculate_location_rank(all_incidents_df)
+    with stage(report, 'weather', all_incidents_df):
+        fetch_weather_code_for_df(all_incidents_df, archive=weather_archive)
+    with stage(report, 'location rank', all_incidents_df):
+        all_incidents_df['Location Rank'] = calculate_location_rank(all_incidents_df)
     # augmented_df['Side of Town']=all_incidents_df['Side of Town'].copy()
-    all_incidents_df['Incident Rank'] = calculate_incident_rank(all_incidents_df)
+    with stage(report, 'incident rank', all_incidents_df):
+        all_incidents_df['Incident Rank'] = calculate_incident_rank(all_incidents_df)
     # augmented_df['Location'] = all_incidents_df['Location'].copy()
     # augmented_df['Nature'] = all_incidents_df['Nature'].copy()
-    all_incidents_df['EMSSTAT'] = calculate_emsstat(all_incidents_df)
+    with stage(report, 'emsstat', all_incidents_df):
+        all_incidents_df['EMSSTAT'] = calculate_emsstat(all_incidents_df)
+    return all_incidents_df
+
+def _enrich_rows(df, api_key, progress_callback=None, weather_client=None, report=None, weather_archive=None,
+                 geocode_store=None):
+    # the per-incident stages: geocoding, side of town, time features and weather
+    with stage(report, 'geocoding', df):
+        ensure_geocoding(df, api_key, store=geocode_store, progress_callback=progress_callback)
+    with stage(report, 'side of town', df):
+        side_of_town(df)
+    with stage(report, 'time features', df):
+        calculate_time_of_day(df)
+        calculate_day_of_week(df)
+    with stage(report, 'weather', df):
+        fetch_weather_code_for_df(df, client=weather_client, archive=weather_archive)
+    return df
 
-    # return all_incidents_df
-def main(urls_filename):
+def augment_incidents(df, api_key, ledger=None, progress_callback=None, weather_client=None, report=None,
+                      weather_archive=None, ranker=None, geocode_store=None):
+    """Run every augmentation stage on df and return it.
+
+    With an AugmentationLedger only incidents that were never enriched (or whose inputs
+    changed since) are geocoded and looked up, the rest is merged back from the ledger.
+    Ranks and EMSSTAT depend on the whole frame, so they are always recomputed. Pass a
+    RunReport to get the time, rows and API calls of every stage, a WeatherArchive to
+    join weather from local storage, and an IncidentRanker to take ranks from its
+    running counts instead of counting df. geocode_store defaults to the shared
+    on-disk GeocodeStore.
+    """
+    if ledger is None:
+        _enrich_rows(df, api_key, progress_callback, weather_client, report, weather_archive, geocode_store)
+    else:
+        with stage(report, 'ledger lookup', df) as record:
+            known, stored = ledger.lookup(df)
+            new_rows = df[~known.to_numpy()].copy()
+            record['rows_out'] = len(new_rows)
+        if not new_rows.empty:
+            _enrich_rows(new_rows, api_key, progress_callback, weather_client, report, weather_archive,
+                         geocode_store)
+            with stage(report, 'ledger record', new_rows):
+                ledger.record(new_rows)
+        ledger.reused, ledger.computed = len(stored), len(new_rows)
+        parts = [part for part in (stored, new_rows.reindex(columns=ENRICHED_COLUMNS)) if not part.empty]
+        enriched = pd.concat(parts) if parts else stored
+        enriched = enriched.reindex(df.index)
+        for column in ENRICHED_COLUMNS:
+            values = enriched[column]
+            if column in ('Time of Day', 'Day of Week'):
+                values = _whole_numbers(values.astype('Float64'))
+            elif column in ('Latitude', 'Longitude', 'WMO Code'):
+                values = values.astype(float)
+            df[column] = values
+        _keep_schema(df, *ENRICHED_COLUMNS)
+    with stage(report, 'ranks', df):
+        calculate_location_rank(df, ranker)
+        calculate_incident_rank(df, ranker)
+    with stage(report, 'emsstat', df):
+        calculate_emsstat(df)
+    return df
+
+def pipeline_counters(cache=None):
+    """Running totals a RunReport tracks per stage: API calls and cache hits/misses."""
+    counters = {
+        'geocode_api_calls': lambda: api_calls['geocode'],
+        'weather_api_calls': lambda: api_calls['weather'],
+        'geocode_cache_hits': lambda: get_geocode_store().hits + get_geocode_store().negative_hits,
+        'geocode_cache_misses': lambda: get_geocode_store().misses,
+    }
+    if cache is not None:
+        counters['pdf_cache_hits'] = lambda: cache.hits
+        counters['pdf_cache_misses'] = lambda: cache.misses
+    return counters
+
+# downloaded reports plus their ETags and known missing days, shared with the app's cache
+# directory so a run only fetches what changed since the last one
+DOWNLOAD_DIR = os.environ.get('NORMAN_DOWNLOAD_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
+def main(urls_filename, workers=None, download_dir=None, temp_downloads=False, ledger_path=None, report_path=None, profile_dir=None,
+         output_path='./ans.csv', output_format=None, columns=None, chunk_rows=100_000, print_mode='summary'):
     api_key = "Your API key"
     """Process incident data from multiple PDF URLs listed in a given file."""
     if not os.path.exists('resources'):
         os.makedirs('resources')
     # Read URLs from the provided file
     urls = read_urls_from_file(urls_filename)
-
-    # Initialize an empty DataFrame for collecting data from all PDFs
-    all_incidents_df = pd.DataFrame()
-
-    for url in urls:
-        pdf_path = download_pdf(url)
-        incidents_df = extract_incidents_from_pdf(pdf_path)
-        
-        # Append the data from this PDF to the collective DataFrame
-        all_incidents_df = pd.concat([all_incidents_df, incidents_df], ignore_index=True)
-        
-    all_incidents_df = ensure_geocoding(all_incidents_df, api_key)    
-    all_incidents_df = side_of_town(all_incidents_df)
-    all_incidents_df = calculate_time_of_day(all_incidents_df)
-    # print(all_incidents_df)
-    ans_df=create_augmented_dataframe(all_incidents_df)
-    file_path = './ans.csv'
-    ans_df.to_csv(file_path, sep='\t', index=False)
-    pd.set_option('display.max_rows', None)
-    print(ans_df)
+    report = RunReport(pipeline_counters(), profile_dir=profile_dir)
+
+    # --temp-downloads throws the files away after the run, and with them what the downloader learned
+    downloads = (tempfile.TemporaryDirectory() if temp_downloads
+                 else contextlib.nullcontext(download_dir or DOWNLOAD_DIR))
+    with downloads as dest_dir:
+        # every report gets its own file so they can all be downloaded and parsed side by side,
+        # reports that haven't changed since the last run aren't fetched again
+        downloader = PdfDownloader(dest_dir)
+        pdf_paths = []
+        with stage(report, 'download') as record:
+            results = downloader.fetch_all(urls)
+            record['rows_out'] = sum(result.path is not None for result in results)
+        for result in results:
+            if result.path is not None:
+                pdf_paths.append(result.path)
+            elif result.status == 'missing':
+                print(f"No report at {result.url}")
+            else:
+                print(f"Failed to download {result.url}: {result.error}")
+        with stage(report, 'extract') as record:
+            all_incidents_df, errors = ingest_pdfs(pdf_paths, max_workers=workers)
+            record['rows_in'], record['rows_out'] = len(pdf_paths), len(all_incidents_df)
+    for pdf_path, error in errors.items():
+        print(f"Failed to process {os.path.basename(pdf_path)}: {error}")
+
+    # with --ledger, incidents enriched by an earlier run are not geocoded or looked up again
+    ledger = AugmentationLedger(ledger_path) if ledger_path else None
+    with stage(report, 'augment', all_incidents_df):
+        # weather comes from the local archive, only days it hasn't seen are downloaded
+        ans_df = augment_incidents(all_incidents_df, api_key, ledger=ledger, report=report,
+                                   weather_archive=get_weather_archive())
+    geocode_stats = get_geocode_store().stats()
+    print(f"Geocoding: {geocode_stats['hits']} cached, {geocode_stats['negative_hits']} known unknown, "
+          f"{geocode_stats['misses']} looked up")
+    if ledger is not None:
+        print(f"Augmentation: {ledger.computed} incidents enriched, {ledger.reused} reused from the ledger")
+    output_format = output_format or format_for_path(output_path)
+    with stage(report, 'export', ans_df):
+        export_incidents(ans_df, output_path, fmt=output_format, columns=columns, chunk_rows=chunk_rows)
+    print(f"Wrote {len(ans_df)} incidents to {output_path} ({output_format})")
+    print(report.to_frame().to_string())
+    if report_path:
+        print(f"Run report written to {report.write_json(report_path)}")
+    # formatting every row as text costs more than the run itself on big inputs, --print all to get it anyway
+    if print_mode == 'summary':
+        print(export_summary(ans_df))
+    elif print_mode == 'all':
+        pd.set_option('display.max_rows', None)
+        print(ans_df)
     
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Process incident data from PDF URLs listed in a file.")
     parser.add_argument("--urls", type=str, required=True, help="Filename containing the list of PDF URLs.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes used to parse PDFs (default: one per CPU).")
+    parser.add_argument("--download-dir", type=str, default=None, help="Keep downloaded PDFs here and only re-fetch the ones that changed (default: ./cache).")
+    parser.add_argument("--temp-downloads", action="store_true", help="Download into a temporary directory that is removed after the run.")
+    parser.add_argument("--ledger", type=str, default=None, help="SQLite augmentation ledger, only incidents not in it are enriched.")
+    parser.add_argument("--report", type=str, default=None, help="Write a JSON report with the time, rows and API calls of every stage.")
+    parser.add_argument("--profile-dir", type=str, default=None, help="Dump a cProfile file per stage into this directory.")
+    parser.add_argument("--output", type=str, default="./ans.csv", help="Output file (default: ./ans.csv, tab separated).")
+    parser.add_argument("--format", type=str, choices=EXPORT_FORMATS, default=None, help="Output format (default: from the --output extension, else tsv).")
+    parser.add_argument("--columns", type=str, choices=['all', 'assignment'], default='all', help="Write every column or only the assignment's output columns.")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows converted and written per chunk.")
+    parser.add_argument("--print", dest="print_mode", type=str, choices=['summary', 'all', 'none'], default='summary', help="Print a summary of the output, every row, or nothing.")
     
     args = parser.parse_args()
     
-    main(args.urls)
+    main(args.urls, workers=args.workers, download_dir=args.download_dir, temp_downloads=args.temp_downloads, ledger_path=args.ledger,
+         report_path=args.report, profile_dir=args.profile_dir, output_path=args.output, output_format=args.format,
+         columns=None if args.columns == 'all' else args.columns, chunk_rows=args.chunk_rows, print_mode=args.print_mode)
 
 
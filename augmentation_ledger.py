@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# the columns that cost api calls or parsing per row; ranks and EMSSTAT depend on
+# the whole loaded set and are always recomputed
+ENRICHED_COLUMNS = ['Latitude', 'Longitude', 'Side of Town', 'Time of Day', 'Day of Week', 'WMO Code']
+# an incident is re-enriched when any of these change
+INPUT_COLUMNS = ['Date/Time', 'Location', 'Nature', 'Incident ORI']
+
+_SQL_COLUMNS = ['latitude', 'longitude', 'side_of_town', 'time_of_day', 'day_of_week', 'wmo_code']
+
+
+def input_hashes(df):
+    """Stable per-row hash of the input columns, as hex strings."""
+    hashed = pd.util.hash_pandas_object(df[INPUT_COLUMNS].astype(str), index=False)
+    return hashed.map('{:016x}'.format)
+
+
+class AugmentationLedger:
+    """SQLite ledger of enriched columns keyed by Incident Number and input hash.
+
+    lookup() tells which incidents were already augmented with the same inputs and hands
+    back their stored columns, so only new or changed rows need geocoding and weather.
+    reused/computed count rows for the last augmentation run that used the ledger.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reused = 0
+        self.computed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ledger ("
+                "incident_number TEXT PRIMARY KEY, input_hash TEXT NOT NULL, "
+                "latitude REAL, longitude REAL, side_of_town TEXT, time_of_day INTEGER, "
+                "day_of_week INTEGER, wmo_code REAL, augmented_at REAL NOT NULL)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+
+    def lookup(self, df):
+        """Return (known, stored): a boolean mask over df and the stored columns of the known rows."""
+        hashes = input_hashes(df)
+        numbers = df['Incident Number'].astype(str)
+        rows = []
+        unique_numbers = list(dict.fromkeys(numbers.tolist()))
+        with self._lock:
+            for i in range(0, len(unique_numbers), 500):
+                chunk = unique_numbers[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows.extend(self._conn.execute(
+                    f"SELECT incident_number, input_hash, {', '.join(_SQL_COLUMNS)} FROM ledger "
+                    f"WHERE incident_number IN ({placeholders})", chunk).fetchall())
+        stored = pd.DataFrame(rows, columns=['Incident Number', 'input_hash'] + ENRICHED_COLUMNS)
+        stored = stored.set_index('Incident Number')
+        matched = stored.reindex(numbers.to_numpy())
+        known = (matched['input_hash'].to_numpy() == hashes.to_numpy())
+        stored = matched[ENRICHED_COLUMNS][known]
+        stored.index = df.index[known]
+        return pd.Series(known, index=df.index), stored
+
+    def record(self, df):
+        """Store the enriched columns of df; rows missing coordinates or weather are left out so they get retried."""
+        complete = df['Latitude'].notna() & df['Longitude'].notna() & df['WMO Code'].notna()
+        done = df[complete]
+        if done.empty:
+            return 0
+        hashes = input_hashes(done)
+        values = [done[column].astype(object).where(done[column].notna(), None) for column in ENRICHED_COLUMNS]
+        now = time.time()
+        rows = [
+            (str(number), input_hash, *(_sql_value(value) for value in row), now)
+            for number, input_hash, *row in zip(done['Incident Number'], hashes, *values)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO ledger (incident_number, input_hash, {', '.join(_SQL_COLUMNS)}, augmented_at) "
+                f"VALUES ({', '.join('?' * (len(_SQL_COLUMNS) + 3))})", rows)
+        return len(rows)
+
+    def close(self):
+        self._conn.close()
+
+
+def _sql_value(value):
+    # numpy scalars and pandas NA aren't understood by sqlite3
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
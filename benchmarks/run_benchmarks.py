@@ -0,0 +1,167 @@
+"""Time every pipeline stage on synthetic reports and check the results against thresholds.
+
+    python benchmarks/run_benchmarks.py --sizes 1,7,30 --output benchmark_results.json --check
+
+Geocoding and weather use stub providers, so runs are offline and repeatable and only
+measure our own code. Stage timings are the best of --repeat runs.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from assignment2 import (calculate_day_of_week, calculate_emsstat, calculate_incident_rank,
+                         calculate_location_rank, calculate_time_of_day, ensure_geocoding,
+                         fetch_weather_code_for_df, ingest_pdfs, side_of_town)
+from benchmarks.stubs import StubGeocodeClient, StubWeatherClient
+from benchmarks.synthetic_pdfs import generate_reports
+from export import export_incidents
+from geocoding import GeocodeStore
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+STAGES = ['extract', 'geocode', 'side_of_town', 'time_features', 'ranks', 'emsstat', 'weather', 'export_csv']
+
+
+def run_pipeline(pdf_paths, work_dir, workers=None):
+    """Run every stage once; returns ({stage: seconds}, rows)."""
+    timings = {}
+
+    def timed(stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    df, errors = timed('extract', ingest_pdfs, pdf_paths, max_workers=workers)
+    if errors:
+        raise RuntimeError(f"extraction failed: {errors}")
+    store = GeocodeStore(os.path.join(work_dir, f"geocode-{time.time_ns()}.sqlite"))
+    try:
+        timed('geocode', ensure_geocoding, df, 'stub', store=store, client=StubGeocodeClient())
+    finally:
+        store.close()
+    timed('side_of_town', side_of_town, df)
+    timed('time_features', lambda: (calculate_time_of_day(df), calculate_day_of_week(df)))
+    timed('ranks', lambda: (calculate_location_rank(df), calculate_incident_rank(df)))
+    timed('emsstat', calculate_emsstat, df)
+    timed('weather', fetch_weather_code_for_df, df, client=StubWeatherClient())
+    timed('export_csv', export_incidents, df, os.path.join(work_dir, 'export.tsv'), fmt='tsv')
+    return timings, len(df)
+
+
+def run_benchmarks(sizes=(1, 7, 30), incidents_per_day=300, repeat=3, workers=None, seed=0, work_dir=None):
+    """Benchmark the pipeline for every size (in days of reports); returns the results dict."""
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='norman-bench-')
+    runs = []
+    try:
+        for days in sizes:
+            pdf_dir = os.path.join(work_dir, f"pdfs-{days}d-{incidents_per_day}-{seed}")
+            start = time.perf_counter()
+            reports = generate_reports(pdf_dir, days, incidents_per_day=incidents_per_day, seed=seed)
+            generate_seconds = time.perf_counter() - start
+            paths = [path for path, _ in reports]
+            best = {}
+            for _ in range(repeat):
+                timings, rows = run_pipeline(paths, work_dir, workers)
+                best = {stage: min(seconds, best.get(stage, seconds)) for stage, seconds in timings.items()}
+            runs.append({
+                'days': days,
+                'rows': rows,
+                'generate_seconds': round(generate_seconds, 4),
+                'total_seconds': round(sum(best.values()), 4),
+                'stages': {stage: {'seconds': round(seconds, 5),
+                                   'seconds_per_1k_rows': round(seconds / max(rows, 1) * 1000, 5)}
+                           for stage, seconds in best.items()},
+            })
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'incidents_per_day': incidents_per_day,
+            'repeat': repeat,
+            'workers': workers,
+            'seed': seed,
+        },
+        'runs': runs,
+    }
+
+
+def check_results(results, thresholds, baseline=None, tolerance=0.25):
+    """Return a list of human-readable failures (empty when everything is within limits).
+
+    thresholds caps each stage's seconds per 1000 rows; with a baseline results dict a
+    stage also fails when it is more than tolerance slower than the same size there.
+    """
+    limits = thresholds.get('max_seconds_per_1k_rows', {})
+    min_seconds = thresholds.get('min_seconds', 0.0)
+    previous = {run['days']: run for run in (baseline or {}).get('runs', [])}
+    failures = []
+    for run in results['runs']:
+        for stage, timing in run['stages'].items():
+            limit = limits.get(stage)
+            if limit is not None and timing['seconds_per_1k_rows'] > limit and timing['seconds'] > min_seconds:
+                failures.append(f"{run['days']}d {stage}: {timing['seconds_per_1k_rows']:.4f}s per 1k rows "
+                                f"> limit {limit}")
+            before = previous.get(run['days'], {}).get('stages', {}).get(stage)
+            # tiny stages are all noise, only compare the ones that take measurable time
+            if before and timing['seconds'] > min_seconds and timing['seconds'] > before['seconds'] * (1 + tolerance):
+                failures.append(f"{run['days']}d {stage}: {timing['seconds']:.4f}s vs baseline "
+                                f"{before['seconds']:.4f}s (+{timing['seconds'] / before['seconds'] - 1:.0%})")
+    return failures
+
+
+def print_results(results):
+    for run in results['runs']:
+        print(f"{run['days']} day(s), {run['rows']} incidents, {run['total_seconds']:.3f}s total")
+        for stage, timing in run['stages'].items():
+            print(f"  {stage:<14} {timing['seconds']:>9.4f}s  {timing['seconds_per_1k_rows']:>8.4f}s/1k rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the incident pipeline on synthetic reports.")
+    parser.add_argument("--sizes", type=str, default="1,7,30", help="Comma separated report counts in days, e.g. 1,7,30,365.")
+    parser.add_argument("--incidents-per-day", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--thresholds", type=str, default=THRESHOLDS_FILE)
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a threshold is exceeded.")
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(size) for size in args.sizes.split(',')], args.incidents_per_day,
+                             args.repeat, args.workers, args.seed)
+    print_results(results)
+    with open(args.thresholds) as file:
+        thresholds = json.load(file)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    failures = check_results(results, thresholds, baseline, args.tolerance)
+    results['failures'] = failures
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if args.check and failures:
+        sys.exit(1)
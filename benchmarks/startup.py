@@ -0,0 +1,96 @@
+"""Time cold imports of the CLI and app modules, each in a fresh interpreter.
+
+    python benchmarks/startup.py --repeat 5 --output startup_results.json --check
+
+Besides the import time it lists which heavy libraries each import pulled in, so a
+module-level import of one of them (instead of a lazy one) shows up as a failure.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+# what gets imported: the parsing CLI, the clustering service and the Streamlit app
+TARGETS = {
+    'assignment2': 'import assignment2',
+    'clustering': 'import clustering',
+    'app': "import importlib.util; spec = importlib.util.spec_from_file_location('norman', 'src/norman.py'); "
+           "spec.loader.exec_module(importlib.util.module_from_spec(spec))",
+}
+HEAVY_MODULES = ['sklearn', 'matplotlib', 'seaborn', 'plotly', 'requests_cache', 'openmeteo_requests', 'requests']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_startup(target, repeat=3):
+    """Best import time of target over repeat fresh interpreters, and the heavy modules it loaded.
+
+    Returns None when the import fails (e.g. streamlit isn't installed for the app).
+    """
+    code = _PROBE.format(statement=TARGETS[target], heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            return None
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    best['seconds'] = round(best['seconds'], 4)
+    return best
+
+
+def run_startup(targets=tuple(TARGETS), repeat=3):
+    return {target: measure_startup(target, repeat) for target in targets}
+
+
+def check_startup(results, thresholds):
+    """Failures for targets that can't be imported, are slower than max_seconds or load a module they must not load."""
+    limits = thresholds.get('startup', {})
+    failures = []
+    for target, result in results.items():
+        if result is None:
+            # its limits can't be checked, which must not pass as meeting them
+            failures.append(f"{target}: import failed")
+            continue
+        limit = limits.get('max_seconds', {}).get(target)
+        if limit is not None and result['seconds'] > limit:
+            failures.append(f"{target}: import took {result['seconds']:.3f}s > limit {limit}s")
+        eager = sorted(set(result['loaded']) & set(limits.get('lazy_modules', {}).get(target, [])))
+        if eager:
+            failures.append(f"{target}: imports {', '.join(eager)} at startup")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold start imports of the pipeline and the app.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--thresholds", type=str, default=THRESHOLDS_FILE)
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a threshold is exceeded.")
+    args = parser.parse_args()
+
+    results = run_startup(repeat=args.repeat)
+    for target, result in results.items():
+        if result is None:
+            print(f"  {target:<12} could not be imported here")
+        else:
+            print(f"  {target:<12} {result['seconds']:>8.3f}s  loads: {', '.join(result['loaded']) or '-'}")
+    with open(args.thresholds) as file:
+        failures = check_startup(results, json.load(file))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'results': results, 'failures': failures}, file, indent=2)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if args.check and failures:
+        sys.exit(1)
@@ -0,0 +1,143 @@
+"""Synthetic Norman PD daily incident summaries for benchmarking.
+
+The PDFs use the layout extract_incidents_from_pdf parses: a header row on the first
+page, one row of five cells per incident, 16 rows per landscape page, and a footer
+that ends in the report's own date/time line. Locations and natures follow skewed
+distributions so ranks and EMSSTAT grouping have realistic work to do.
+"""
+import argparse
+import os
+from datetime import date, datetime, timedelta
+
+import fitz
+import numpy as np
+
+HEADER = ['Date / Time', 'Incident Number', 'Location', 'Nature', 'Incident ORI']
+COLUMN_X = [52.56, 150.86, 229.82, 420.0, 600.0]
+HEADER_Y = 95.0
+FIRST_ROW_Y = 109.0
+ROW_HEIGHT = 29.04
+ROWS_PER_PAGE = 16
+FONT_SIZE = 8.04
+PAGE_WIDTH, PAGE_HEIGHT = 792, 612
+
+NATURES = ['Traffic Stop', 'Contact a Subject', 'Welfare Check', 'Disturbance/Domestic', 'Parking Problem',
+           'Suspicious', 'Follow Up', 'Check Area', 'Alarm', 'Harassment / Threats Report', 'Larceny',
+           'Trespassing', 'MVA Non Injury', 'Motorist Assist', 'Animal Complaint', 'Runaway or Lost Child',
+           'Noise Complaint', 'Assault', 'MVA With Injuries', 'Animal at Large', 'Animal Dead',
+           'Supplement Report', 'Animal Injured', '911 Call Nature Unknown', 'Fraud', 'Sick Person',
+           'Breathing Problems', 'Falls', 'Chest Pain', 'Transfer/Interfacility']
+STREETS = ['W LINDSEY ST', 'E LINDSEY ST', 'W MAIN ST', 'E MAIN ST', 'N PORTER AVE', 'S BERRY RD', '24TH AVE NW',
+           '24TH AVE SW', '12TH AVE NE', '36TH AVE NW', 'W ROBINSON ST', 'E ALAMEDA ST', 'CLASSEN BLVD',
+           'W IMHOFF RD', 'N WEBSTER AVE', 'W BOYD ST', 'CHAUTAUQUA AVE', 'W TECUMSEH RD', 'E ROCK CREEK RD',
+           'N FLOOD AVE', 'W BROOKS ST', 'MCGEE DR', 'W DAWS ST', 'ELM AVE', 'JENKINS AVE', 'DEWEY AVE']
+POLICE_ORI, EMS_ORI, FIRE_ORI = 'OK0140200', 'EMSSTAT', '14005'
+
+
+def _zipf_weights(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def address_pool(size=2000, seed=0):
+    """Deterministic street addresses and intersections, most frequent first."""
+    rng = np.random.default_rng(seed)
+    addresses = []
+    while len(addresses) < size:
+        if rng.random() < 0.25:
+            a, b = rng.choice(len(STREETS), 2, replace=False)
+            address = f"{STREETS[a]} / {STREETS[b]}"
+        else:
+            address = f"{rng.integers(100, 4000)} {STREETS[rng.integers(len(STREETS))]}"
+        if address not in addresses:
+            addresses.append(address)
+    return addresses
+
+
+def daily_incidents(day, count, seed=0, first_number=1, addresses=None):
+    """Incident records (dicts like extract_incidents_from_pdf returns) for one day."""
+    rng = np.random.default_rng([seed, day.toordinal()])
+    addresses = addresses or address_pool(seed=seed)
+    minutes = np.sort(rng.integers(0, 24 * 60, count))
+    locations = rng.choice(len(addresses), count, p=_zipf_weights(len(addresses)))
+    natures = rng.choice(len(NATURES), count, p=_zipf_weights(len(NATURES), 1.3))
+    records = []
+    number = first_number
+    for minute, location, nature in zip(minutes, locations, natures):
+        when = datetime.combine(day, datetime.min.time()) + timedelta(minutes=int(minute))
+        ori = rng.choice([POLICE_ORI, EMS_ORI, FIRE_ORI], p=[0.8, 0.13, 0.07])
+        records.append({
+            'Date/Time': f"{when.month}/{when.day}/{when.year} {when.hour}:{when.minute:02d}",
+            'Incident Number': f"{day.year}-{number:08d}",
+            'Location': addresses[location],
+            'Nature': NATURES[nature],
+            'Incident ORI': str(ori),
+        })
+        number += 1
+        if ori == EMS_ORI and rng.random() < 0.5 and len(records) < count:
+            # EMS calls are often logged by the fire department too, same time and place
+            records.append(dict(records[-1], **{'Incident Number': f"{day.year}-{number:08d}",
+                                                'Incident ORI': FIRE_ORI}))
+            number += 1
+    return records[:count]
+
+
+def write_report(path, day, records):
+    """Write records as a daily incident summary PDF at path."""
+    doc = fitz.open()
+    # one shape per page, committing every text insert separately is ~100x slower
+    shape = None
+    for i, record in enumerate(records):
+        row = i % ROWS_PER_PAGE
+        if row == 0:
+            if shape is not None:
+                shape.commit()
+            shape = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT).new_shape()
+            if i == 0:
+                for x, title in zip(COLUMN_X, HEADER):
+                    shape.insert_text((x, HEADER_Y), title, fontsize=FONT_SIZE, fontname='helv')
+        y = FIRST_ROW_Y + row * ROW_HEIGHT
+        for x, field in zip(COLUMN_X, HEADER):
+            key = 'Date/Time' if field == 'Date / Time' else field
+            shape.insert_text((x, y), record[key], fontsize=FONT_SIZE, fontname='helv')
+    if shape is None:
+        shape = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT).new_shape()
+    # footer: the title lines and the date/time the report was generated
+    printed = datetime.combine(day + timedelta(days=1), datetime.min.time()) + timedelta(hours=10, minutes=25)
+    footer = ['NORMAN POLICE DEPARTMENT', 'Daily Incident Summary (Public)',
+              f"{printed.month}/{printed.day}/{printed.year} {printed.hour}:{printed.minute:02d}"]
+    for offset, line in enumerate(footer):
+        shape.insert_text((COLUMN_X[0], PAGE_HEIGHT - 40 + offset * 10), line, fontsize=FONT_SIZE, fontname='helv')
+    shape.commit()
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def generate_reports(out_dir, days, start=date(2024, 1, 1), incidents_per_day=300, seed=0):
+    """Write one report per day for `days` days; returns [(pdf_path, records), ...]."""
+    os.makedirs(out_dir, exist_ok=True)
+    addresses = address_pool(seed=seed)
+    rng = np.random.default_rng(seed)
+    reports = []
+    number = 1
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        count = max(1, int(rng.poisson(incidents_per_day)))
+        records = daily_incidents(day, count, seed=seed, first_number=number, addresses=addresses)
+        number += len(records)
+        path = os.path.join(out_dir, f"{day.isoformat()}_daily_incident_summary.pdf")
+        reports.append((write_report(path, day, records), records))
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic daily incident summary PDFs.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1))
+    parser.add_argument("--incidents-per-day", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    reports = generate_reports(args.out_dir, args.days, args.start, args.incidents_per_day, args.seed)
+    print(f"Wrote {len(reports)} reports, {sum(len(records) for _, records in reports)} incidents to {args.out_dir}")
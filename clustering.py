@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from spatial_index import project_coordinates, unproject_coordinates
+
+SLIDER_RANGE = range(2, 11)
+
+
+class ClusteringService:
+    """Fits and caches k-means clusterings of incident locations per (dataset version, k).
+
+    Points are projected once per version. precompute() fits a whole range of k in the
+    background and labels() waits for (or starts) the one it needs, so asking for a k
+    that is already fitted is a dictionary lookup. Histories of mini_batch_threshold
+    points or more use MiniBatchKMeans, and a version that extends a kept one (its points
+    start with all of the older version's points, as an appended history does) starts
+    from the centers fitted for that version (warm start). Everything else is a plain
+    KMeans fit, so labels only depend on the data. Only the last max_versions versions
+    are kept.
+    """
+
+    def __init__(self, mini_batch_threshold=50000, batch_size=4096, max_versions=2, max_workers=2,
+                 random_state=0):
+        self.mini_batch_threshold = mini_batch_threshold
+        self.batch_size = batch_size
+        self.max_versions = max_versions
+        self.random_state = random_state
+        self.fits = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._points = {}
+        self._futures = {}
+        self._parents = {}
+
+    def _projected(self, version, df):
+        with self._lock:
+            if version not in self._points:
+                lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+                lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+                valid = ~(np.isnan(lat) | np.isnan(lon))
+                xy = project_coordinates(lat[valid], lon[valid])
+                # the newest kept version this one extends, if any
+                self._parents[version] = next(
+                    (old for old in reversed(list(self._points))
+                     if len(self._points[old][2]) <= len(xy)
+                     and np.array_equal(self._points[old][2], xy[:len(self._points[old][2])])), None)
+                self._points[version] = (df.index, valid, xy)
+                # forget the oldest versions (dicts keep insertion order)
+                for old in list(self._points)[:-self.max_versions]:
+                    del self._points[old]
+                    self._parents.pop(old, None)
+                    for key in [key for key in self._futures if key[0] == old]:
+                        del self._futures[key]
+            return self._points[version]
+
+    def _model(self, k, n_points, init=None):
+        # sklearn takes a while to import, load it with the first fit rather than with the app
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+        if n_points >= self.mini_batch_threshold:
+            return MiniBatchKMeans(n_clusters=k, batch_size=self.batch_size, random_state=self.random_state,
+                                   init=init if init is not None else 'k-means++', n_init=1 if init is not None else 3)
+        return KMeans(n_clusters=k, random_state=self.random_state)
+
+    def _fit(self, xy, k, parent=None):
+        if len(xy) < k:
+            return np.zeros(len(xy), dtype=np.int32), xy
+        init = None
+        if parent is not None and len(xy) >= self.mini_batch_threshold:
+            # the parent was submitted first, so it is running or done by now
+            parent_centers = parent.result()[1]
+            if len(parent_centers) == k:
+                init = parent_centers
+        model = self._model(k, len(xy), init)
+        labels = model.fit_predict(xy).astype(np.int32)
+        with self._lock:
+            self.fits += 1
+        return labels, model.cluster_centers_
+
+    def _submit(self, version, df, k):
+        xy = self._projected(version, df)[2]
+        with self._lock:
+            future = self._futures.get((version, k))
+            if future is None:
+                parent = self._futures.get((self._parents.get(version), k))
+                future = self._futures[(version, k)] = self._pool.submit(self._fit, xy, k, parent)
+        return future
+
+    def precompute(self, version, df, ks=SLIDER_RANGE):
+        """Start fitting every k in ks in the background; returns the futures."""
+        return [self._submit(version, df, k) for k in ks]
+
+    def is_ready(self, version, k):
+        future = self._futures.get((version, k))
+        return future is not None and future.done()
+
+    def labels(self, version, df, k):
+        """Cluster label of every row of df (<NA> for rows without coordinates)."""
+        future = self._submit(version, df, k)
+        index, valid, _ = self._projected(version, df)
+        labels = np.full(len(index), -1, dtype=np.int32)
+        labels[valid] = future.result()[0]
+        return pd.Series(labels, index=index, name='Cluster').replace(-1, pd.NA).astype('Int32')
+
+    def centers(self, version, df, k):
+        """Cluster centers as a frame of Latitude/Longitude."""
+        lat, lon = unproject_coordinates(self._submit(version, df, k).result()[1])
+        return pd.DataFrame({'Latitude': lat, 'Longitude': lon})
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from email.utils import formatdate
+
+USER_AGENT = "Mozilla/5.0"
+REPORT_DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})_daily_incident_summary')
+
+# status is one of 'downloaded', 'not_modified', 'missing' or 'error'
+DownloadResult = namedtuple('DownloadResult', ['url', 'path', 'status', 'error'])
+
+
+def pooled_session(pool_size=8):
+    """A requests session whose connection pool can serve pool_size threads at once."""
+    # requests is imported here, parsing alone never needs it
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def stream_to_file(response, save_path, chunk_size=64 * 1024):
+    """Write a streamed response body to save_path chunk by chunk, replacing it atomically."""
+    tmp_path = f"{save_path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+        os.replace(tmp_path, save_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return save_path
+
+
+class PdfDownloader:
+    """Downloads incident PDFs into dest_dir, many at a time over one pooled session.
+
+    Files already on disk are revalidated with If-None-Match / If-Modified-Since instead
+    of being fetched again, and URLs that returned 404 (days without a report) are
+    remembered for missing_ttl seconds so date ranges don't keep probing them. A 404 for
+    a report dated within recent_days of today isn't remembered, it may just not be
+    posted yet. That state lives in a small JSON file inside dest_dir.
+    """
+
+    STATE_FILE = '.downloads.json'
+
+    def __init__(self, dest_dir, max_workers=8, chunk_size=64 * 1024,
+                 missing_ttl=30 * 24 * 3600, recent_days=2, timeout=30, session=None):
+        self.dest_dir = dest_dir
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.missing_ttl = missing_ttl
+        self.recent_days = recent_days
+        self.timeout = timeout
+        self.session = session or pooled_session(max_workers)
+        self._lock = threading.Lock()
+        os.makedirs(dest_dir, exist_ok=True)
+        self._state_path = os.path.join(dest_dir, self.STATE_FILE)
+        self._state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self._state_path) as file:
+                state = json.load(file)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        state.setdefault('validators', {})
+        state.setdefault('missing', {})
+        return state
+
+    def save_state(self):
+        with self._lock:
+            tmp_path = f"{self._state_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(self._state, file)
+            os.replace(tmp_path, self._state_path)
+
+    def local_path(self, url):
+        return os.path.join(self.dest_dir, url.rstrip('/').split('/')[-1])
+
+    def _is_recent(self, url):
+        match = REPORT_DATE_PATTERN.search(url)
+        if match is None:
+            return False
+        try:
+            report_date = date.fromisoformat(match.group(1))
+        except ValueError:
+            return False
+        return report_date >= date.today() - timedelta(days=self.recent_days)
+
+    def is_known_missing(self, url):
+        with self._lock:
+            missing_since = self._state['missing'].get(url)
+        if missing_since is None:
+            return False
+        return self.missing_ttl is None or time.time() - missing_since < self.missing_ttl
+
+    def _conditional_headers(self, url, path):
+        if not os.path.exists(path):
+            return {}
+        with self._lock:
+            validators = self._state['validators'].get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        elif not headers:
+            # a file we didn't download ourselves, only re-fetch if the server has a newer one
+            headers['If-Modified-Since'] = formatdate(os.path.getmtime(path), usegmt=True)
+        return headers
+
+    def fetch(self, url):
+        """Download a single URL; state is not saved, use fetch_all for that."""
+        path = self.local_path(url)
+        if self.is_known_missing(url):
+            return DownloadResult(url, None, 'missing', None)
+        try:
+            headers = self._conditional_headers(url, path)
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    return DownloadResult(url, path, 'not_modified', None)
+                if response.status_code == 404:
+                    if not self._is_recent(url):
+                        with self._lock:
+                            self._state['missing'][url] = time.time()
+                    return DownloadResult(url, None, 'missing', None)
+                response.raise_for_status()
+                stream_to_file(response, path, self.chunk_size)
+                with self._lock:
+                    self._state['missing'].pop(url, None)
+                    self._state['validators'][url] = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                    }
+            return DownloadResult(url, path, 'downloaded', None)
+        except Exception as e:
+            return DownloadResult(url, None, 'error', f"{type(e).__name__}: {e}")
+
+    def fetch_all(self, urls):
+        """Download many URLs concurrently; results come back in the order of urls."""
+        urls = list(urls)
+        if len(urls) <= 1 or self.max_workers <= 1:
+            results = [self.fetch(url) for url in urls]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(self.fetch, urls))
+        self.save_state()
+        return results
@@ -0,0 +1,121 @@
+import gzip
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = ['tsv', 'csv.gz', 'parquet', 'arrow']
+# the columns (and names) of the assignment's ans.csv, from the columns we compute
+ASSIGNMENT_COLUMNS = {
+    'Day of Week': 'Day of the Week',
+    'Time of Day': 'Time of Day',
+    'WMO Code': 'Weather',
+    'Location Rank': 'Location Rank',
+    'Side of Town': 'Side of Town',
+    'Incident Rank': 'Incident Rank',
+    'Nature': 'Nature',
+    'EMSSTAT': 'EMSSTAT',
+}
+
+
+def format_for_path(path):
+    """Export format implied by the file name; anything unknown is written as TSV, like ans.csv always was."""
+    name = path.lower()
+    if name.endswith('.parquet'):
+        return 'parquet'
+    if name.endswith(('.arrow', '.feather', '.ipc')):
+        return 'arrow'
+    if name.endswith('.gz'):
+        return 'csv.gz'
+    return 'tsv'
+
+
+def assignment_columns(df):
+    """df projected to the assignment's output columns, renamed the way ans.csv names them."""
+    missing = [column for column in ASSIGNMENT_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Cannot export the assignment columns, missing: {', '.join(missing)}")
+    return df[list(ASSIGNMENT_COLUMNS)].rename(columns=ASSIGNMENT_COLUMNS)
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_text(df, file, sep, chunk_rows):
+    df.iloc[:0].to_csv(file, sep=sep, index=False)
+    for chunk in _chunks(df, chunk_rows):
+        chunk.to_csv(file, sep=sep, index=False, header=False)
+
+
+def export_incidents(df, path, fmt=None, columns=None, chunk_rows=100_000):
+    """Write df to path as TSV, gzip compressed CSV, Parquet or Arrow IPC; returns the rows written.
+
+    Rows are converted and written chunk_rows at a time (one Parquet row group or IPC
+    record batch per chunk), so no second full copy of the frame is held in memory. With
+    columns='assignment' only the assignment's output columns are written. The file is
+    written next to path and moved into place once complete.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(EXPORT_FORMATS)}")
+    if columns == 'assignment':
+        df = assignment_columns(df)
+    elif columns is not None:
+        df = df[list(columns)]
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        if fmt == 'tsv':
+            with open(tmp_path, 'w', newline='') as file:
+                _write_text(df, file, '\t', chunk_rows)
+        elif fmt == 'csv.gz':
+            # a low compression level, most of the size win at a fraction of the time of the default 9
+            with gzip.open(tmp_path, 'wt', newline='', compresslevel=5) as file:
+                _write_text(df, file, ',', chunk_rows)
+        else:
+            # every chunk is converted against the schema of the whole frame, so a chunk where
+            # a column happens to be all empty still gets the same column type
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            if fmt == 'parquet':
+                writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+            else:
+                writer = pa.ipc.new_file(tmp_path, schema)
+            with writer:
+                for chunk in _chunks(df, chunk_rows):
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(df)
+
+
+def read_export(path, fmt=None):
+    """Read a file written by export_incidents back into a frame."""
+    fmt = fmt or format_for_path(path)
+    if fmt == 'tsv':
+        return pd.read_csv(path, sep='\t')
+    if fmt == 'csv.gz':
+        return pd.read_csv(path, compression='gzip')
+    if fmt == 'parquet':
+        return pq.read_table(path).to_pandas()
+    with pa.ipc.open_file(path) as reader:
+        return reader.read_all().to_pandas()
+
+
+def export_summary(df, top=5):
+    """A few lines describing df for the console instead of printing every row."""
+    lines = [f"{len(df):,} incidents, {len(df.columns)} columns"]
+    if 'Timestamp' in df.columns and df['Timestamp'].notna().any():
+        lines.append(f"From {df['Timestamp'].min():%Y-%m-%d %H:%M} to {df['Timestamp'].max():%Y-%m-%d %H:%M}")
+    if 'Nature' in df.columns:
+        natures = df['Nature'].value_counts().head(top)
+        lines.append("Most common: " + ", ".join(f"{nature} ({count})" for nature, count in natures.items()))
+    missing = df.isna().sum()
+    missing = missing[missing > 0]
+    if not missing.empty:
+        lines.append("Missing values: " + ", ".join(f"{column} {count}" for column, count in missing.items()))
+    return '\n'.join(lines)
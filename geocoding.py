@@ -0,0 +1,204 @@
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DAY = 24 * 3600
+GOOGLE_GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+# added to every address sent to the provider
+DEFAULT_APPEND_INFO = "Norman, OK"
+
+
+class GeocodeStore:
+    """SQLite-backed geocode cache that survives CLI runs and Streamlit restarts.
+
+    Found addresses are kept for ttl seconds. Addresses the provider could not find are
+    stored with NULL coordinates and kept for negative_ttl seconds, so they aren't paid
+    for again on every run either. hits/misses count lookups since the store was opened.
+    """
+
+    def __init__(self, path, ttl=180 * DAY, negative_ttl=7 * DAY):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "address TEXT PRIMARY KEY, lat REAL, lon REAL, fetched_at REAL NOT NULL)"
+            )
+
+    def _is_fresh(self, lat, fetched_at, now):
+        ttl = self.ttl if lat is not None else self.negative_ttl
+        return now - fetched_at < ttl
+
+    def get_many(self, addresses):
+        """Return {address: (lat, lon)} for every address with a fresh entry.
+
+        Negative entries come back as (None, None); addresses not in the result are misses.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        found = {}
+        now = time.time()
+        with self._lock:
+            # stay well under SQLite's bound parameter limit
+            for i in range(0, len(addresses), 500):
+                chunk = addresses[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT address, lat, lon, fetched_at FROM geocodes WHERE address IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for address, lat, lon, fetched_at in rows:
+                    if self._is_fresh(lat, fetched_at, now):
+                        found[address] = (lat, lon)
+            negative = sum(1 for lat, _ in found.values() if lat is None)
+            self.hits += len(found) - negative
+            self.negative_hits += negative
+            self.misses += len(addresses) - len(found)
+        return found
+
+    def get(self, address):
+        """Return (lat, lon), (None, None) for a known-bad address, or None on a miss."""
+        return self.get_many([address]).get(address)
+
+    def put_many(self, results):
+        """Store {address: (lat, lon)}; use (None, None) to remember an address as not found."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocodes (address, lat, lon, fetched_at) VALUES (?, ?, ?, ?)",
+                [(address, lat, lon, now) for address, (lat, lon) in results.items()],
+            )
+
+    def put(self, address, lat, lon):
+        self.put_many({address: (lat, lon)})
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until one of rate tokens per second is free."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class GeocodeClient:
+    """Geocodes many addresses at once with the Google Geocoding API.
+
+    Requests go through one pooled session from max_workers threads, are paced by a
+    token bucket (rate requests per second, Google allows 50) and are retried with
+    exponential backoff on connection errors, 429/5xx and OVER_QUERY_LIMIT. Results are
+    (lat, lon, found) where found is True, False for an address Google doesn't know,
+    or None when the lookup failed and shouldn't be cached.
+    """
+
+    RETRY_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+
+    def __init__(self, api_key, url=GOOGLE_GEOCODE_URL, append_info=DEFAULT_APPEND_INFO, max_workers=8,
+                 rate=40.0, retries=4, backoff=0.5, timeout=10, session=None, limiter=None):
+        self.api_key = api_key
+        self.url = url
+        self.append_info = append_info
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = limiter or TokenBucket(rate)
+        self.requests_made = 0
+        if session is None:
+            # requests is only loaded once a client is made, the store alone doesn't need it
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self._lock = threading.Lock()
+
+    def _attempt(self, address):
+        self.limiter.acquire()
+        with self._lock:
+            self.requests_made += 1
+        params = {"address": f"{address}, {self.append_info}", "key": self.api_key}
+        import requests
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+        except requests.RequestException:
+            # connection drops, timeouts, broken chunked bodies... all worth another try
+            return None, True
+        if response.status_code == 429 or response.status_code >= 500:
+            return None, True
+        if response.status_code != 200:
+            return (None, None, None), False
+        try:
+            data = response.json()
+        except ValueError:
+            # a 200 that isn't json (proxy error page, cut off body), retry like a 5xx
+            return None, True
+        if data["status"] == "OK":
+            location = data["results"][0]["geometry"]["location"]
+            return (location["lat"], location["lng"], True), False
+        if data["status"] == "ZERO_RESULTS":
+            return (None, None, False), False
+        return None, data["status"] in self.RETRY_STATUSES
+
+    def geocode(self, address):
+        """Geocode one address, retrying transient failures with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            result, retry = self._attempt(address)
+            if result is not None:
+                return result
+            if not retry or attempt == self.retries:
+                break
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+        return None, None, None
+
+    def geocode_many(self, addresses, progress_callback=None):
+        """Geocode addresses concurrently; progress_callback(done, total) runs in the calling thread."""
+        addresses = list(dict.fromkeys(addresses))
+        results = {}
+        if not addresses:
+            return results
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.geocode, address): address for address in addresses}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress_callback is not None:
+                    progress_callback(done, len(addresses))
+        return results
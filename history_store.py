@@ -0,0 +1,140 @@
+import json
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from assignment2 import INCIDENT_FIELDS, TIMESTAMP_COLUMN, apply_incident_schema, incident_timestamps
+from ranking import IncidentRanker
+
+# what goes on disk: the extracted columns as plain strings plus the parsed timestamp.
+# dictionary types are left out on purpose, every part file must share one schema
+HISTORY_SCHEMA = pa.schema([(field, pa.string()) for field in INCIDENT_FIELDS]
+                           + [(TIMESTAMP_COLUMN, pa.timestamp('us'))])
+UNKNOWN_DATE = 'unknown'
+
+
+class IncidentHistoryStore:
+    """Append-only incident history stored as Parquet, partitioned by incident date.
+
+    Every append writes new part files under root/date=YYYY-MM-DD/, skipping incidents
+    whose Incident Number is already in that partition. Reads only open the partitions
+    inside the requested date range and push a Nature filter down to the Parquet scan.
+    The report dates that were ingested are tracked so callers know what to parse, and
+    an IncidentRanker over all stored incidents is kept next to the data and updated
+    with just the rows each append writes.
+    """
+
+    SOURCES_FILE = '_sources.json'
+    RANKS_FILE = '_ranks.parquet'
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._sources_path = os.path.join(root, self.SOURCES_FILE)
+        self._ranks_path = os.path.join(root, self.RANKS_FILE)
+        self._ranker = None
+
+    def _partition_dir(self, day):
+        return os.path.join(self.root, f"date={day}")
+
+    def partitions(self):
+        """Sorted partition keys (ISO dates) that have data."""
+        return sorted(name.split('=', 1)[1] for name in os.listdir(self.root)
+                      if name.startswith('date=') and os.path.isdir(os.path.join(self.root, name)))
+
+    def sources(self):
+        """Report dates (ISO strings) that were appended with append(..., source_dates=...)."""
+        try:
+            with open(self._sources_path) as file:
+                return set(json.load(file))
+        except FileNotFoundError:
+            return set()
+
+    def has_source(self, day):
+        return pd.Timestamp(day).date().isoformat() in self.sources()
+
+    def _add_sources(self, source_dates):
+        sources = self.sources() | {pd.Timestamp(day).date().isoformat() for day in source_dates}
+        tmp_path = f"{self._sources_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(sorted(sources), file)
+        os.replace(tmp_path, self._sources_path)
+
+    def ranker(self):
+        """Location and Nature ranks over the whole stored history (loaded once, then kept current)."""
+        if self._ranker is None:
+            if os.path.exists(self._ranks_path):
+                self._ranker = IncidentRanker.load(self._ranks_path)
+            else:
+                # one-time count of a history written before the ranks were stored
+                self._ranker = IncidentRanker()
+                if self.partitions():
+                    self._ranker.append(self.read())
+                    self._save_ranker()
+        return self._ranker
+
+    def _save_ranker(self):
+        tmp_path = f"{self._ranks_path}.{uuid.uuid4().hex}.tmp"
+        self._ranker.save(tmp_path)
+        os.replace(tmp_path, self._ranks_path)
+
+    def _existing_numbers(self, day):
+        partition = self._partition_dir(day)
+        if not os.path.isdir(partition):
+            return set()
+        table = ds.dataset(partition, format='parquet', schema=HISTORY_SCHEMA).to_table(columns=['Incident Number'])
+        return set(table.column('Incident Number').to_pylist())
+
+    def append(self, df, source_dates=()):
+        """Write the incidents of df that aren't stored yet; returns how many rows were written."""
+        written = []
+        # loaded before writing, so a first-time count of the history doesn't include this batch
+        ranker = self.ranker()
+        if not df.empty:
+            batch = df[INCIDENT_FIELDS].copy()
+            # parsed on a shallow copy, so the caller's frame doesn't gain a Timestamp column
+            batch[TIMESTAMP_COLUMN] = incident_timestamps(df.copy(deep=False))
+            batch = batch.drop_duplicates(subset='Incident Number', keep='last')
+            days = batch[TIMESTAMP_COLUMN].dt.strftime('%Y-%m-%d').fillna(UNKNOWN_DATE)
+            for day, rows in batch.groupby(days, sort=True):
+                rows = rows[~rows['Incident Number'].isin(self._existing_numbers(day))]
+                if rows.empty:
+                    continue
+                os.makedirs(self._partition_dir(day), exist_ok=True)
+                columns = {field: rows[field].astype(object).where(rows[field].notna(), None).tolist()
+                           for field in INCIDENT_FIELDS}
+                columns[TIMESTAMP_COLUMN] = rows[TIMESTAMP_COLUMN].astype('datetime64[us]')
+                table = pa.Table.from_pydict(columns, schema=HISTORY_SCHEMA)
+                pq.write_table(table, os.path.join(self._partition_dir(day), f"part-{uuid.uuid4().hex}.parquet"))
+                written.append(rows)
+        if written:
+            # only the new incidents are counted, the history is never re-ranked
+            ranker.append(pd.concat(written, ignore_index=True))
+            self._save_ranker()
+        if source_dates:
+            self._add_sources(source_dates)
+        return sum(len(rows) for rows in written)
+
+    def read(self, start=None, end=None, natures=None):
+        """Incidents with an incident date in [start, end] (and a Nature in natures, if given)."""
+        start = pd.Timestamp(start).date().isoformat() if start is not None else None
+        end = pd.Timestamp(end).date().isoformat() if end is not None else None
+        days = [day for day in self.partitions()
+                if day != UNKNOWN_DATE and (start is None or day >= start) and (end is None or day <= end)]
+        if start is None and end is None and UNKNOWN_DATE in self.partitions():
+            days.append(UNKNOWN_DATE)
+        if not days:
+            return apply_incident_schema(pd.DataFrame({field: pd.Series(dtype=object) for field in INCIDENT_FIELDS}
+                                                      | {TIMESTAMP_COLUMN: pd.Series(dtype='datetime64[us]')}))
+        # only the partition directories in range are opened at all
+        files = [os.path.join(self._partition_dir(day), name)
+                 for day in days for name in sorted(os.listdir(self._partition_dir(day))) if name.endswith('.parquet')]
+        dataset = ds.dataset(files, format='parquet', schema=HISTORY_SCHEMA)
+        row_filter = ds.field('Nature').isin(list(natures)) if natures else None
+        df = dataset.to_table(filter=row_filter).to_pandas()
+        df = df.sort_values(TIMESTAMP_COLUMN, kind='stable', ignore_index=True)
+        return apply_incident_schema(df)
@@ -0,0 +1,98 @@
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+class RunReport:
+    """Per-stage wall time, row counts and counter deltas for one pipeline run.
+
+    counters maps a name to a zero-argument callable returning a running total (API
+    calls made, cache hits, ...); every stage records how much each one moved while it
+    ran, and `<name>_hits`/`<name>_misses` pairs also get a `<name>_hit_rate`. With a
+    profile_dir each top-level stage is run under cProfile and dumped there as
+    NN-stage.prof (open it with `python -m pstats` or snakeviz).
+    """
+
+    def __init__(self, counters=None, profile_dir=None):
+        self.counters = dict(counters or {})
+        self.profile_dir = profile_dir
+        self.started = datetime.now(timezone.utc)
+        self.stages = []
+        self._depth = 0
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def _read_counters(self):
+        values = {}
+        for name, read in self.counters.items():
+            try:
+                values[name] = read()
+            except Exception:
+                values[name] = None
+        return values
+
+    @contextmanager
+    def stage(self, name, df=None):
+        """Time the enclosed block. rows_in/rows_out default to len(df) before and after;
+        set record['rows_out'] for stages that produce a new frame."""
+        record = {'stage': name, 'depth': self._depth, 'rows_in': len(df) if df is not None else None, 'rows_out': None}
+        before = self._read_counters()
+        profiler = None
+        if self.profile_dir and self._depth == 0:
+            # cProfile can't be nested, only outermost stages get a dump
+            profiler = cProfile.Profile()
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            with profiler or nullcontext():
+                yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            self._depth -= 1
+            if record['rows_out'] is None and df is not None:
+                record['rows_out'] = len(df)
+            after = self._read_counters()
+            deltas = {counter: value - before[counter] for counter, value in after.items()
+                      if value is not None and before[counter] is not None}
+            record.update({counter: delta for counter, delta in deltas.items() if delta})
+            for counter in deltas:
+                if counter.endswith('_hits'):
+                    prefix = counter[:-len('_hits')]
+                    hits, misses = deltas[counter], deltas.get(f'{prefix}_misses', 0)
+                    if hits or misses:
+                        # both sides of the pair, so 0 hits and N misses reads as a 0.0 hit rate
+                        record[counter], record[f'{prefix}_misses'] = hits, misses
+                        record[f'{prefix}_hit_rate'] = round(hits / (hits + misses), 4)
+            if profiler is not None:
+                path = os.path.join(self.profile_dir, f"{len(self.stages):02d}-{name.replace(' ', '_')}.prof")
+                profiler.dump_stats(path)
+                record['profile'] = path
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'total_seconds': round(sum(record['seconds'] for record in self.stages if record['depth'] == 0), 6),
+            'stages': self.stages,
+        }
+
+    def to_frame(self):
+        """One row per stage, for printing or st.dataframe."""
+        return pd.DataFrame(self.stages).set_index('stage') if self.stages else pd.DataFrame()
+
+    def write_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2, default=str)
+        return path
+
+
+def stage(report, name, df=None):
+    """report.stage(name, df), or a do-nothing context when there is no report."""
+    if report is None:
+        return nullcontext({})
+    return report.stage(name, df)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# most points a scatter view ever sends to the browser
+MAX_MAP_POINTS = 5000
+# a bin covers about this many screen pixels at any zoom level
+BIN_PIXELS = 40
+SQRT3 = np.sqrt(3.0)
+
+
+def cell_size_for_zoom(zoom, pixels=BIN_PIXELS):
+    """Bin size in degrees of latitude for a web-map zoom level (256 px tiles)."""
+    return pixels * 360.0 / (256 * 2 ** zoom)
+
+
+def _coordinates(df):
+    points = df[['Latitude', 'Longitude']].astype(float).dropna()
+    return points['Latitude'].to_numpy(), points['Longitude'].to_numpy()
+
+
+def _lon_scale(lat):
+    # a degree of longitude is shorter than a degree of latitude away from the equator
+    return np.cos(np.radians(np.mean(lat))) if len(lat) else 1.0
+
+
+def grid_bins(df, cell_size):
+    """Count incidents per square grid cell of cell_size degrees (of latitude).
+
+    Returns one row per non-empty cell with the cell center and its count.
+    """
+    lat, lon = _coordinates(df)
+    scale = _lon_scale(lat)
+    lon_size = cell_size / scale
+    cells = pd.DataFrame({'row': np.floor(lat / cell_size).astype(np.int64),
+                          'col': np.floor(lon / lon_size).astype(np.int64)})
+    counts = cells.groupby(['row', 'col']).size().reset_index(name='count')
+    return pd.DataFrame({'latitude': (counts['row'] + 0.5) * cell_size,
+                         'longitude': (counts['col'] + 0.5) * lon_size,
+                         'count': counts['count']})
+
+
+def hex_bins(df, cell_size):
+    """Count incidents per pointy-top hexagon whose center-to-corner size is cell_size degrees."""
+    lat, lon = _coordinates(df)
+    scale = _lon_scale(lat)
+    x, y = lon * scale, lat
+    # axial coordinates, rounded to the nearest hexagon through cube coordinates
+    q = (SQRT3 / 3 * x - y / 3) / cell_size
+    r = (2 / 3 * y) / cell_size
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    cells = pd.DataFrame({'q': rq.astype(np.int64), 'r': rr.astype(np.int64)})
+    counts = cells.groupby(['q', 'r']).size().reset_index(name='count')
+    center_x = cell_size * (SQRT3 * counts['q'] + SQRT3 / 2 * counts['r'])
+    center_y = cell_size * 1.5 * counts['r']
+    return pd.DataFrame({'latitude': center_y, 'longitude': center_x / scale, 'count': counts['count']})
+
+
+def stable_sample(df, max_points=MAX_MAP_POINTS, key='Incident Number'):
+    """At most max_points rows of df, picked by a hash of key so the pick doesn't change between reruns.
+
+    A row that is picked stays picked when other rows are added, as long as it still has
+    one of the max_points smallest hashes.
+    """
+    if len(df) <= max_points:
+        return df
+    keys = df[key] if key in df.columns else df.index.to_series()
+    hashes = pd.util.hash_pandas_object(keys.astype(str), index=False).to_numpy()
+    keep = np.sort(np.argpartition(hashes, max_points - 1)[:max_points])
+    return df.iloc[keep]
+
+
+def map_data(df, mode='hex', zoom=12, max_points=MAX_MAP_POINTS):
+    """What the incident map should draw: binned counts ('hex' or 'grid') or a capped 'points' sample."""
+    if mode == 'points':
+        points = stable_sample(df.dropna(subset=['Latitude', 'Longitude']), max_points)
+        return pd.DataFrame({'latitude': points['Latitude'].astype(float),
+                             'longitude': points['Longitude'].astype(float)})
+    cell_size = cell_size_for_zoom(zoom)
+    bins = hex_bins(df, cell_size) if mode == 'hex' else grid_bins(df, cell_size)
+    # largest bins first, and never more than max_points of them
+    return bins.sort_values('count', ascending=False, kind='stable').head(max_points).reset_index(drop=True)
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import uuid
+
+import pandas as pd
+
+from assignment2 import PARSER_VERSION
+
+
+class ParsedPdfCache:
+    """On-disk cache of parsed incident PDFs, stored as one Parquet file per PDF.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the parser version, so a
+    renamed file is still a hit and a parser change invalidates everything. Once the
+    cache grows past max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, parser_version=PARSER_VERSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.parser_version = parser_version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, pdf_path):
+        digest = hashlib.sha256(f"parser-v{self.parser_version}:".encode())
+        with open(pdf_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, pdf_path, key=None):
+        """Return the cached incidents for pdf_path, or None if it was never parsed.
+
+        Pass the key from key_for() when the caller already has it, to avoid hashing the file again.
+        """
+        entry = self._entry_path(key or self.key_for(pdf_path))
+        try:
+            df = pd.read_parquet(entry)
+        except (FileNotFoundError, OSError, ValueError):
+            # missing or unreadable entry, the caller just parses the PDF again
+            self.misses += 1
+            return None
+        # bump the mtime so eviction sees this entry as recently used
+        os.utime(entry)
+        self.hits += 1
+        return df
+
+    def put(self, pdf_path, df, key=None):
+        """Store the parsed incidents; returns False (nothing stored) when the entry alone is over max_bytes."""
+        entry = self._entry_path(key or self.key_for(pdf_path))
+        # write to a temp name first so a reader never sees half a file
+        tmp_path = f"{entry}.{uuid.uuid4().hex}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        if os.path.getsize(tmp_path) > self.max_bytes:
+            # it could never stay cached, don't push everything else out for it
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, entry)
+        self.evict(keep=entry)
+        return True
+
+    def size_bytes(self):
+        return sum(os.path.getsize(path) for path, _ in self._entries())
+
+    def _entries(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.parquet'):
+                path = os.path.join(self.cache_dir, name)
+                yield path, os.path.getmtime(path)
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits in max_bytes (never `keep`)."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(os.path.getsize(path) for path, _ in entries)
+        for path, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        for path, _ in list(self._entries()):
+            os.remove(path)
@@ -0,0 +1,137 @@
+from collections import Counter
+from datetime import timedelta
+
+import pandas as pd
+
+DATE_TIME_FORMAT = '%m/%d/%Y %H:%M'
+
+
+class FrequencyRanker:
+    """Running frequency counter that ranks values by how often they occur.
+
+    Rank 1 is the most frequent value and ties share the lowest rank (1, 2, 2, 4), the
+    same as calculate_location_rank always did. Adding a batch only touches the values
+    in that batch; the rank table is rebuilt from the distinct counts, not the rows.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        # how many values currently have each count
+        self._values_per_count = Counter()
+        self._rank_of_count = None
+
+    def add(self, values, weights=None):
+        """Count a batch of values, or values with matching weights (counts) if given."""
+        if weights is None:
+            batch = pd.Series(values).value_counts(dropna=True)
+        else:
+            batch = pd.Series(list(weights), index=list(values)).groupby(level=0).sum()
+        for value, count in batch.items():
+            old = self.counts[value]
+            if old:
+                self._values_per_count[old] -= 1
+                if not self._values_per_count[old]:
+                    del self._values_per_count[old]
+            self.counts[value] = old + int(count)
+            self._values_per_count[old + int(count)] += 1
+        self._rank_of_count = None
+
+    def _rank_table(self):
+        if self._rank_of_count is None:
+            rank_of_count = {}
+            higher = 0
+            for count in sorted(self._values_per_count, reverse=True):
+                rank_of_count[count] = higher + 1
+                higher += self._values_per_count[count]
+            self._rank_of_count = rank_of_count
+        return self._rank_of_count
+
+    def rank(self, value):
+        count = self.counts.get(value)
+        return self._rank_table()[count] if count else None
+
+    def ranks_for(self, values):
+        """Rank of every value in a Series (NaN for values never counted)."""
+        table = self._rank_table()
+        rank_of_value = {value: table[count] for value, count in self.counts.items() if count}
+        ranks = values.map(rank_of_value)
+        if isinstance(ranks.dtype, pd.CategoricalDtype):
+            # mapping a dictionary-encoded column maps its categories, decode the result
+            ranks = ranks.astype(float)
+        return ranks
+
+
+class IncidentRanker:
+    """Location and Nature ranks that are kept up to date as daily batches are appended.
+
+    Besides the all-time counters it keeps per-day counters, so ranks can also be asked
+    for a trailing window (e.g. the last 7 or 30 days) without going back to the rows.
+    """
+
+    def __init__(self, columns=('Location', 'Nature')):
+        self.columns = tuple(columns)
+        self.rankers = {column: FrequencyRanker() for column in self.columns}
+        self.daily = {column: {} for column in self.columns}
+
+    @staticmethod
+    def _days(df):
+        # reuse the extractor's parsed Timestamp column when the frame has one; a
+        # malformed Date/Time becomes NaT and isn't counted in any day
+        if 'Timestamp' in df.columns and pd.api.types.is_datetime64_any_dtype(df['Timestamp']):
+            return df['Timestamp'].dt.date
+        return pd.to_datetime(df['Date/Time'], format=DATE_TIME_FORMAT, errors='coerce').dt.date
+
+    def append(self, df):
+        """Count a batch of incidents (needs 'Date/Time' plus the ranked columns)."""
+        days = self._days(df)
+        for column in self.columns:
+            self.rankers[column].add(df[column])
+            per_day = df.groupby([days, df[column]], observed=True).size()
+            for (day, value), count in per_day.items():
+                self.daily[column].setdefault(day, Counter())[value] += int(count)
+
+    def last_day(self):
+        days = [day for column in self.columns for day in self.daily[column]]
+        return max(days) if days else None
+
+    def window_ranker(self, column, days, end=None):
+        """A FrequencyRanker over the `days` days ending at `end` (default: the latest day seen)."""
+        end = end or self.last_day()
+        ranker = FrequencyRanker()
+        if end is None:
+            return ranker
+        start = end - timedelta(days=days - 1)
+        window = Counter()
+        for day, counts in self.daily[column].items():
+            if start <= day <= end:
+                window.update(counts)
+        ranker.add(window.keys(), window.values())
+        return ranker
+
+    def ranks(self, df, column, window_days=None, end=None):
+        """Ranks for df[column], over all history or over a trailing window of days."""
+        ranker = self.rankers[column] if window_days is None else self.window_ranker(column, window_days, end)
+        return ranker.ranks_for(df[column])
+
+    def to_frame(self):
+        rows = [(column, day, value, count)
+                for column in self.columns
+                for day, counts in self.daily[column].items()
+                for value, count in counts.items()]
+        return pd.DataFrame(rows, columns=['column', 'day', 'value', 'count'])
+
+    @classmethod
+    def from_frame(cls, state, columns=('Location', 'Nature')):
+        ranker = cls(columns)
+        for (column, day), group in state.groupby(['column', 'day']):
+            day = pd.Timestamp(day).date()
+            ranker.daily[column][day] = Counter(dict(zip(group['value'], group['count'].astype(int))))
+            ranker.rankers[column].add(group['value'], group['count'])
+        return ranker
+
+    def save(self, path):
+        self.to_frame().to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path, columns=('Location', 'Nature')):
+        return cls.from_frame(pd.read_parquet(path), columns)
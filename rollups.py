@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from assignment2 import TIMESTAMP_COLUMN, incident_timestamps
+
+# 'Total' counts every incident, the others one series per value of the column
+ROLLUP_DIMENSIONS = ['Total', 'Nature', 'Side of Town', 'Location Rank']
+FREQUENCIES = {'h': '%Y-%m-%d %H:00', 'D': '%Y-%m-%d'}
+# Location Rank is 1 for the busiest location, counting every rank on its own would
+# give one series per address
+LOCATION_RANK_BINS = [0, 10, 50, 250, np.inf]
+LOCATION_RANK_LABELS = ['1-10', '11-50', '51-250', '251+']
+
+
+def rollup_values(df, dimension):
+    """The value each row of df is counted under for dimension (NA rows aren't counted)."""
+    if dimension == 'Total':
+        return pd.Series('All', index=df.index, dtype=object)
+    if dimension == 'Location Rank':
+        ranks = pd.to_numeric(df['Location Rank'], errors='coerce')
+        return pd.cut(ranks, LOCATION_RANK_BINS, labels=LOCATION_RANK_LABELS).astype(object)
+    return df[dimension].astype(object)
+
+
+def rolling_stats(counts, window):
+    """Rolling mean, std and z-score of a count series over the last `window` periods."""
+    rolling = counts.rolling(window, min_periods=1)
+    mean, std = rolling.mean(), rolling.std()
+    return pd.DataFrame({'count': counts, 'mean': mean, 'std': std,
+                         'zscore': (counts - mean) / std.where(std > 0)})
+
+
+def spike_scores(counts, halflife=7):
+    """How far each period's count is above what the periods before it led to expect.
+
+    Expected count and variance are exponentially weighted (the streaming EWMA recurrence,
+    so each new period costs O(1)) and taken from the previous period, so a spike doesn't
+    raise its own baseline. The variance is floored at the expected count (Poisson noise),
+    which keeps a quiet series from scoring a single extra incident as a spike.
+    """
+    weighted = counts.astype(float).ewm(halflife=halflife, adjust=False)
+    expected = weighted.mean().shift(1)
+    variance = weighted.var(bias=True).shift(1)
+    noise = np.sqrt(np.maximum(variance, np.maximum(expected, 1.0)))
+    return pd.DataFrame({'count': counts, 'expected': expected, 'score': (counts - expected) / noise})
+
+
+class IncidentRollups:
+    """Hourly and daily incident counts per Nature, Side of Town and Location Rank bucket, in SQLite.
+
+    update() adds a batch of incidents to the counts; every incident is counted once per
+    dimension (tracked by Incident Number), so batches can overlap and the augmented
+    columns can be added later by updating with the augmented frame. Trend queries read
+    only the rolled-up counts, never the incidents. A Location Rank bucket is the one the
+    incident had when it was counted, ranks of older incidents aren't revisited.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counts (freq TEXT NOT NULL, dimension TEXT NOT NULL, value TEXT NOT NULL, "
+                "period TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (freq, dimension, value, period)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counted (dimension TEXT NOT NULL, incident_number TEXT NOT NULL, "
+                "PRIMARY KEY (dimension, incident_number)) WITHOUT ROWID"
+            )
+
+    def __len__(self):
+        """Number of incidents counted."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM counted WHERE dimension = 'Total'").fetchone()[0]
+
+    def _counted(self, dimension, numbers):
+        found = set()
+        for i in range(0, len(numbers), 500):
+            chunk = numbers[i:i + 500]
+            found.update(number for (number,) in self._conn.execute(
+                f"SELECT incident_number FROM counted WHERE dimension = ? AND incident_number IN "
+                f"({','.join('?' * len(chunk))})", [dimension, *chunk]))
+        return found
+
+    def update(self, df):
+        """Count the incidents of df not counted yet; returns {dimension: incidents added}."""
+        frame = df[[column for column in df.columns if column in ('Incident Number', 'Date/Time', TIMESTAMP_COLUMN)
+                    or column in ROLLUP_DIMENSIONS]].copy()
+        if frame.empty:
+            return {}
+        when = incident_timestamps(frame)
+        frame = frame.assign(**{'Incident Number': frame['Incident Number'].astype(str)})
+        frame = frame[when.notna()].drop_duplicates('Incident Number', keep='last')
+        added = {}
+        with self._lock, self._conn:
+            for dimension in ROLLUP_DIMENSIONS:
+                if dimension != 'Total' and dimension not in frame.columns:
+                    continue
+                rows = frame.assign(value=rollup_values(frame, dimension)).dropna(subset=['value'])
+                rows = rows[~rows['Incident Number'].isin(self._counted(dimension, rows['Incident Number'].tolist()))]
+                if rows.empty:
+                    continue
+                self._conn.executemany("INSERT INTO counted VALUES (?, ?)",
+                                       [(dimension, number) for number in rows['Incident Number']])
+                for freq, fmt in FREQUENCIES.items():
+                    grouped = rows.groupby([rows[TIMESTAMP_COLUMN].dt.strftime(fmt), 'value']).size()
+                    self._conn.executemany(
+                        "INSERT INTO counts VALUES (?, ?, ?, ?, ?) ON CONFLICT (freq, dimension, value, period) "
+                        "DO UPDATE SET count = count + excluded.count",
+                        [(freq, dimension, str(value), period, int(count))
+                         for (period, value), count in grouped.items()])
+                added[dimension] = len(rows)
+        return added
+
+    def values(self, dimension):
+        """Incident totals per value of dimension, most frequent first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT value, SUM(count) FROM counts WHERE freq = 'D' AND dimension = ? GROUP BY value",
+                [dimension]).fetchall()
+        totals = pd.Series(dict(rows), dtype='int64', name='count').rename_axis(dimension)
+        return totals.sort_values(ascending=False, kind='stable')
+
+    def series(self, dimension='Total', values=None, freq='D', start=None, end=None):
+        """Counts per period (rows, with empty periods as 0) and value (columns) between start and end."""
+        fmt = FREQUENCIES[freq]
+        query = "SELECT period, value, count FROM counts WHERE freq = ? AND dimension = ?"
+        params = [freq, dimension]
+        if start is not None:
+            query += " AND period >= ?"
+            params.append(pd.Timestamp(start).strftime(fmt))
+        if end is not None:
+            query += " AND period <= ?"
+            params.append(pd.Timestamp(end).strftime(fmt))
+        if values is not None:
+            values = [str(value) for value in values]
+            query += f" AND value IN ({','.join('?' * len(values))})"
+            params.extend(values)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        counts = pd.DataFrame(rows, columns=['period', 'value', 'count'])
+        table = counts.pivot_table(index='period', columns='value', values='count', aggfunc='sum', fill_value=0)
+        table.index = pd.to_datetime(table.index, format=fmt)
+        if values is not None:
+            table = table.reindex(columns=values, fill_value=0)
+        first = pd.Timestamp(start).floor(freq) if start is not None else (table.index.min() if len(table) else None)
+        last = pd.Timestamp(end).floor(freq) if end is not None else (table.index.max() if len(table) else None)
+        periods = pd.date_range(first, last, freq=freq) if first is not None else pd.DatetimeIndex([])
+        table = table.reindex(periods, fill_value=0).astype('int64')
+        table.index.name, table.columns.name = 'period', dimension
+        return table
+
+    def spikes(self, dimension='Nature', freq='D', halflife=7, at=None):
+        """Spike score of every value of dimension in its latest period (or at `at`), highest first."""
+        table = self.series(dimension, freq=freq, end=at)
+        if table.empty:
+            return pd.DataFrame(columns=['count', 'expected', 'score'])
+        latest = {value: spike_scores(table[value], halflife).iloc[-1] for value in table.columns}
+        result = pd.DataFrame(latest).T.rename_axis(dimension)
+        return result.sort_values('score', ascending=False, kind='stable')
+
+    def close(self):
+        self._conn.close()
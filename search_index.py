@@ -0,0 +1,154 @@
+import bisect
+import re
+import shlex
+import threading
+
+import numpy as np
+import pandas as pd
+
+NGRAM = 3
+RANGE_PATTERN = re.compile(r'^(?:(<=|>=|<|>)(-?[\d.]+)|(-?[\d.]+)\.\.(-?[\d.]+))$')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def query_terms(query):
+    """Split a query into lowercase terms; "quoted phrases" stay one term."""
+    try:
+        terms = shlex.split(query)
+    except ValueError:
+        terms = query.split()
+    return [term.lower() for term in terms if term.strip()]
+
+
+class ColumnIndex:
+    """Inverted index over one column, built from its distinct values.
+
+    Rows are grouped by value id (CSR style: one argsort plus offsets), and the search
+    structures only cover the distinct values: trigram postings for substrings, a sorted
+    token list for word prefixes and, for numeric columns, the sorted values for ranges.
+    """
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        self.values = pd.Series(uniques).astype(str).str.lower().tolist()
+        valid = codes >= 0
+        rows = np.flatnonzero(valid)
+        order = np.argsort(codes[valid], kind='stable')
+        self._rows = rows[order]
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(self.values)))])
+
+        self._grams = {}
+        tokens = {}
+        for value_id, value in enumerate(self.values):
+            for gram in _ngrams(value):
+                self._grams.setdefault(gram, []).append(value_id)
+            for token in TOKEN_PATTERN.findall(value):
+                tokens.setdefault(token, []).append(value_id)
+        self._grams = {gram: np.array(ids) for gram, ids in self._grams.items()}
+        self._tokens = sorted(tokens)
+        self._token_values = [np.array(tokens[token]) for token in self._tokens]
+
+        self.numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+        if self.numeric:
+            numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            present = np.flatnonzero(~np.isnan(numbers))
+            by_value = np.argsort(numbers[present], kind='stable')
+            self._sorted_numbers = numbers[present][by_value]
+            self._sorted_rows = present[by_value]
+
+    def _rows_for_values(self, value_ids):
+        if len(value_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        parts = [self._rows[self._offsets[i]:self._offsets[i + 1]] for i in value_ids]
+        return np.sort(np.concatenate(parts))
+
+    def substring(self, term):
+        """Rows whose value contains term (case-insensitive)."""
+        grams = _ngrams(term)
+        if grams:
+            postings = [self._grams.get(gram) for gram in grams]
+            if any(posting is None for posting in postings):
+                return np.empty(0, dtype=np.int64)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        else:
+            # one or two characters, check every distinct value
+            candidates = range(len(self.values))
+        return self._rows_for_values([i for i in candidates if term in self.values[i]])
+
+    def prefix(self, term):
+        """Rows with a word in their value that starts with term."""
+        start = bisect.bisect_left(self._tokens, term)
+        end = bisect.bisect_left(self._tokens, term + '\uffff')
+        if start == end:
+            return np.empty(0, dtype=np.int64)
+        return self._rows_for_values(np.unique(np.concatenate(self._token_values[start:end])))
+
+    def numeric_range(self, term):
+        """Rows matching a range term (>5, <=3, 2..4), or None if term isn't a range or the column isn't numeric."""
+        match = RANGE_PATTERN.match(term) if self.numeric else None
+        if match is None:
+            return None
+        try:
+            op, bound, low, high = match.groups()
+            numbers = self._sorted_numbers
+            if op is None:
+                lo, hi = np.searchsorted(numbers, float(low), 'left'), np.searchsorted(numbers, float(high), 'right')
+            elif op in ('>', '>='):
+                lo, hi = np.searchsorted(numbers, float(bound), 'right' if op == '>' else 'left'), len(numbers)
+            else:
+                lo, hi = 0, np.searchsorted(numbers, float(bound), 'left' if op == '<' else 'right')
+        except ValueError:
+            return None
+        return np.sort(self._sorted_rows[lo:hi])
+
+    def match(self, term, mode='substring'):
+        rows = self.numeric_range(term)
+        if rows is not None:
+            return rows
+        return self.prefix(term) if mode == 'prefix' else self.substring(term)
+
+
+class SearchIndex:
+    """Search index over the columns of an incident frame, built once per dataset version.
+
+    A column is indexed the first time it is searched. search() returns the positions of
+    the rows that match every term of the query (AND); a term matches a row if it
+    matches in any of the searched columns.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.rows = len(df)
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def column(self, name):
+        with self._lock:
+            if name not in self._columns:
+                self._columns[name] = ColumnIndex(self.df[name])
+            return self._columns[name]
+
+    def search(self, query, columns=None, mode='substring'):
+        """Row positions matching query in columns (all columns if None, nothing if empty)."""
+        columns = list(self.df.columns) if columns is None else list(columns)
+        terms = query_terms(query)
+        if terms and not columns:
+            return np.empty(0, dtype=np.int64)
+        result = None
+        for term in terms:
+            term_rows = [self.column(column).match(term, mode) for column in columns]
+            term_rows = np.unique(np.concatenate(term_rows)) if len(term_rows) > 1 else term_rows[0]
+            result = term_rows if result is None else np.intersect1d(result, term_rows, assume_unique=True)
+            if not len(result):
+                break
+        return np.arange(self.rows) if result is None else result
@@ -0,0 +1,204 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from assignment2 import TOWN_CENTER
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def project_coordinates(lat, lon, origin=TOWN_CENTER):
+    """Equirectangular projection to kilometres east/north of origin.
+
+    Over one town this is accurate to well under a percent, and unlike raw degrees a unit
+    means the same distance in both directions, which is what k-means and radius queries
+    assume.
+    """
+    lat0 = np.radians(origin[0])
+    x = np.radians(np.asarray(lon, dtype=float) - origin[1]) * np.cos(lat0) * EARTH_RADIUS_KM
+    y = np.radians(np.asarray(lat, dtype=float) - origin[0]) * EARTH_RADIUS_KM
+    return np.column_stack([x, y])
+
+
+def unproject_coordinates(xy, origin=TOWN_CENTER):
+    """(lat, lon) arrays for projected points, the inverse of project_coordinates."""
+    lat0 = np.radians(origin[0])
+    lat = origin[0] + np.degrees(xy[:, 1] / EARTH_RADIUS_KM)
+    lon = origin[1] + np.degrees(xy[:, 0] / (EARTH_RADIUS_KM * np.cos(lat0)))
+    return lat, lon
+
+
+class SpatialIndex:
+    """Grid-bucket index over incident coordinates, grown with add() as incidents come in.
+
+    Points are projected to metres and dropped into square buckets of cell_size metres,
+    so a radius query only measures the points in the buckets its circle touches and a
+    nearest-neighbour query searches rings of buckets outward from the point.
+
+    Results are keyed by row ids assigned on add(): with key=None every added row takes
+    the next running number (rows without coordinates too), so for frames that are
+    appended batch after batch the ids are the positions in the combined frame. With a
+    key column (e.g. 'Incident Number') its values are the ids and rows already indexed
+    are skipped, so the same incidents can be added again as the data grows.
+    """
+
+    def __init__(self, cell_size=250.0, origin=TOWN_CENTER):
+        self.cell_size = float(cell_size)
+        self.origin = origin
+        self.size = 0
+        self.rows = 0
+        self._seen = set()
+        self._chunks = []
+        self._arrays = None
+        self._buckets = {}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def ids(self):
+        """Ids of the indexed points, in the order they were added."""
+        return self._columns()[3] if self.size else np.empty(0, dtype=np.int64)
+
+    def add(self, df, key=None):
+        """Index the rows of df that have coordinates (Timestamp is kept for prior-incident queries).
+
+        Returns how many points were added.
+        """
+        lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        if key is None:
+            ids = np.arange(self.rows, self.rows + len(df))
+            self.rows += len(df)
+        else:
+            ids = df[key].to_numpy(dtype=object)
+            valid &= ~pd.Series(ids).isin(self._seen).to_numpy()
+            valid[valid] = ~pd.Series(ids[valid]).duplicated().to_numpy()
+        if not valid.any():
+            return 0
+        xy = project_coordinates(lat[valid], lon[valid], self.origin) * 1000
+        if 'Timestamp' in df.columns:
+            times = pd.to_datetime(df['Timestamp']).to_numpy().astype('datetime64[ns]')[valid]
+        else:
+            times = np.full(valid.sum(), np.datetime64('NaT'), dtype='datetime64[ns]')
+        positions = np.arange(self.size, self.size + len(xy))
+        self._chunks.append((xy[:, 0], xy[:, 1], times, ids[valid]))
+        if key is not None:
+            self._seen.update(ids[valid])
+        self._arrays = None
+
+        # group the new points by bucket and append each group to its bucket
+        cells = np.floor(xy / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells, positions = cells[order], positions[order]
+        starts = np.flatnonzero(np.r_[True, (np.diff(cells, axis=0) != 0).any(axis=1)])
+        for start, end in zip(starts, np.r_[starts[1:], len(cells)]):
+            self._buckets.setdefault((int(cells[start, 0]), int(cells[start, 1])), []).append(positions[start:end])
+        self.size += len(xy)
+        return len(xy)
+
+    def _columns(self):
+        if self._arrays is None:
+            self._arrays = tuple(np.concatenate(parts) for parts in zip(*self._chunks))
+        return self._arrays
+
+    def _bucket(self, key):
+        parts = self._buckets.get(key)
+        if parts is None:
+            return None
+        if len(parts) > 1:
+            # merge the pieces added by different add() calls the first time they're read
+            parts[:] = [np.concatenate(parts)]
+        return parts[0]
+
+    def _point(self, lat, lon):
+        return project_coordinates([lat], [lon], self.origin)[0] * 1000
+
+    def _result(self, positions, distances):
+        ids = self._columns()[3]
+        order = np.argsort(distances, kind='stable')
+        return pd.Series(distances[order], index=ids[positions[order]], name='distance_m')
+
+    def within(self, lat, lon, radius_m):
+        """Incidents within radius_m metres of (lat, lon): distances in metres, nearest first, keyed by row id."""
+        x, y = self._point(lat, lon)
+        xs, ys = self._columns()[:2] if self.size else (None, None)
+        low = np.floor((np.array([x, y]) - radius_m) / self.cell_size).astype(int)
+        high = np.floor((np.array([x, y]) + radius_m) / self.cell_size).astype(int)
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) <= len(self._buckets):
+            keys = [(cx, cy) for cx in range(low[0], high[0] + 1) for cy in range(low[1], high[1] + 1)]
+        else:
+            # a circle bigger than the occupied area, walk the buckets instead of the cells
+            keys = [key for key in self._buckets
+                    if low[0] <= key[0] <= high[0] and low[1] <= key[1] <= high[1]]
+        found = [positions for positions in map(self._bucket, keys) if positions is not None]
+        if not found:
+            return pd.Series(dtype=float, name='distance_m')
+        candidates = np.concatenate(found)
+        distances = np.hypot(xs[candidates] - x, ys[candidates] - y)
+        inside = distances <= radius_m
+        return self._result(candidates[inside], distances[inside])
+
+    def nearest(self, lat, lon, k=5, before=None):
+        """The k incidents closest to (lat, lon), only ones earlier than `before` if given."""
+        if not self.size:
+            return pd.Series(dtype=float, name='distance_m')
+        x, y = self._point(lat, lon)
+        xs, ys, times, _ = self._columns()
+        before = np.datetime64(pd.Timestamp(before), 'ns') if before is not None else None
+        center = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        keys = np.array(list(self._buckets))
+        # no occupied bucket is further out than this many rings
+        max_ring = int(np.abs(keys - np.array(center)).max())
+        best_positions, best_distances = np.empty(0, dtype=np.int64), np.empty(0)
+        for ring in range(max_ring + 1):
+            if 8 * ring > len(self._buckets):
+                # rings now hold more cells than there are buckets (far outliers), just check every point
+                candidates = np.arange(self.size)
+                if before is not None:
+                    candidates = candidates[times < before]
+                distances = np.hypot(xs[candidates] - x, ys[candidates] - y)
+                keep = np.argsort(distances, kind='stable')[:k]
+                best_positions, best_distances = candidates[keep], distances[keep]
+                break
+            ring_cells = [(center[0] + dx, center[1] + dy)
+                          for dx in range(-ring, ring + 1) for dy in range(-ring, ring + 1)
+                          if max(abs(dx), abs(dy)) == ring]
+            found = [p for p in (self._bucket(cell) for cell in ring_cells) if p is not None]
+            if found:
+                candidates = np.concatenate(found)
+                if before is not None:
+                    candidates = candidates[times[candidates] < before]
+                distances = np.hypot(xs[candidates] - x, ys[candidates] - y)
+                best_positions = np.concatenate([best_positions, candidates])
+                best_distances = np.concatenate([best_distances, distances])
+                keep = np.argsort(best_distances, kind='stable')[:k]
+                best_positions, best_distances = best_positions[keep], best_distances[keep]
+            # anything in the next ring is at least ring * cell_size away
+            if len(best_positions) == k and best_distances[-1] <= ring * self.cell_size:
+                break
+        return self._result(best_positions, best_distances)
+
+    def hotspots(self, block_size=None, top=None):
+        """Incident counts per square block (default: one bucket), busiest first.
+
+        Returns block center Latitude/Longitude and count; with the default block size
+        this only reads bucket sizes, not the points.
+        """
+        if block_size is None or block_size == self.cell_size:
+            keys = np.array(list(self._buckets), dtype=float).reshape(-1, 2)
+            counts = np.array([sum(len(part) for part in parts) for parts in self._buckets.values()], dtype=np.int64)
+            size = self.cell_size
+        else:
+            xs, ys = self._columns()[:2] if self.size else (np.empty(0), np.empty(0))
+            blocks = pd.DataFrame({'bx': np.floor(xs / block_size), 'by': np.floor(ys / block_size)})
+            grouped = blocks.groupby(['bx', 'by']).size()
+            keys = np.array(grouped.index.tolist(), dtype=float).reshape(-1, 2)
+            counts = grouped.to_numpy()
+            size = float(block_size)
+        lat, lon = unproject_coordinates((keys + 0.5) * size / 1000, self.origin)
+        result = pd.DataFrame({'Latitude': lat, 'Longitude': lon, 'count': counts})
+        result = result.sort_values('count', ascending=False, kind='stable', ignore_index=True)
+        return result.head(top) if top is not None else result
@@ -1,9 +1,5 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import seaborn as sns
-from sklearn.cluster import KMeans
 from datetime import datetime, timedelta
 import sys
 import os
@@ -12,7 +8,18 @@ import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import your existing functions from assignment2.py
-from assignment2 import extract_incidents_from_pdf, download_pdf, ensure_geocoding, side_of_town, calculate_time_of_day, create_augmented_dataframe
+from assignment2 import ingest_pdfs, augment_incidents, geocode_address_google, get_geocode_store, get_weather_archive, memory_report, pipeline_counters
+from instrumentation import RunReport
+from augmentation_ledger import AugmentationLedger
+from pdf_cache import ParsedPdfCache
+from downloader import PdfDownloader
+from history_store import IncidentHistoryStore
+from aggregates import IncidentCubes, dataset_version
+from map_data import MAX_MAP_POINTS, map_data, stable_sample
+from clustering import SLIDER_RANGE, ClusteringService
+from search_index import SearchIndex
+from spatial_index import SpatialIndex
+from rollups import IncidentRollups, rolling_stats, spike_scores
 
 # Create a cache directory for temporary files
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache')
@@ -21,6 +28,28 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 # Data directory and file path for persistent storage
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 DATA_FILE = os.path.join(DATA_DIR, 'incident_history.csv')
+# Parquet history, one partition per incident date, replaces the CSV above
+HISTORY_DIR = os.path.join(DATA_DIR, 'incident_history')
+# Enriched columns of every incident augmented so far
+LEDGER_FILE = os.path.join(DATA_DIR, 'augmentation_ledger.sqlite')
+# Hourly/daily counts behind the trend view
+ROLLUP_FILE = os.path.join(DATA_DIR, 'incident_rollups.sqlite')
+
+# Number of processes used to parse PDFs, unset means one per CPU
+INGEST_WORKERS = int(os.environ.get('NORMAN_INGEST_WORKERS', '0')) or None
+
+# Parsed PDFs are kept as Parquet next to the data folder so a known PDF is never parsed twice
+PARSED_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'parsed_cache')
+PARSED_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+@st.cache_resource
+def get_parsed_pdf_cache():
+    return ParsedPdfCache(PARSED_CACHE_DIR, max_bytes=PARSED_CACHE_MAX_BYTES)
+
+@st.cache_resource
+def get_downloader():
+    # remembers ETags and days without a report across reruns
+    return PdfDownloader(CACHE_DIR)
 
 def get_available_pdfs():
     """List all PDF files in the data directory."""
@@ -47,20 +76,39 @@ def get_pdf_for_date(selected_date):
     date_str = selected_date.strftime('%Y-%m-%d')
     return f"{date_str}_daily_incident_summary.pdf"
 
-def load_existing_data():
-    """Load historical data from the CSV file."""
-    if os.path.exists(DATA_FILE):
-        try:
-            return pd.read_csv(DATA_FILE)
-        except Exception as e:
-            st.error(f"Error loading history: {e}")
-            return pd.DataFrame()
-    return pd.DataFrame()
-
-def save_data(df):
-    """Save the dataframe to the persistent CSV file."""
+@st.cache_resource
+def get_augmentation_ledger():
+    return AugmentationLedger(LEDGER_FILE)
+
+@st.cache_resource
+def get_history_store():
+    store = IncidentHistoryStore(HISTORY_DIR)
+    # One-time import of the old CSV history
+    if not store.partitions() and os.path.exists(DATA_FILE):
+        store.append(pd.read_csv(DATA_FILE, dtype=str))
+    return store
+
+@st.cache_resource
+def get_rollups():
+    rollups = IncidentRollups(ROLLUP_FILE)
+    # One-time backfill from the history stored before the rollups existed
+    if not len(rollups) and get_history_store().partitions():
+        rollups.update(get_history_store().read())
+    return rollups
+
+def load_existing_data(start_date=None, end_date=None, natures=None):
+    """Load historical incidents, reading only the partitions between start_date and end_date."""
+    try:
+        return get_history_store().read(start_date, end_date, natures=natures)
+    except Exception as e:
+        st.error(f"Error loading history: {e}")
+        return pd.DataFrame()
+
+def save_data(df, source_dates=()):
+    """Append new incidents to the history store (already stored Incident Numbers are skipped)."""
     try:
-        df.to_csv(DATA_FILE, index=False)
+        get_history_store().append(df, source_dates=source_dates)
+        get_rollups().update(df)
         return True
     except Exception as e:
         st.error(f"Error saving data: {e}")
@@ -69,26 +117,18 @@ def save_data(df):
 # Configure caching for better performance
 @st.cache_data(ttl=3600)  # Cache data for 1 hour
 def fetch_data_from_urls(urls):
-    all_incidents_df = pd.DataFrame()
-
-    for url in urls:
-        try:
-            # Derive a filename from the URL so each day is stored uniquely
-            filename = url.split('/')[-1]
-            local_path = os.path.join(CACHE_DIR, filename)
-            
-            # Only download if we don't already have it
-            if not os.path.exists(local_path):
-                download_pdf(url, save_path=local_path)
-                pdf_path = local_path
-            else:
-                pdf_path = local_path
-
-            incidents_df = extract_incidents_from_pdf(pdf_path)
-            all_incidents_df = pd.concat([all_incidents_df, incidents_df], ignore_index=True)
-        except Exception as e:
-            st.warning(f"Failed to process {url}: {e}")
-
+    pdf_paths = []
+    # Downloads run concurrently; files on disk are only re-fetched when the server
+    # has a newer copy and days known to have no report are skipped
+    for result in get_downloader().fetch_all(urls):
+        if result.path is not None:
+            pdf_paths.append(result.path)
+        elif result.status == 'error':
+            st.warning(f"Failed to process {result.url}: {result.error}")
+
+    all_incidents_df, errors = ingest_pdfs(pdf_paths, max_workers=INGEST_WORKERS, cache=get_parsed_pdf_cache())
+    for pdf_path, error in errors.items():
+        st.warning(f"Failed to process {os.path.basename(pdf_path)}: {error}")
     return all_incidents_df
 
 @st.cache_data(ttl=3600)  # Cache data for 1 hour
@@ -102,37 +142,126 @@ def generate_urls(start_date, end_date):
         current_date += timedelta(days=1)
     return urls
 
-def show_correlation_matrix(df):
+@st.cache_resource(max_entries=4)
+def get_incident_cubes(version, _df):
+    # built once per dataset version, the underscore keeps streamlit from hashing the frame
+    return IncidentCubes(_df, version=version)
+
+@st.cache_resource
+def get_clustering_service():
+    # fitted clusterings outlive reruns, one service for the whole app
+    return ClusteringService()
+
+@st.cache_resource(max_entries=2)
+def get_search_index(version, _df):
+    return SearchIndex(_df)
+
+def get_spatial_index(df):
+    # one index per session, grown with the incidents it hasn't seen yet instead of
+    # rebuilt for every dataset version; a narrower date range starts it over
+    index = st.session_state.get('spatial_index')
+    if index is None or not pd.Series(index.ids).isin(df['Incident Number']).all():
+        index = st.session_state.spatial_index = SpatialIndex()
+    index.add(df, key='Incident Number')
+    return index
+
+@st.cache_data(max_entries=32)
+def get_map_data(version, mode, zoom, _df):
+    return map_data(_df, mode=mode, zoom=zoom)
+
+def show_correlation_matrix(cubes):
     st.subheader("Correlation Matrix 📊")
     st.write("This heatmap shows the correlation between various numerical attributes in the incident data. Darker colors indicate higher correlation.")
-    numeric_df = df.select_dtypes(include=['float64', 'int64'])
-    corr = numeric_df.corr()
+    # matplotlib and seaborn are only used here, load them with the panel
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    corr = cubes.correlation()
     fig, ax = plt.subplots()
     sns.heatmap(corr, ax=ax, annot=True, cmap='coolwarm')
     st.pyplot(fig)
 
-def search_and_highlight(df):
+def search_and_highlight(df, version):
     st.subheader("Search and Highlight 🔍")
-    st.write("Use this tool to search for specific incidents based on a chosen attribute.")
+    st.write("Use this tool to search for specific incidents based on a chosen attribute. Several words must all match; numeric columns also take ranges like >5 or 2..4.")
     columns = df.columns.tolist()
     search_column = st.selectbox("Select column to search within", columns, index=0)
+    match_mode = st.radio("Match", ['Anywhere in the text', 'Start of a word'], horizontal=True)
     search_term = st.text_input("Enter search term")
     if search_term:
-        filtered_df = df[df[search_column].astype(str).str.contains(search_term, case=False, na=False)]
+        # answered from an index built once per dataset version, not a scan of the column
+        index = get_search_index(version, df)
+        rows = index.search(search_term, columns=[search_column],
+                            mode='prefix' if match_mode == 'Start of a word' else 'substring')
+        filtered_df = df.iloc[rows]
         st.write(f"### Search Results for '{search_term}' in column '{search_column}'")
         st.dataframe(filtered_df)
     else:
         st.dataframe(df)
     return search_term
 
-def incident_clustering(df):
+def incidents_near(df):
+    st.subheader("Incidents Near a Location 📍")
+    st.write("Find incidents within a distance of an address (or a \"lat;lon\" point), closest first.")
+    address = st.text_input("Address or coordinates")
+    radius = st.slider("Radius (meters)", 50, 3000, 500, step=50)
+    index = get_spatial_index(df)
+    with st.expander("Busiest blocks"):
+        st.dataframe(index.hotspots(top=10))
+    if not address:
+        return
+    lat, lon = geocode_address_google(address, st.secrets["api"]["key"])
+    if lat is None or lon is None:
+        st.write(f"Could not locate '{address}'.")
+        return
+    # only the grid buckets the circle touches are measured
+    distances = index.within(lat, lon, radius)
+    nearby = df[df['Incident Number'].isin(distances.index)]
+    nearby = nearby.assign(**{'Distance (m)': nearby['Incident Number'].map(distances).round(1)})
+    nearby = nearby.sort_values('Distance (m)', kind='stable')
+    st.write(f"### {len(nearby)} incidents within {radius} m of '{address}'")
+    st.dataframe(nearby)
+    if not nearby.empty:
+        st.map(stable_sample(nearby[['Incident Number', 'Latitude', 'Longitude']], MAX_MAP_POINTS))
+
+def incident_trends(rollups):
+    st.subheader("Incident Trends 📈")
+    st.write("Hourly or daily incident counts over the whole history, with a rolling average and a spike score for the latest period.")
+    dimension = st.selectbox("Break down by", ['Total', 'Nature', 'Side of Town', 'Location Rank'])
+    freq = {'Daily': 'D', 'Hourly': 'h'}[st.radio("Period", ['Daily', 'Hourly'], horizontal=True)]
+    # read from the rolled-up counts, no incidents are scanned here
+    totals = rollups.values(dimension)
+    selected = st.multiselect("Values", totals.index.tolist(), default=totals.index[:3].tolist())
+    window = st.slider("Rolling window (periods)", 2, 60, 7)
+    if not selected:
+        return
+    table = rollups.series(dimension, values=selected, freq=freq)
+    import plotly.express as px
+    if freq == 'h':
+        # a year of hours is too many points to draw, keep the last 90 days
+        table = table.loc[table.index.max() - pd.Timedelta(days=90):]
+    chart = pd.concat({value: rolling_stats(table[value], window)[['count', 'mean']] for value in selected},
+                      names=[dimension]).reset_index()
+    fig = px.line(chart, x='period', y='mean', color=dimension, labels={'mean': f'{window}-period average'})
+    st.plotly_chart(fig)
+    spikes = pd.DataFrame({value: spike_scores(table[value]).iloc[-1] for value in selected}).T
+    st.write(f"Latest period ({table.index.max():%Y-%m-%d %H:%M}), count vs expected:")
+    st.dataframe(spikes.sort_values('score', ascending=False).round(2))
+    with st.expander(f"Biggest {dimension} spikes right now"):
+        st.dataframe(rollups.spikes(dimension, freq=freq).head(10).round(2))
+
+def incident_clustering(df, version):
     st.subheader("Incident Clustering 🗺️")
     st.write("This scatter plot shows the clustering of incidents based on their geographical location. Different colors represent different clusters.")
-    n_clusters = st.slider("Select number of clusters", 2, 10, 3)
-    kmeans = KMeans(n_clusters=n_clusters)
-    df = df.dropna(subset=['Latitude', 'Longitude'])
-    df['Cluster'] = kmeans.fit_predict(df[['Latitude', 'Longitude']])
-    fig = px.scatter_geo(df, lat='Latitude', lon='Longitude', color='Cluster', 
+    import plotly.express as px
+    service = get_clustering_service()
+    # fit the whole slider range in the background so moving the slider is a lookup
+    service.precompute(version, df)
+    n_clusters = st.slider("Select number of clusters", SLIDER_RANGE.start, SLIDER_RANGE.stop - 1, 3)
+    labels = service.labels(version, df, n_clusters)
+    # every incident is clustered but only a stable sample is plotted
+    plot_df = stable_sample(df.loc[labels.notna(), ['Incident Number', 'Latitude', 'Longitude']], MAX_MAP_POINTS)
+    plot_df = plot_df.assign(Cluster=labels[plot_df.index].astype(int))
+    fig = px.scatter_geo(plot_df, lat='Latitude', lon='Longitude', color='Cluster', 
                         title='Incident Clusters',
                         scope='usa',
                         projection='albers usa')
@@ -236,32 +365,48 @@ def main():
             st.sidebar.error("Please select at least one date.")
         else:
             with st.spinner('Processing selected dates...'):
-                combined_df = pd.DataFrame()
-                
+                # timings of this load, shown in the sidebar until the next run
+                run_report = RunReport(pipeline_counters(get_parsed_pdf_cache()))
+                st.session_state.run_report = run_report
+                # Only reports that never made it into the history store get parsed
+                history = get_history_store()
+                pdf_paths = {}
                 for selected_date in selected_dates:
+                    if history.has_source(selected_date):
+                        continue
                     filename = get_pdf_for_date(selected_date)
                     file_path = os.path.join(DATA_DIR, filename)
                     
                     if os.path.exists(file_path):
-                        try:
-                            # Extract data from each selected PDF
-                            incidents_df = extract_incidents_from_pdf(file_path)
-                            combined_df = pd.concat([combined_df, incidents_df], ignore_index=True)
-                        except Exception as e:
-                            st.error(f"Failed to process {filename}: {e}")
+                        pdf_paths[file_path] = selected_date
                     else:
                         st.warning(f"File not found: {filename}")
+
+                if pdf_paths:
+                    # Extract the new PDFs in parallel (cached ones are just read back),
+                    # a bad file only drops that day
+                    with run_report.stage('extract') as record:
+                        new_df, errors = ingest_pdfs(list(pdf_paths), max_workers=INGEST_WORKERS, cache=get_parsed_pdf_cache())
+                        record['rows_in'], record['rows_out'] = len(pdf_paths), len(new_df)
+                    for file_path, error in errors.items():
+                        st.error(f"Failed to process {os.path.basename(file_path)}: {error}")
+                    with run_report.stage('save history', new_df):
+                        save_data(new_df, source_dates=[d for path, d in pdf_paths.items() if path not in errors])
+
+                # Read back just the partitions inside the From/To range
+                with run_report.stage('read history') as record:
+                    combined_df = load_existing_data(selected_dates[0], selected_dates[-1])
+                    record['rows_out'] = len(combined_df)
                 
                 if not combined_df.empty:
-                    # Remove duplicates
-                    combined_df = combined_df.drop_duplicates(subset=['Date/Time', 'Incident Number', 'Location'])
-                    
+                    # Duplicates are already dropped when the history store is written
                     st.session_state.all_incidents_df = combined_df
                     st.success(f"Successfully loaded {len(combined_df)} incidents from {len(selected_dates)} date(s)!")
                     
                     # Reset augmented data since raw data changed
                     if 'augmented_df' in st.session_state:
                         del st.session_state.augmented_df
+                        st.session_state.pop('augmented_version', None)
                 else:
                     st.error('No data found for the selected dates.')
 
@@ -269,6 +414,18 @@ def main():
         st.subheader("Extracted Data 📄")
         st.dataframe(st.session_state.all_incidents_df)
 
+        if 'run_report' in st.session_state:
+            with st.sidebar.expander("Timings ⏱️"):
+                # the last load or augmentation, stage by stage
+                run_report = st.session_state.run_report
+                st.caption(f"Total {run_report.to_dict()['total_seconds']:.2f}s")
+                st.dataframe(run_report.to_frame())
+
+        with st.sidebar.expander("Memory usage 🧠"):
+            # augmented_df is the same frame with more columns, so report the larger one
+            report_df = st.session_state.get('augmented_df', st.session_state.all_incidents_df)
+            st.dataframe(memory_report(report_df))
+
         # Button to augment data
         if st.sidebar.button("Augment Data 🔧"):
             try:
@@ -279,10 +436,24 @@ def main():
                         return
                     
                     # Use cached functions for better performance
-                    all_incidents_df = ensure_geocoding(st.session_state.all_incidents_df, api_key)
-                    all_incidents_df = side_of_town(all_incidents_df)
-                    all_incidents_df = calculate_time_of_day(all_incidents_df)
-                    create_augmented_dataframe(all_incidents_df)
+                    geocode_progress = st.progress(0.0, text="Geocoding new addresses...")
+                    def show_geocode_progress(done, total):
+                        geocode_progress.progress(done / total, text=f"Geocoded {done}/{total} new addresses")
+                    # Incidents augmented in earlier sessions come straight from the ledger
+                    ledger = get_augmentation_ledger()
+                    run_report = RunReport(pipeline_counters())
+                    st.session_state.run_report = run_report
+                    all_incidents_df = augment_incidents(st.session_state.all_incidents_df, api_key, ledger=ledger,
+                                                         progress_callback=show_geocode_progress, report=run_report,
+                                                         weather_archive=get_weather_archive(),
+                                                         ranker=get_history_store().ranker())
+                    geocode_progress.empty()
+                    geocode_stats = get_geocode_store().stats()
+                    st.sidebar.caption(f"Geocoding cache: {geocode_stats['hits']} hits, "
+                                       f"{geocode_stats['negative_hits']} known unknown, "
+                                       f"{geocode_stats['misses']} new lookups")
+                    st.sidebar.caption(f"Augmentation: {ledger.computed} incidents enriched, "
+                                       f"{ledger.reused} reused from earlier sessions")
                     
                     # Validate augmented data
                     required_columns = ['Latitude', 'Longitude', 'Time of Day', 'Day of Week', 'Side of Town', 'WMO Code']
@@ -291,6 +462,9 @@ def main():
                         st.warning(f"Some augmented data is missing: {', '.join(missing_columns)}")
                     
                     st.session_state.augmented_df = all_incidents_df
+                    st.session_state.augmented_version = dataset_version(all_incidents_df)
+                    # Side of Town and Location Rank only exist once augmented
+                    get_rollups().update(all_incidents_df)
                     st.success('Data augmented successfully!')
             except Exception as e:
                 st.error(f"Error during data augmentation: {str(e)}")
@@ -300,15 +474,21 @@ def main():
         st.dataframe(st.session_state.augmented_df)
 
         st.markdown("## Visualizations 📊")
+        # plotting libraries load with the first chart, not with the app
+        import plotly.express as px
+        # charts below read pre-aggregated counts, widget changes don't touch the rows again
+        if 'augmented_version' not in st.session_state:
+            st.session_state.augmented_version = dataset_version(st.session_state.augmented_df)
+        cubes = get_incident_cubes(st.session_state.augmented_version, st.session_state.augmented_df)
         if 'selected_types' not in st.session_state:
             # Select the top 4 most frequent incident types initially
-            initial_types = st.session_state.augmented_df['Nature'].value_counts().head(4).index.tolist()
+            initial_types = cubes.counts('Nature').head(4).index.tolist()
             st.session_state.selected_types = initial_types
 
         # Incident Frequency by Time of Day as a Heatmap
         st.subheader("Incident Frequency by Time of Day 🕒")
         st.write("This heatmap shows the frequency of incidents at different times of the day and days of the week.")
-        time_of_day_heatmap = st.session_state.augmented_df.groupby(['Day of Week', 'Time of Day']).size().unstack().fillna(0)
+        time_of_day_heatmap = cubes.heatmap()
         fig = px.imshow(time_of_day_heatmap, labels={'color':'Incident Count'}, x=time_of_day_heatmap.columns, y=time_of_day_heatmap.index)
         fig.update_layout(title='Incident Frequency by Time of Day', xaxis_title='Hour of the Day', yaxis_title='Day of the Week')
         st.plotly_chart(fig)
@@ -316,13 +496,12 @@ def main():
         # Incident Types and Their Frequencies
         st.subheader("Incident Types and Their Frequencies 📋")
         st.write("This bar chart shows the frequency of different types of incidents.")
-        incident_types = st.session_state.augmented_df['Nature'].unique()
+        incident_types = cubes.counts('Nature').index.tolist()
         selected_types = st.multiselect('Select Incident Types to Display', incident_types, default=st.session_state.selected_types)
         st.session_state.selected_types = selected_types
 
         if selected_types:
-            filtered_df = st.session_state.augmented_df[st.session_state.augmented_df['Nature'].isin(selected_types)]
-            incident_counts = filtered_df['Nature'].value_counts().reset_index()
+            incident_counts = cubes.counts('Nature', selected_types).reset_index()
             incident_counts.columns = ['Nature', 'count']
             fig = px.bar(incident_counts, x='Nature', y='count', labels={'Nature':'Incident Type', 'count':'Number of Incidents'})
             fig.update_layout(title='Incident Types and Their Frequencies', xaxis_title='Incident Type', yaxis_title='Number of Incidents')
@@ -331,16 +510,27 @@ def main():
         # Geographic Distribution of Incidents
         st.subheader("Geographic Distribution of Incidents 🗺️")
         st.write("This map shows the geographic distribution of incidents.")
-        map_df = st.session_state.augmented_df[['Latitude', 'Longitude']].rename(columns={'Latitude': 'latitude', 'Longitude': 'longitude'})
+        # points are binned (or sampled) here so the browser never gets every incident
+        map_mode = st.radio("Map mode", ['Hexagon bins', 'Grid bins', 'Sampled points'], horizontal=True)
+        zoom = st.slider("Map detail (zoom level)", 10, 16, 12)
+        mode = {'Hexagon bins': 'hex', 'Grid bins': 'grid', 'Sampled points': 'points'}[map_mode]
+        map_df = get_map_data(st.session_state.augmented_version, mode, zoom, st.session_state.augmented_df)
         if not map_df.empty:
-            st.map(map_df)
+            if mode == 'points':
+                st.map(map_df)
+                st.caption(f"Showing {len(map_df)} incidents (at most {MAX_MAP_POINTS}).")
+            else:
+                # marker radius in meters grows with the bin count
+                map_df = map_df.assign(size=20 + 200 * (map_df['count'] / map_df['count'].max()) ** 0.5)
+                st.map(map_df, size='size')
+                st.caption(f"{len(map_df)} bins covering {int(map_df['count'].sum())} incidents.")
         else:
             st.write("No geographic data available.")
 
         # Weather Conditions During Incidents
         st.subheader("Weather Conditions During Incidents 🌤️")
         st.write("This pie chart shows the distribution of weather conditions during the incidents.")
-        weather_counts = st.session_state.augmented_df['WMO Code'].value_counts().reset_index()
+        weather_counts = cubes.counts('WMO Code').reset_index()
         weather_counts.columns = ['WMO Code', 'count']
         fig = px.pie(weather_counts, values='count', names='WMO Code', title='Weather Conditions During Incidents')
         st.plotly_chart(fig)
@@ -348,20 +538,28 @@ def main():
         # Side of Town Analysis
         st.subheader("Side of Town Analysis 🏙️")
         st.write("This bar chart shows the number of incidents occurring on different sides of the town.")
-        side_counts = st.session_state.augmented_df['Side of Town'].value_counts().reset_index()
+        side_counts = cubes.counts('Side of Town').reset_index()
         side_counts.columns = ['Side of Town', 'count']
         fig = px.bar(side_counts, x='Side of Town', y='count', labels={'Side of Town':'Side of Town', 'count':'Number of Incidents'})
         fig.update_layout(title='Side of Town Analysis', xaxis_title='Side of Town', yaxis_title='Number of Incidents')
         st.plotly_chart(fig)
 
         # Correlation Matrix
-        show_correlation_matrix(st.session_state.augmented_df)
+        show_correlation_matrix(cubes)
 
         # Search and Highlight
-        search_and_highlight(st.session_state.augmented_df)
+        search_and_highlight(st.session_state.augmented_df, st.session_state.augmented_version)
+
+        # Incidents Near a Location
+        incidents_near(st.session_state.augmented_df)
 
         # Incident Clustering
-        incident_clustering(st.session_state.augmented_df)
+        incident_clustering(st.session_state.augmented_df, st.session_state.augmented_version)
+
+    # Trends cover the whole history, not only the loaded dates
+    rollups = get_rollups()
+    if len(rollups):
+        incident_trends(rollups)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from aggregates import IncidentCubes, dataset_version
+
+
+def sample_frame(rows=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Day of Week': rng.integers(1, 8, rows),
+        'Time of Day': rng.integers(0, 24, rows),
+        'Nature': rng.choice(['Theft', 'Assault', 'Alarm', 'Traffic Stop'], rows),
+        'Side of Town': rng.choice(['N', 'S', 'E', 'W'], rows),
+        'WMO Code': rng.choice([0.0, 1.0, 3.0, 61.0, np.nan], rows),
+        'Latitude': rng.uniform(35.15, 35.25, rows),
+        'Longitude': rng.uniform(-97.5, -97.4, rows),
+    })
+    df.loc[::17, 'Side of Town'] = None
+    return df
+
+
+class TestIncidentCubes(unittest.TestCase):
+    def setUp(self):
+        self.df = sample_frame()
+        self.cubes = IncidentCubes(self.df)
+
+    def test_heatmap_matches_groupby(self):
+        expected = self.df.groupby(['Day of Week', 'Time of Day']).size().unstack().fillna(0)
+        pd.testing.assert_frame_equal(self.cubes.heatmap(), expected, check_dtype=False, check_names=False)
+
+    def test_counts_match_value_counts(self):
+        for column in ('Nature', 'Side of Town', 'WMO Code'):
+            expected = self.df[column].value_counts()
+            actual = self.cubes.counts(column)
+            self.assertEqual(actual.to_dict(), expected.to_dict())
+            self.assertEqual(actual.tolist(), sorted(actual.tolist(), reverse=True))
+        filtered = self.df[self.df['Nature'].isin(['Theft', 'Alarm'])]['Nature'].value_counts()
+        self.assertEqual(self.cubes.counts('Nature', ['Theft', 'Alarm']).to_dict(), filtered.to_dict())
+
+    def test_counts_of_categorical_columns(self):
+        df = self.df.astype({'Nature': 'category', 'Side of Town': 'category', 'Time of Day': 'Int8'})
+        cubes = IncidentCubes(df)
+        self.assertEqual(cubes.counts('Nature').to_dict(), df['Nature'].value_counts().to_dict())
+        self.assertEqual(cubes.heatmap().to_numpy().sum(), len(df))
+
+    def test_correlation_and_version(self):
+        pd.testing.assert_frame_equal(self.cubes.correlation(), self.df.select_dtypes(include='number').corr())
+        self.assertEqual(self.cubes.version, dataset_version(sample_frame()))
+        changed = sample_frame()
+        changed.loc[0, 'Nature'] = 'Fraud'
+        self.assertNotEqual(dataset_version(changed), self.cubes.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
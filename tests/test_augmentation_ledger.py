@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from assignment2 import augment_incidents, extract_incidents_from_pdf
+from augmentation_ledger import ENRICHED_COLUMNS, AugmentationLedger
+from benchmarks.stubs import StubWeatherClient
+from geocoding import GeocodeStore
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, '2025-10-01_daily_incident_summary.pdf')
+
+
+def hour_index_weather():
+    # hour n of a requested range has weather code n
+    return StubWeatherClient(lambda latitude, hours: np.arange(hours))
+
+
+class TestAugmentationLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.ledger = AugmentationLedger(os.path.join(self.tmp, 'ledger.sqlite'))
+        # rows without coordinates would otherwise open the repo's own geocode cache
+        self.store = GeocodeStore(os.path.join(self.tmp, 'geocode.sqlite'))
+
+    def tearDown(self):
+        self.ledger.close()
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def incidents(self):
+        # coordinates are filled in so nothing needs geocoding
+        df = extract_incidents_from_pdf(SAMPLE_PDF).head(40).copy()
+        df['Latitude'] = np.linspace(35.18, 35.24, len(df))
+        df['Longitude'] = np.linspace(-97.48, -97.40, len(df))
+        return df
+
+    def test_second_run_reuses_everything(self):
+        first = augment_incidents(self.incidents(), 'key', ledger=self.ledger, weather_client=hour_index_weather(), geocode_store=self.store)
+        self.assertEqual((self.ledger.computed, self.ledger.reused), (40, 0))
+        self.assertEqual(len(self.ledger), first['Incident Number'].nunique())
+
+        client = hour_index_weather()
+        second = augment_incidents(self.incidents(), 'key', ledger=self.ledger, weather_client=client, geocode_store=self.store)
+        self.assertEqual((self.ledger.computed, self.ledger.reused), (0, 40))
+        self.assertEqual(client.calls, [])
+        pd.testing.assert_frame_equal(second, first)
+
+    def test_only_new_or_changed_rows_are_enriched(self):
+        augment_incidents(self.incidents().head(30), 'key', ledger=self.ledger, weather_client=hour_index_weather(), geocode_store=self.store)
+        df = self.incidents()
+        # an incident whose inputs changed is enriched again
+        df['Location'] = df['Location'].cat.add_categories(['1 MOVED ST'])
+        df.loc[0, 'Location'] = '1 MOVED ST'
+        augment_incidents(df, 'key', ledger=self.ledger, weather_client=hour_index_weather(), geocode_store=self.store)
+        self.assertEqual((self.ledger.computed, self.ledger.reused), (11, 29))
+
+        # the merged result matches a full run for the untouched rows
+        full = augment_incidents(self.incidents(), 'key', weather_client=hour_index_weather(), geocode_store=self.store)
+        pd.testing.assert_frame_equal(df[ENRICHED_COLUMNS].iloc[1:], full[ENRICHED_COLUMNS].iloc[1:])
+
+    def test_rows_without_weather_are_retried(self):
+        df = self.incidents()
+        df.loc[:4, 'Latitude'] = np.nan
+        df.loc[:4, 'Location'] = np.nan
+        augment_incidents(df, 'key', ledger=self.ledger, weather_client=hour_index_weather(), geocode_store=self.store)
+        self.assertEqual(len(self.ledger), 35)
+
+
+if __name__ == '__main__':
+    unittest.main()
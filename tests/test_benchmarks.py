@@ -0,0 +1,61 @@
+import copy
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+
+from assignment2 import INCIDENT_FIELDS, extract_incidents_from_pdf
+from benchmarks.run_benchmarks import STAGES, check_results, run_benchmarks
+from benchmarks.startup import check_startup, measure_startup
+from benchmarks.synthetic_pdfs import generate_reports
+
+
+class TestSyntheticReports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_extractor_reads_back_generated_records(self):
+        reports = generate_reports(self.tmp, 2, start=date(2024, 2, 28), incidents_per_day=60, seed=4)
+        for path, records in reports:
+            df = extract_incidents_from_pdf(path)
+            expected = pd.DataFrame(records, columns=INCIDENT_FIELDS)
+            pd.testing.assert_frame_equal(df[INCIDENT_FIELDS].astype(object), expected.astype(object))
+        self.assertTrue(reports[1][0].endswith('2024-02-29_daily_incident_summary.pdf'))
+        # same seed, same reports
+        again = generate_reports(self.tmp + '/again', 2, start=date(2024, 2, 28), incidents_per_day=60, seed=4)
+        self.assertEqual([records for _, records in again], [records for _, records in reports])
+
+    def test_benchmark_results_and_thresholds(self):
+        results = run_benchmarks(sizes=(1,), incidents_per_day=40, repeat=1, workers=1, work_dir=self.tmp)
+        run = results['runs'][0]
+        self.assertEqual(list(run['stages']), STAGES)
+        self.assertGreater(run['rows'], 0)
+        self.assertEqual(check_results(results, {'max_seconds_per_1k_rows': {'extract': 1e6}}), [])
+        self.assertEqual(len(check_results(results, {'max_seconds_per_1k_rows': {'extract': 0}})), 1)
+        # twice as slow as the baseline is a regression, within tolerance is not
+        slower = copy.deepcopy(results)
+        slower['runs'][0]['stages']['ranks']['seconds'] *= 2
+        self.assertEqual(len(check_results(slower, {}, baseline=results)), 1)
+        self.assertEqual(check_results(results, {}, baseline=results), [])
+
+
+class TestStartup(unittest.TestCase):
+    def test_parsing_import_stays_lazy(self):
+        result = measure_startup('assignment2', repeat=1)
+        # no http clients, ML or plotting libraries just to parse PDFs
+        self.assertEqual(result['loaded'], [])
+        limits = {'startup': {'max_seconds': {'assignment2': 0}, 'lazy_modules': {'assignment2': ['sklearn']}}}
+        self.assertEqual(len(check_startup({'assignment2': result}, limits)), 1)
+        eager = {'assignment2': {'seconds': 0.1, 'loaded': ['sklearn', 'requests']}}
+        self.assertEqual(check_startup(eager, limits), ['assignment2: import took 0.100s > limit 0s',
+                                                        'assignment2: imports sklearn at startup'])
+        self.assertEqual(check_startup({'app': None}, limits), ['app: import failed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from clustering import ClusteringService, project_coordinates, unproject_coordinates
+
+
+def three_blobs(rows_per_blob=300, seed=9):
+    rng = np.random.default_rng(seed)
+    centers = [(35.18, -97.48), (35.24, -97.40), (35.25, -97.47)]
+    lat = np.concatenate([rng.normal(c[0], 0.003, rows_per_blob) for c in centers])
+    lon = np.concatenate([rng.normal(c[1], 0.003, rows_per_blob) for c in centers])
+    df = pd.DataFrame({'Latitude': lat, 'Longitude': lon})
+    df.loc[[5, rows_per_blob + 10], 'Latitude'] = np.nan
+    return df
+
+
+class TestClusteringService(unittest.TestCase):
+    def setUp(self):
+        self.service = ClusteringService()
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_projection_round_trip(self):
+        lat, lon = np.array([35.1, 35.3]), np.array([-97.5, -97.3])
+        xy = project_coordinates(lat, lon)
+        # 0.01 degrees of latitude is about 1.11 km
+        self.assertAlmostEqual(project_coordinates([35.230833], [-97.443611])[0, 1], 1.112, places=2)
+        back_lat, back_lon = unproject_coordinates(xy)
+        np.testing.assert_allclose(back_lat, lat)
+        np.testing.assert_allclose(back_lon, lon)
+
+    def test_labels_are_cached_per_version_and_k(self):
+        df = three_blobs()
+        for future in self.service.precompute('v1', df):
+            future.result()
+        labels = self.service.labels('v1', df, 3)
+        self.assertEqual(labels.isna().sum(), 2)
+        # each blob ends up in a cluster of its own
+        for blob in range(3):
+            self.assertEqual(labels.iloc[blob * 300:(blob + 1) * 300].dropna().nunique(), 1)
+        self.assertEqual(self.service.fits, 9)
+        pd.testing.assert_series_equal(self.service.labels('v1', df, 3), labels)
+        self.assertEqual(self.service.fits, 9)
+        self.assertTrue(self.service.is_ready('v1', 10))
+
+    def test_mini_batch_with_warm_start(self):
+        service = ClusteringService(mini_batch_threshold=100)
+        df = three_blobs()
+        first = service.labels('v1', df, 3)
+        more = pd.concat([df, three_blobs(50, seed=10)], ignore_index=True)
+        second = service.labels('v2', more, 3)
+        self.assertEqual(len(second), len(more))
+        # the old points keep their grouping under the new version
+        self.assertEqual(pd.crosstab(first, second.iloc[:len(df)]).astype(bool).sum().max(), 1)
+        self.assertEqual(len(service.centers('v2', more, 3)), 3)
+        service.shutdown()
+
+    def test_small_fits_ignore_other_versions(self):
+        # a plain fit of the same data gives the same labels whatever was fitted before
+        df = three_blobs()
+        other = three_blobs(seed=4).iloc[::-1].reset_index(drop=True)
+        self.service.labels('other', other, 3)
+        after_other = self.service.labels('v1', df, 3)
+        fresh = ClusteringService()
+        pd.testing.assert_series_equal(fresh.labels('v1', df, 3), after_other)
+        fresh.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
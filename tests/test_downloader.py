@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from downloader import PdfDownloader
+
+PDF_BODY = b'%PDF-1.4 fake report body' * 1000
+ETAG = '"report-v1"'
+
+
+class FakeReportHandler(BaseHTTPRequestHandler):
+    #stands in for normanok.gov: only the 2024-07-0x reports exist, plus any path put in posted
+    protocol_version = 'HTTP/1.1'
+    requests_seen = Counter()
+    posted = set()
+
+    def do_GET(self):
+        self.requests_seen[self.path] += 1
+        if not self.path.startswith('/documents/2024-07-0') and self.path not in self.posted:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(PDF_BODY)))
+        self.end_headers()
+        self.wfile.write(PDF_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPdfDownloader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeReportHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/documents/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeReportHandler.requests_seen.clear()
+        FakeReportHandler.posted.clear()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def url(self, day):
+        return f"{self.base_url}2024-07-{day:02d}_daily_incident_summary.pdf"
+
+    def test_fetch_all_downloads_concurrently_in_order(self):
+        urls = [self.url(day) for day in range(1, 6)]
+        results = PdfDownloader(self.tmp, max_workers=4).fetch_all(urls)
+        self.assertEqual([r.url for r in results], urls)
+        self.assertTrue(all(r.status == 'downloaded' for r in results))
+        with open(results[0].path, 'rb') as f:
+            self.assertEqual(f.read(), PDF_BODY)
+
+    def test_existing_files_are_revalidated(self):
+        PdfDownloader(self.tmp).fetch_all([self.url(1)])
+        # a new downloader picks the ETag back up from its state file
+        result, = PdfDownloader(self.tmp).fetch_all([self.url(1)])
+        self.assertEqual(result.status, 'not_modified')
+        self.assertTrue(os.path.exists(result.path))
+
+    def test_missing_reports_are_not_probed_again(self):
+        missing = self.url(20)
+        first, = PdfDownloader(self.tmp).fetch_all([missing])
+        second, = PdfDownloader(self.tmp).fetch_all([missing])
+        self.assertEqual((first.status, second.status), ('missing', 'missing'))
+        self.assertEqual(FakeReportHandler.requests_seen['/documents/2024-07-20_daily_incident_summary.pdf'], 1)
+
+    def test_missing_ttl_expires(self):
+        missing = self.url(20)
+        PdfDownloader(self.tmp).fetch_all([missing])
+        PdfDownloader(self.tmp, missing_ttl=0).fetch_all([missing])
+        self.assertEqual(FakeReportHandler.requests_seen['/documents/2024-07-20_daily_incident_summary.pdf'], 2)
+
+    def test_todays_report_is_fetched_once_posted(self):
+        today = f"{self.base_url}{date.today().isoformat()}_daily_incident_summary.pdf"
+        first, = PdfDownloader(self.tmp).fetch_all([today])
+        self.assertEqual(first.status, 'missing')
+        FakeReportHandler.posted.add(f"/documents/{date.today().isoformat()}_daily_incident_summary.pdf")
+        second, = PdfDownloader(self.tmp).fetch_all([today])
+        self.assertEqual(second.status, 'downloaded')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from assignment2 import apply_incident_schema
+from export import EXPORT_FORMATS, assignment_columns, export_incidents, export_summary, format_for_path, read_export
+
+
+def augmented(rows=1000, seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Date/Time': '3/1/2024 10:15',
+        'Incident Number': [f'2024-{i:08d}' for i in range(rows)],
+        'Location': rng.choice(['1 MAIN ST', '2 ELM ST'], rows),
+        'Nature': rng.choice(['Theft', 'Alarm', 'Traffic Stop'], rows),
+        'Incident ORI': 'OK0140200',
+        'Day of Week': rng.integers(1, 8, rows),
+        'Time of Day': rng.integers(0, 24, rows),
+        'WMO Code': rng.choice([0.0, 3.0, 61.0], rows),
+        'Location Rank': rng.integers(1, 50, rows),
+        'Side of Town': rng.choice(['N', 'S', 'E', 'W'], rows),
+        'Incident Rank': rng.integers(1, 4, rows),
+        'EMSSTAT': rng.random(rows) < 0.1,
+    })
+    # the last chunk has no weather at all
+    df.loc[900:, 'WMO Code'] = np.nan
+    return apply_incident_schema(df)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = augmented()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_format_round_trips_in_chunks(self):
+        for fmt in EXPORT_FORMATS:
+            path = os.path.join(self.tmp.name, f'out.{fmt}')
+            self.assertEqual(export_incidents(self.df, path, fmt=fmt, chunk_rows=100), len(self.df))
+            back = read_export(path, fmt)
+            self.assertEqual(back.columns.tolist(), self.df.columns.tolist())
+            self.assertEqual(len(back), len(self.df))
+            pd.testing.assert_series_equal(back['WMO Code'].astype(float), self.df['WMO Code'].astype(float),
+                                           check_names=False, check_index=False)
+            self.assertEqual(back['Nature'].astype(str).tolist(), self.df['Nature'].astype(str).tolist())
+        # no temporary files left behind
+        self.assertEqual(len(os.listdir(self.tmp.name)), len(EXPORT_FORMATS))
+
+    def test_assignment_columns_match_ans_csv(self):
+        path = os.path.join(self.tmp.name, 'ans.csv')
+        export_incidents(self.df, path, columns='assignment')
+        with open(path) as file:
+            header = file.readline().rstrip('\n')
+        self.assertEqual(header, 'Day of the Week\tTime of Day\tWeather\tLocation Rank\tSide of Town\t'
+                                 'Incident Rank\tNature\tEMSSTAT')
+        self.assertEqual(format_for_path('ans.csv'), 'tsv')
+        self.assertEqual(format_for_path('out.csv.gz'), 'csv.gz')
+        with self.assertRaises(ValueError):
+            assignment_columns(self.df.drop(columns='EMSSTAT'))
+
+    def test_summary_is_short(self):
+        summary = export_summary(self.df)
+        self.assertIn('1,000 incidents', summary)
+        self.assertIn('WMO Code 100', summary)
+        self.assertLess(len(summary.splitlines()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,9 +9,28 @@ from assignment2 import (
     ensure_geocoding,
     calculate_time_of_day,
     calculate_location_rank,
-    side_of_town
+    side_of_town,
+    extract_incidents_from_pdf,
+    iter_incidents_from_pdf,
+    iter_incident_frames,
+    parse_incident_lines,
+    ingest_pdfs,
+    determine_side_of_town,
+    compass_sector_labels,
+    link_incidents,
+    parse_incident_timestamps,
+    apply_incident_schema,
+    memory_report
 )
+import os
+import tempfile
+import numpy as np
 import pandas as pd
+from geocoding import GeocodeStore
+from benchmarks.stubs import StubWeatherClient
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, '2025-10-01_daily_incident_summary.pdf')
 
 class TestDataAugmentation(unittest.TestCase):
     def setUp(self):
@@ -46,6 +65,46 @@ class TestDataAugmentation(unittest.TestCase):
         #values should be same.
         self.assertEqual(expected_wmo_codes, actual_wmo_codes, "The 'WMO Code' values do not match the expected output.")
 
+    def test_fetch_weather_code_batched(self):
+        # hour n of a requested range has weather code n
+        test_df = pd.DataFrame({
+            'Date/Time': ['4/1/2024 12:00', '4/2/2024 13:00', '4/1/2024 03:00', '4/2/2024 07:00'],
+            'Latitude': [35.199763, 35.199900, 35.181569, None],
+            'Longitude': [-97.444247, -97.444300, -97.492810, -97.4],
+            'Time of Day': [12, 13, 3, 7]
+        })
+        client = StubWeatherClient(lambda latitude, hours: np.arange(hours))
+        fetch_weather_code_for_df(test_df, client=client)
+        # second row is the 13th hour of the second day of its cell's range
+        self.assertEqual(test_df['WMO Code'].tolist()[:3], [12, 37, 3])
+        self.assertTrue(pd.isna(test_df['WMO Code'].iloc[3]))
+        # two cells, two different date ranges -> two requests for four rows
+        self.assertEqual(len(client.calls), 2)
+
+    def test_fetch_weather_code_nothing_geocoded(self):
+        class NoCallsClient:
+            def weather_api(self, url, params):
+                raise AssertionError("no request expected")
+
+        ungeocoded = pd.DataFrame({'Date/Time': ['4/1/2024 12:00', '4/2/2024 13:00'],
+                                   'Latitude': [np.nan, np.nan], 'Longitude': [np.nan, np.nan]})
+        fetch_weather_code_for_df(ungeocoded, client=NoCallsClient())
+        self.assertTrue(ungeocoded['WMO Code'].isna().all())
+        empty = pd.DataFrame({'Date/Time': pd.Series(dtype=str), 'Latitude': pd.Series(dtype=float),
+                              'Longitude': pd.Series(dtype=float)})
+        fetch_weather_code_for_df(empty, client=NoCallsClient())
+        self.assertEqual(len(empty['WMO Code']), 0)
+
+    def test_fetch_weather_code_per_row(self):
+        df = pd.DataFrame({'Date/Time': ['4/1/2024 12:00', 'not a date', '4/2/2024 7:00', '4/2/2024 9:00'],
+                           'Latitude': [35.2, 35.2, 35.3, np.nan], 'Longitude': [-97.4, -97.4, -97.5, np.nan]})
+        client = StubWeatherClient(lambda latitude, hours: np.arange(hours))
+        with self.assertWarns(UserWarning):
+            codes = fetch_weather_code_for_df(df, client=client, batched=False)
+        # the hour of each incident comes from its Timestamp; bad dates and ungeocoded rows aren't looked up
+        np.testing.assert_array_equal(codes.to_numpy(), [12, np.nan, 7, np.nan])
+        self.assertEqual(client.requests_made, 2)
+
     def test_calculate_incident_rank(self):
         #taken another demo datset for this test
         test_df = pd.DataFrame({
@@ -96,5 +155,118 @@ class TestDataAugmentation(unittest.TestCase):
         expected_sides = ['SE', 'E'] # expected answer which should be 
         self.assertListEqual(test_df['Side of Town'].tolist(), expected_sides) # check of the result.
 
+class TestCoIncidents(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Date/Time': ['3/1/2024 00:05', '3/1/2024 00:05', '3/1/2024 00:06', '3/1/2024 00:09', '3/1/2024 00:05'],
+            'Location': ['Location A', 'Location A', 'Location A', 'Location A', 'Location B'],
+            'Incident ORI': ['OK0140200', 'EMSSTAT', '14005', 'OK0140200', 'OK0140200']
+        })
+
+    def test_emsstat_exact_key(self):
+        expected = pd.Series([True, True, False, False, False], name='EMSSTAT')
+        pd.testing.assert_series_equal(calculate_emsstat(self.df), expected)
+
+    def test_emsstat_time_window(self):
+        expected = pd.Series([True, True, True, False, False], name='EMSSTAT')
+        pd.testing.assert_series_equal(calculate_emsstat(self.df, window=pd.Timedelta(minutes=1)), expected)
+
+    def test_link_incidents(self):
+        links = link_incidents(self.df, window=pd.Timedelta(minutes=1))
+        self.assertEqual(links.tolist(), [0, 0, 0, 1, 2])
+
+class TestSideOfTown(unittest.TestCase):
+    def test_matches_scalar_bearing(self):
+        rng = np.random.default_rng(0)
+        test_df = pd.DataFrame({
+            'Latitude': 35.220833 + rng.normal(0, 0.1, 500),
+            'Longitude': -97.443611 + rng.normal(0, 0.1, 500),
+            'Location': 'somewhere'
+        })
+        expected = [determine_side_of_town(lat, lon) for lat, lon in zip(test_df['Latitude'], test_df['Longitude'])]
+        self.assertListEqual(side_of_town(test_df)['Side of Town'].tolist(), expected)
+
+    def test_falls_back_to_location_direction(self):
+        test_df = pd.DataFrame({
+            'Latitude': [None, None, 35.3],
+            'Longitude': [None, None, -97.443611],
+            'Location': ['1580 24TH AVE NW', '1150 ALAMEDA ST', '2741 CLASSEN BLVD']
+        })
+        side_of_town(test_df)
+        self.assertListEqual(test_df['Side of Town'].tolist(), ['NW', 'Could not determine', 'N'])
+
+    def test_configurable_center_and_sectors(self):
+        test_df = pd.DataFrame({'Latitude': [35.0, 35.0], 'Longitude': [-97.5, -97.3]})
+        side_of_town(test_df, center=(35.0, -97.4), sectors=4)
+        self.assertListEqual(test_df['Side of Town'].tolist(), ['W', 'E'])
+        self.assertEqual(len(compass_sector_labels(16)), 16)
+
+class TestIncidentExtraction(unittest.TestCase):
+    def test_parse_incident_lines_ramp(self):
+        #a location that wraps onto a "RAMP" line pushes the nature one line down
+        lines = ['3/1/2024 0:05', '2024-001', 'I35 NB OFF', 'RAMP', 'Traffic Stop', 'OK0140200']
+        record = next(parse_incident_lines(lines))
+        self.assertEqual(record['Nature'], 'Traffic Stop')
+        self.assertEqual(record['Incident ORI'], 'OK0140200')
+
+    def test_streaming_matches_frame(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        records = list(iter_incidents_from_pdf(SAMPLE_PDF))
+        self.assertEqual(len(records), len(df))
+        self.assertEqual(records[0]['Date/Time'], df.loc[0, 'Date/Time'])
+        # footer line must not show up as an incident
+        self.assertNotIn('NORMAN POLICE DEPARTMENT', df['Location'].tolist())
+
+    def test_timestamp_column_parsed_once(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Timestamp']))
+        self.assertEqual(df.loc[0, 'Timestamp'], pd.Timestamp('2025-10-01 00:07'))
+        # time features read the parsed column instead of the strings
+        df['Date/Time'] = None
+        calculate_time_of_day(df)
+        self.assertEqual(df.loc[0, 'Time of Day'], 0)
+
+    def test_compact_schema_kept_through_stages(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        self.assertIsInstance(df['Location'].dtype, pd.CategoricalDtype)
+        df['Latitude'] = 35.2
+        df['Longitude'] = -97.4
+        with tempfile.TemporaryDirectory() as tmp:
+            ensure_geocoding(df, 'key', store=GeocodeStore(os.path.join(tmp, 'geocode.sqlite')))
+        side_of_town(df)
+        calculate_time_of_day(df)
+        calculate_day_of_week(df)
+        calculate_location_rank(df)
+        calculate_incident_rank(df)
+        calculate_emsstat(df)
+        self.assertEqual(str(df['Side of Town'].dtype), 'category')
+        self.assertEqual(str(df['Time of Day'].dtype), 'Int8')
+        self.assertEqual(str(df['Location Rank'].dtype), 'Int32')
+        self.assertEqual(str(df['Latitude'].dtype), 'Float32')
+        report = memory_report(df)
+        self.assertEqual(report.loc['Total', 'bytes'], df.memory_usage(deep=True, index=False).sum())
+
+    def test_bad_timestamps_are_reported(self):
+        with self.assertWarns(UserWarning):
+            parsed = parse_incident_timestamps(pd.Series(['3/1/2024 00:05', '2024-03-01 00:05']))
+        self.assertTrue(pd.isna(parsed[1]))
+
+    def test_iter_incident_frames_chunks(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        chunks = list(iter_incident_frames(SAMPLE_PDF, chunk_size=100))
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        pd.testing.assert_frame_equal(apply_incident_schema(pd.concat(chunks, ignore_index=True)), df)
+
+    def test_ingest_pdfs_orders_by_date_and_isolates_errors(self):
+        paths = [os.path.join(DATA_DIR, f'2025-10-0{day}_daily_incident_summary.pdf') for day in (3, 1, 2)]
+        with tempfile.TemporaryDirectory() as tmp:
+            bad_pdf = os.path.join(tmp, '2025-10-04_daily_incident_summary.pdf')
+            with open(bad_pdf, 'wb') as f:
+                f.write(b'not a pdf')
+            df, errors = ingest_pdfs(paths + [bad_pdf], max_workers=2)
+        expected = apply_incident_schema(pd.concat([extract_incidents_from_pdf(p) for p in sorted(paths)], ignore_index=True))
+        pd.testing.assert_frame_equal(df, expected)
+        self.assertEqual(list(errors), [bad_pdf])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import assignment2
+from assignment2 import ensure_geocoding, geocode_address_google, get_geocode_client
+from geocoding import GeocodeClient, GeocodeStore, TokenBucket
+
+FAKE_GEOCODES = {'A ST': (35.1, -97.1), 'B ST': (35.3, -97.3), 'FLAKY ST': (35.4, -97.4)}
+
+
+class FakeGeocodeHandler(BaseHTTPRequestHandler):
+    #answers like the google geocoding api, FLAKY ST fails with a 500 the first time
+    requests_seen = Counter()
+
+    def do_GET(self):
+        address = parse_qs(urlparse(self.path).query)['address'][0].split(',')[0]
+        self.requests_seen[address] += 1
+        if address == 'FLAKY ST' and self.requests_seen[address] == 1:
+            self.send_response(500)
+            self.end_headers()
+            return
+        if address == 'GARBLED ST':
+            payload = b'<html>gateway error</html>'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if address in FAKE_GEOCODES:
+            lat, lng = FAKE_GEOCODES[address]
+            body = {'status': 'OK', 'results': [{'geometry': {'location': {'lat': lat, 'lng': lng}}}]}
+        else:
+            body = {'status': 'ZERO_RESULTS', 'results': []}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGeocodeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'geocode.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_entries_persist_across_instances(self):
+        store = GeocodeStore(self.path)
+        store.put('1150 ALAMEDA ST', 35.21, -97.43)
+        store.put('<UNKNOWN>', None, None)
+        store.close()
+        reopened = GeocodeStore(self.path)
+        self.assertEqual(reopened.get('1150 ALAMEDA ST'), (35.21, -97.43))
+        self.assertEqual(reopened.get('<UNKNOWN>'), (None, None))
+        self.assertIsNone(reopened.get('2741 CLASSEN BLVD'))
+        self.assertEqual(reopened.stats()['hits'], 1)
+        self.assertEqual(reopened.stats()['negative_hits'], 1)
+        self.assertEqual(reopened.stats()['misses'], 1)
+
+    def test_expired_entries_are_misses(self):
+        store = GeocodeStore(self.path, ttl=0, negative_ttl=0)
+        store.put('1150 ALAMEDA ST', 35.21, -97.43)
+        self.assertIsNone(store.get('1150 ALAMEDA ST'))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_acquire_waits_for_refill(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+        # two tokens up front, then one every half second
+        self.assertAlmostEqual(sum(slept), 1.0)
+
+
+class TestConcurrentGeocoding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGeocodeHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/maps/api/geocode/json"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeGeocodeHandler.requests_seen.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.store = GeocodeStore(os.path.join(self.tmp, 'geocode.sqlite'))
+        self.client = GeocodeClient('key', url=self.url, max_workers=4, rate=1000, backoff=0.01)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_geocode_many_retries_and_reports_progress(self):
+        progress = []
+        results = self.client.geocode_many(['A ST', 'FLAKY ST', 'NOWHERE'],
+                                           progress_callback=lambda done, total: progress.append((done, total)))
+        self.assertEqual(results['FLAKY ST'], (35.4, -97.4, True))
+        self.assertEqual(results['NOWHERE'], (None, None, False))
+        self.assertEqual(FakeGeocodeHandler.requests_seen['FLAKY ST'], 2)
+        self.assertEqual(progress[-1], (3, 3))
+
+    def test_bad_responses_fail_one_address(self):
+        client = GeocodeClient('key', url=self.url, max_workers=2, rate=1000, retries=2, backoff=0.01)
+        results = client.geocode_many(['GARBLED ST', 'A ST'])
+        # retried, then reported as a failed lookup instead of raising out of geocode_many
+        self.assertEqual(results['GARBLED ST'], (None, None, None))
+        self.assertEqual(FakeGeocodeHandler.requests_seen['GARBLED ST'], 3)
+        self.assertEqual(results['A ST'], (35.1, -97.1, True))
+        closed = GeocodeClient('key', url='http://127.0.0.1:1/nothing', retries=0)
+        self.assertEqual(closed.geocode('A ST'), (None, None, None))
+
+    def test_ensure_geocoding_looks_up_each_location_once(self):
+        self.store.put('CACHED ST', 35.0, -97.0)
+        df = pd.DataFrame({'Location': ['A ST', 'B ST', 'A ST', 'CACHED ST', 'NOWHERE', '35.2;-97.4', 'A ST']})
+        ensure_geocoding(df, 'key', store=self.store, client=self.client)
+        self.assertEqual(sum(FakeGeocodeHandler.requests_seen.values()), 3)
+        self.assertEqual(df['Latitude'].tolist()[:4], [35.1, 35.3, 35.1, 35.0])
+        self.assertTrue(pd.isna(df.loc[4, 'Latitude']))
+        self.assertEqual(df.loc[5, 'Longitude'], -97.4)
+        # the next run is all cache, including the address google couldn't find
+        FakeGeocodeHandler.requests_seen.clear()
+        ensure_geocoding(df.drop(columns=['Latitude', 'Longitude']), 'key', store=self.store, client=self.client)
+        self.assertEqual(geocode_address_google('NOWHERE', 'key', store=self.store), (None, None))
+        self.assertEqual(sum(FakeGeocodeHandler.requests_seen.values()), 0)
+
+    def test_clients_are_shared_per_key_and_suffix(self):
+        with patch.dict(assignment2._geocode_clients, clear=True):
+            default = get_geocode_client('key')
+            moore = get_geocode_client('key', 'Moore, OK')
+            self.assertIs(get_geocode_client('key', 'Moore, OK'), moore)
+            self.assertEqual(moore.append_info, 'Moore, OK')
+            # one pool and one rate limit per key, whatever the suffix
+            self.assertIs(moore.session, default.session)
+            self.assertIs(moore.limiter, default.limiter)
+            self.assertIsNot(get_geocode_client('other').limiter, default.limiter)
+
+    def test_cache_is_kept_per_address_suffix(self):
+        self.store.put('A ST', 35.0, -97.0)
+        self.store.put('B ST', None, None)
+        moore = GeocodeClient('key', url=self.url, append_info='Moore, OK', max_workers=1, rate=1000)
+        with patch.dict(assignment2._geocode_clients, {('key', 'Moore, OK'): moore}):
+            # Norman's answers (found or not) aren't reused for Moore, and Moore's don't replace them
+            self.assertEqual(geocode_address_google('A ST', 'key', append_info='Moore, OK', store=self.store), (35.1, -97.1))
+            self.assertEqual(geocode_address_google('B ST', 'key', append_info='Moore, OK', store=self.store), (35.3, -97.3))
+            self.assertEqual(geocode_address_google('A ST', 'key', append_info='Moore, OK', store=self.store), (35.1, -97.1))
+        self.assertEqual(FakeGeocodeHandler.requests_seen['A ST'], 1)
+        self.assertEqual(geocode_address_google('A ST', 'key', store=self.store), (35.0, -97.0))
+        self.assertEqual(geocode_address_google('B ST', 'key', store=self.store), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
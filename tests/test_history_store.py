@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from assignment2 import calculate_location_rank, extract_incidents_from_pdf
+from history_store import IncidentHistoryStore
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+class TestIncidentHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = IncidentHistoryStore(self.tmp)
+        self.days = {day: extract_incidents_from_pdf(os.path.join(DATA_DIR, f'2025-10-0{day}_daily_incident_summary.pdf'))
+                     for day in (1, 2, 3)}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_append_partitions_by_date_and_dedupes(self):
+        written = self.store.append(self.days[1], source_dates=['2025-10-01'])
+        self.assertEqual(written, len(self.days[1]))
+        # the same report again (plus a repeated row) writes nothing new
+        again = pd.concat([self.days[1], self.days[1].head(3)], ignore_index=True)
+        self.assertEqual(self.store.append(again), 0)
+        self.assertEqual(self.store.partitions(), ['2025-10-01'])
+        self.assertTrue(self.store.has_source('2025-10-01'))
+        self.assertFalse(self.store.has_source('2025-10-02'))
+
+    def test_append_leaves_callers_frame_alone(self):
+        df = self.days[1].drop(columns='Timestamp')
+        self.store.append(df)
+        self.assertNotIn('Timestamp', df.columns)
+        self.assertEqual(len(self.store.read()), len(df))
+
+    def test_read_prunes_date_range(self):
+        for day, df in self.days.items():
+            self.store.append(df, source_dates=[f'2025-10-0{day}'])
+        df = self.store.read('2025-10-02', '2025-10-03')
+        self.assertEqual(len(df), len(self.days[2]) + len(self.days[3]))
+        self.assertEqual(df['Timestamp'].min().date().isoformat(), '2025-10-02')
+        self.assertIsInstance(df['Nature'].dtype, pd.CategoricalDtype)
+        self.assertTrue(self.store.read('2026-01-01').empty)
+
+    def test_ranks_follow_appends(self):
+        self.store.append(self.days[1])
+        self.store.append(pd.concat([self.days[1].head(5), self.days[2]], ignore_index=True))
+        history = self.store.read()
+        # only new rows were counted, so the stored ranks equal a recount of the history
+        expected = calculate_location_rank(history.copy())
+        pd.testing.assert_series_equal(self.store.ranker().ranks(history, 'Location').astype('Int32'),
+                                       expected, check_names=False)
+        # a fresh store on the same directory picks the ranks up from disk
+        reopened = IncidentHistoryStore(self.tmp).ranker()
+        self.assertEqual(reopened.rankers['Nature'].counts, self.store.ranker().rankers['Nature'].counts)
+
+    def test_read_filters_nature(self):
+        self.store.append(self.days[1])
+        df = self.store.read(natures=['Traffic Stop', 'Alarm'])
+        expected = self.days[1]['Nature'].isin(['Traffic Stop', 'Alarm']).sum()
+        self.assertEqual(len(df), expected)
+        self.assertEqual(set(df['Nature']), {'Traffic Stop', 'Alarm'})
+
+
+if __name__ == '__main__':
+    unittest.main()
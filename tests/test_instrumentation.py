@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from assignment2 import augment_incidents, extract_incidents_from_pdf, pipeline_counters
+from benchmarks.stubs import StubWeatherClient
+from geocoding import GeocodeStore
+from instrumentation import RunReport, stage
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, '2025-10-01_daily_incident_summary.pdf')
+
+
+class TestRunReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_stages_record_rows_counters_and_hit_rates(self):
+        totals = {'calls': 0, 'cache_hits': 0, 'cache_misses': 0}
+        report = RunReport({name: (lambda name=name: totals[name]) for name in totals})
+        df = pd.DataFrame({'a': range(10)})
+        with report.stage('outer', df):
+            with report.stage('inner') as record:
+                totals['calls'] += 2
+                totals['cache_hits'] += 3
+                totals['cache_misses'] += 1
+                record['rows_out'] = 4
+        inner, outer = report.stages
+        self.assertEqual((inner['stage'], inner['depth'], inner['rows_out']), ('inner', 1, 4))
+        self.assertEqual((inner['calls'], inner['cache_hit_rate']), (2, 0.75))
+        self.assertEqual((outer['rows_in'], outer['rows_out'], outer['calls']), (10, 10, 2))
+        self.assertEqual(report.to_dict()['total_seconds'], outer['seconds'])
+        with report.stage('all misses') as record:
+            totals['cache_misses'] += 5
+        self.assertEqual((record['cache_hits'], record['cache_misses'], record['cache_hit_rate']), (0, 5, 0.0))
+        with report.stage('no lookups') as record:
+            pass
+        self.assertNotIn('cache_hit_rate', record)
+        with stage(None, 'no report') as record:
+            record['rows_out'] = 1
+        self.assertEqual(len(report.to_frame()), 4)
+
+    def test_profile_dumps_and_json(self):
+        report = RunReport(profile_dir=os.path.join(self.tmp, 'profiles'))
+        with report.stage('sort'):
+            with report.stage('nested'):
+                sorted(range(1000), reverse=True)
+        self.assertNotIn('profile', report.stages[0])
+        self.assertTrue(os.path.exists(report.stages[1]['profile']))
+        with open(report.write_json(os.path.join(self.tmp, 'report.json'))) as file:
+            self.assertEqual([record['stage'] for record in json.load(file)['stages']], ['nested', 'sort'])
+
+    def test_augment_incidents_reports_every_stage(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF).head(50).copy()
+        df['Latitude'] = 35.21
+        df['Longitude'] = -97.44
+        counters = pipeline_counters()
+        report = RunReport({'weather_api_calls': counters['weather_api_calls']})
+        store = GeocodeStore(os.path.join(self.tmp, 'geocode.sqlite'))
+        augment_incidents(df, 'key', weather_client=StubWeatherClient(), report=report, geocode_store=store)
+        store.close()
+        frame = report.to_frame()
+        self.assertEqual(frame.index.tolist(),
+                         ['geocoding', 'side of town', 'time features', 'weather', 'ranks', 'emsstat'])
+        self.assertGreaterEqual(frame.loc['weather', 'weather_api_calls'], 1)
+        self.assertTrue((frame['rows_in'] == 50).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
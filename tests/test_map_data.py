@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from map_data import cell_size_for_zoom, grid_bins, hex_bins, map_data, stable_sample
+
+
+def sample_points(rows=5000, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Incident Number': [f'2024-{i:08d}' for i in range(rows)],
+        'Latitude': rng.normal(35.22, 0.02, rows),
+        'Longitude': rng.normal(-97.44, 0.02, rows),
+    })
+
+
+class TestMapData(unittest.TestCase):
+    def test_bins_keep_every_point(self):
+        df = sample_points()
+        df.loc[:9, 'Latitude'] = np.nan
+        for binned in (grid_bins(df, 0.01), hex_bins(df, 0.01)):
+            self.assertEqual(binned['count'].sum(), len(df) - 10)
+            self.assertTrue(binned['latitude'].between(35.0, 35.5).all())
+
+    def test_hex_bins_assign_points_to_nearest_center(self):
+        df = sample_points(500)
+        size = 0.01
+        bins = hex_bins(df, size)
+        scale = np.cos(np.radians(df['Latitude'].mean()))
+        # every point is within one hexagon radius of some bin center
+        dy = df['Latitude'].to_numpy()[:, None] - bins['latitude'].to_numpy()[None, :]
+        dx = (df['Longitude'].to_numpy()[:, None] - bins['longitude'].to_numpy()[None, :]) * scale
+        self.assertTrue((np.hypot(dx, dy).min(axis=1) <= size + 1e-12).all())
+
+    def test_zoom_changes_resolution(self):
+        df = sample_points()
+        self.assertAlmostEqual(cell_size_for_zoom(13), cell_size_for_zoom(12) / 2)
+        self.assertGreater(len(map_data(df, 'grid', zoom=14)), len(map_data(df, 'grid', zoom=11)))
+
+    def test_stable_sample(self):
+        df = sample_points()
+        sample = stable_sample(df, 300)
+        self.assertEqual(len(sample), 300)
+        pd.testing.assert_frame_equal(stable_sample(df.iloc[::-1], 300).sort_index(), sample)
+        # points already sampled stay sampled when a few rows are dropped
+        smaller = stable_sample(df.drop(index=df.index[~df.index.isin(sample.index)][:100]), 300)
+        self.assertTrue(sample.index.isin(smaller.index).all())
+        self.assertEqual(len(map_data(df, 'points', max_points=300)), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from assignment2 import extract_incidents_from_pdf, ingest_pdfs
+from pdf_cache import ParsedPdfCache
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, '2025-10-01_daily_incident_summary.pdf')
+
+
+class TestParsedPdfCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ParsedPdfCache(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_keyed_by_content(self):
+        self.assertIsNone(self.cache.get(SAMPLE_PDF))
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        self.cache.put(SAMPLE_PDF, df)
+        # same bytes under another name is still a hit
+        copy = os.path.join(self.tmp, 'renamed.pdf')
+        shutil.copy(SAMPLE_PDF, copy)
+        pd.testing.assert_frame_equal(self.cache.get(copy), df)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_parser_version_invalidates(self):
+        self.cache.put(SAMPLE_PDF, extract_incidents_from_pdf(SAMPLE_PDF))
+        newer = ParsedPdfCache(self.tmp, parser_version=self.cache.parser_version + 1)
+        self.assertIsNone(newer.get(SAMPLE_PDF))
+
+    def test_eviction_keeps_cache_under_limit(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        self.cache.put(SAMPLE_PDF, df)
+        entry_size = self.cache.size_bytes()
+        # room for either entry but not both
+        self.cache.max_bytes = int(entry_size * 1.5)
+        other = os.path.join(self.tmp, 'other.pdf')
+        shutil.copy(os.path.join(DATA_DIR, '2025-10-02_daily_incident_summary.pdf'), other)
+        self.cache.put(other, extract_incidents_from_pdf(other))
+        self.assertLessEqual(self.cache.size_bytes(), self.cache.max_bytes)
+        self.assertIsNone(self.cache.get(SAMPLE_PDF))
+        self.assertIsNotNone(self.cache.get(other))
+
+    def test_new_entry_survives_eviction(self):
+        df = extract_incidents_from_pdf(SAMPLE_PDF)
+        self.cache.put(SAMPLE_PDF, df)
+        entry_size = self.cache.size_bytes()
+        # an older entry is evicted for the new one, never the new one itself
+        other = os.path.join(self.tmp, 'other.pdf')
+        shutil.copy(os.path.join(DATA_DIR, '2025-10-02_daily_incident_summary.pdf'), other)
+        other_df = extract_incidents_from_pdf(other)
+        self.cache.max_bytes = entry_size * 3
+        self.assertTrue(self.cache.put(other, other_df))
+        self.cache.max_bytes = self.cache.size_bytes() - 1
+        self.cache.put(SAMPLE_PDF, df)
+        self.assertIsNotNone(self.cache.get(SAMPLE_PDF))
+        # an entry bigger than the whole cache isn't stored at all
+        self.cache.max_bytes = 10
+        self.cache.clear()
+        self.assertFalse(self.cache.put(SAMPLE_PDF, df))
+        self.assertEqual(self.cache.size_bytes(), 0)
+
+    def test_ingest_pdfs_uses_cache(self):
+        first, _ = ingest_pdfs([SAMPLE_PDF], cache=self.cache)
+        second, errors = ingest_pdfs([SAMPLE_PDF], cache=self.cache)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(errors, {})
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_ingest_pdfs_missing_file_with_cache(self):
+        missing = os.path.join(self.tmp, '2025-10-03_daily_incident_summary.pdf')
+        df, errors = ingest_pdfs([SAMPLE_PDF, missing], cache=self.cache)
+        self.assertEqual(list(errors), [missing])
+        self.assertIn('FileNotFoundError', errors[missing])
+        self.assertEqual(len(df), len(extract_incidents_from_pdf(SAMPLE_PDF)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from assignment2 import calculate_location_rank
+from ranking import FrequencyRanker, IncidentRanker
+
+
+def day_of_incidents(day, locations, natures):
+    return pd.DataFrame({
+        'Date/Time': [f'3/{day}/2024 10:00'] * len(locations),
+        'Location': locations,
+        'Nature': natures,
+    })
+
+
+class TestIncrementalRanks(unittest.TestCase):
+    def setUp(self):
+        self.days = [
+            day_of_incidents(1, ['A', 'B', 'A'], ['Theft', 'Assault', 'Theft']),
+            day_of_incidents(2, ['C', 'C', 'B'], ['Alarm', 'Alarm', 'Theft']),
+            day_of_incidents(9, ['C', 'D', 'D', 'D'], ['Alarm', 'Theft', 'Theft', 'Alarm']),
+        ]
+
+    def test_appending_batches_matches_full_recount(self):
+        ranker = IncidentRanker()
+        for batch in self.days:
+            ranker.append(batch)
+        history = pd.concat(self.days, ignore_index=True)
+        expected = calculate_location_rank(history.copy())
+        pd.testing.assert_series_equal(ranker.ranks(history, 'Location'), expected, check_names=False)
+
+    def test_ties_share_lowest_rank(self):
+        ranker = FrequencyRanker()
+        ranker.add(['x', 'x', 'y', 'y', 'z'])
+        self.assertEqual([ranker.rank(v) for v in 'xyz'], [1, 1, 3])
+        ranker.add(['z', 'z'])
+        self.assertEqual([ranker.rank(v) for v in 'xyz'], [2, 2, 1])
+
+    def test_window_ranks_only_count_recent_days(self):
+        ranker = IncidentRanker()
+        for batch in self.days:
+            ranker.append(batch)
+        last_week = ranker.window_ranker('Location', days=7)
+        # only 3/9 falls in the 7 days ending 3/9
+        self.assertEqual(last_week.rank('D'), 1)
+        self.assertEqual(last_week.rank('C'), 2)
+        self.assertIsNone(last_week.rank('A'))
+
+    def test_malformed_date_is_left_out_of_windows(self):
+        ranker = IncidentRanker()
+        batch = day_of_incidents(9, ['C', 'D'], ['Alarm', 'Theft'])
+        batch.loc[1, 'Date/Time'] = 'garbled'
+        ranker.append(batch)
+        self.assertEqual(ranker.rankers['Location'].rank('D'), 1)
+        self.assertIsNone(ranker.window_ranker('Location', days=7).rank('D'))
+
+    def test_save_and_load(self):
+        ranker = IncidentRanker()
+        for batch in self.days:
+            ranker.append(batch)
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'ranks.parquet')
+            ranker.save(path)
+            loaded = IncidentRanker.load(path)
+        finally:
+            shutil.rmtree(tmp)
+        history = pd.concat(self.days, ignore_index=True)
+        for column in ('Location', 'Nature'):
+            pd.testing.assert_series_equal(loaded.ranks(history, column), ranker.ranks(history, column))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from rollups import IncidentRollups, rolling_stats, spike_scores
+
+
+def incidents(rows=3000, seed=5):
+    rng = np.random.default_rng(seed)
+    when = pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 60 * 24 * 60, rows), unit='min')
+    return pd.DataFrame({
+        'Date/Time': when.strftime('%-m/%-d/%Y %-H:%M'),
+        'Incident Number': [f'2024-{i:08d}' for i in range(rows)],
+        'Location': rng.choice(['1 MAIN ST', '2 ELM ST', '3 OAK AVE'], rows),
+        'Nature': rng.choice(['Theft', 'Alarm', 'Traffic Stop'], rows),
+        'Incident ORI': 'OK0140200',
+    })
+
+
+class TestIncidentRollups(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rollups = IncidentRollups(os.path.join(self.tmp.name, 'rollups.sqlite'))
+        self.df = incidents()
+        self.when = pd.to_datetime(self.df['Date/Time'], format='%m/%d/%Y %H:%M')
+
+    def tearDown(self):
+        self.rollups.close()
+        self.tmp.cleanup()
+
+    def test_overlapping_batches_count_once(self):
+        # daily reports come in one at a time and the same report can be loaded twice
+        self.rollups.update(self.df.iloc[:2000])
+        added = self.rollups.update(self.df.iloc[1500:])
+        self.assertEqual(added['Nature'], 1000)
+        self.assertEqual(self.rollups.update(self.df), {})
+        self.assertEqual(len(self.rollups), len(self.df))
+
+        daily = self.rollups.series('Nature', freq='D')
+        expected = self.df.groupby([self.when.dt.floor('D'), 'Nature']).size().unstack(fill_value=0)
+        pd.testing.assert_frame_equal(daily.loc[expected.index, expected.columns], expected,
+                                      check_names=False, check_freq=False)
+        hourly = self.rollups.series('Total', freq='h')
+        self.assertEqual(hourly['All'].sum(), len(self.df))
+        np.testing.assert_array_equal(hourly['All'].resample('D').sum().to_numpy(), self.rollups.series()['All'].to_numpy())
+
+    def test_augmented_columns_added_later(self):
+        self.rollups.update(self.df)
+        augmented = self.df.assign(**{'Side of Town': np.where(np.arange(len(self.df)) % 2, 'N', 'S'),
+                                      'Location Rank': np.arange(len(self.df)) % 300 + 1})
+        added = self.rollups.update(augmented)
+        self.assertEqual(set(added), {'Side of Town', 'Location Rank'})
+        self.assertEqual(self.rollups.values('Side of Town').to_dict(), {'N': 1500, 'S': 1500})
+        buckets = self.rollups.values('Location Rank')
+        self.assertEqual(buckets['1-10'], 100)
+        self.assertEqual(buckets.sum(), len(self.df))
+
+    def test_window_filters_and_empty_periods(self):
+        self.rollups.update(self.df)
+        table = self.rollups.series('Nature', values=['Theft', 'Missing'], start='2024-02-25', end='2024-03-05')
+        self.assertEqual(table.columns.tolist(), ['Theft', 'Missing'])
+        self.assertEqual(len(table), 10)
+        self.assertEqual(table.loc[:'2024-02-29'].to_numpy().sum(), 0)
+        self.assertEqual(table['Missing'].sum(), 0)
+
+    def test_rolling_and_spikes(self):
+        counts = pd.Series([10, 12, 9, 11, 10, 40, 10], index=pd.date_range('2024-01-01', periods=7))
+        stats = rolling_stats(counts, 3)
+        pd.testing.assert_series_equal(stats['mean'], counts.rolling(3, min_periods=1).mean(), check_names=False)
+        scores = spike_scores(counts)['score']
+        self.assertEqual(scores.idxmax(), pd.Timestamp('2024-01-06'))
+        self.assertTrue(np.isnan(scores.iloc[0]))
+        self.assertLess(scores.iloc[:5].abs().max(), 2)
+
+        spike = incidents(200, seed=9).assign(**{'Date/Time': '5/1/2024 12:00', 'Nature': 'Alarm'})
+        spike['Incident Number'] = [f'2024-9{i:07d}' for i in range(len(spike))]
+        self.rollups.update(pd.concat([self.df, spike], ignore_index=True))
+        latest = self.rollups.spikes('Nature', at='2024-05-01')
+        self.assertEqual(latest.index[0], 'Alarm')
+        self.assertGreater(latest.loc['Alarm', 'score'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+
+import numpy as np
+
+from assignment2 import extract_incidents_from_pdf, calculate_time_of_day
+from search_index import SearchIndex, query_terms
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+SAMPLE_PDF = os.path.join(DATA_DIR, '2025-10-01_daily_incident_summary.pdf')
+
+
+def contains(df, column, term):
+    # what the dashboard used to do on every keystroke
+    return np.flatnonzero(df[column].astype(str).str.contains(term, case=False, na=False, regex=False).to_numpy())
+
+
+class TestSearchIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = calculate_time_of_day(extract_incidents_from_pdf(SAMPLE_PDF))
+        cls.index = SearchIndex(cls.df)
+
+    def test_substring_matches_str_contains(self):
+        for column, term in [('Location', 'main'), ('Location', 'w '), ('Nature', 'Traffic'),
+                             ('Nature', 'x'), ('Incident ORI', 'ok0'), ('Incident Number', '2025-000'),
+                             ('Time of Day', '1'), ('Location', 'no such place')]:
+            query = f'"{term}"'
+            np.testing.assert_array_equal(self.index.search(query, [column]), contains(self.df, column, term))
+
+    def test_terms_are_and_ed(self):
+        rows = self.index.search('"w main" st', ['Location'])
+        expected = np.intersect1d(contains(self.df, 'Location', 'w main'), contains(self.df, 'Location', 'st'))
+        np.testing.assert_array_equal(rows, expected)
+        # a term may match in any of the searched columns
+        both = self.index.search('traffic main', ['Location', 'Nature'])
+        either = lambda term: np.union1d(contains(self.df, 'Location', term), contains(self.df, 'Nature', term))
+        np.testing.assert_array_equal(both, np.intersect1d(either('traffic'), either('main')))
+        self.assertEqual(query_terms(' A  "b c" '), ['a', 'b c'])
+        # nothing selected to search in, nothing matches
+        self.assertEqual(len(self.index.search('main', [])), 0)
+        self.assertEqual(len(SearchIndex(self.df[[]]).search('main')), 0)
+
+    def test_prefix_and_numeric_ranges(self):
+        rows = self.index.search('ala', ['Nature'], mode='prefix')
+        words = self.df['Nature'].astype(str).str.lower().str.findall(r'\w+')
+        expected = np.flatnonzero(words.map(lambda tokens: any(t.startswith('ala') for t in tokens)).to_numpy())
+        np.testing.assert_array_equal(rows, expected)
+        hours = self.df['Time of Day'].astype(float)
+        np.testing.assert_array_equal(self.index.search('>=20', ['Time of Day']), np.flatnonzero((hours >= 20).to_numpy()))
+        np.testing.assert_array_equal(self.index.search('3..5', ['Time of Day']),
+                                      np.flatnonzero(hours.between(3, 5).to_numpy()))
+        self.assertEqual(len(self.index.search('', ['Nature'])), len(self.df))
+
+
+if __name__ == '__main__':
+    unittest.main()
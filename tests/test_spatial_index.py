@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from spatial_index import SpatialIndex, project_coordinates
+
+
+def incidents(rows=3000, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Incident Number': [f'2024-{i:08d}' for i in range(rows)],
+        'Latitude': rng.normal(35.22, 0.03, rows),
+        'Longitude': rng.normal(-97.44, 0.03, rows),
+        'Timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, rows), unit='min'),
+    })
+    df.loc[df.index[::50], 'Latitude'] = np.nan
+    return df
+
+
+def brute_distances(df, lat, lon):
+    xy = project_coordinates(df['Latitude'], df['Longitude']) * 1000
+    point = project_coordinates([lat], [lon])[0] * 1000
+    return pd.Series(np.hypot(xy[:, 0] - point[0], xy[:, 1] - point[1]), index=df.index).dropna()
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.df = incidents()
+        self.index = SpatialIndex(cell_size=200)
+        # built in two batches, the way history grows; each batch numbered from 0 like a fresh load
+        self.index.add(self.df.iloc[:1000].reset_index(drop=True))
+        self.index.add(self.df.iloc[1000:].reset_index(drop=True))
+
+    def test_within_matches_brute_force(self):
+        expected = brute_distances(self.df, 35.221, -97.445)
+        for radius in (50, 400, 1500, 50000):
+            result = self.index.within(35.221, -97.445, radius)
+            inside = expected[expected <= radius].sort_values(kind='stable')
+            self.assertEqual(set(result.index), set(inside.index))
+            np.testing.assert_allclose(result.to_numpy(), np.sort(inside.to_numpy()))
+        self.assertEqual(len(self.index), self.df['Latitude'].notna().sum())
+
+    def test_key_column_ids_and_readding(self):
+        index = SpatialIndex(cell_size=200)
+        self.assertEqual(index.add(self.df.iloc[:2000], key='Incident Number'), self.df['Latitude'].iloc[:2000].notna().sum())
+        # the overlapping rows are already indexed, only the new ones are added
+        self.assertEqual(index.add(self.df, key='Incident Number'), self.df['Latitude'].iloc[2000:].notna().sum())
+        self.assertEqual(len(index), len(self.index))
+        expected = self.index.within(35.221, -97.445, 800)
+        result = index.within(35.221, -97.445, 800)
+        self.assertEqual(result.index.tolist(), self.df['Incident Number'].iloc[expected.index].tolist())
+        self.assertTrue(pd.Series(index.ids).isin(self.df['Incident Number']).all())
+
+    def test_nearest_prior(self):
+        before = pd.Timestamp('2024-02-01')
+        result = self.index.nearest(35.20, -97.46, k=7, before=before)
+        prior = self.df[self.df['Timestamp'] < before]
+        expected = brute_distances(prior, 35.20, -97.46).sort_values(kind='stable').head(7)
+        self.assertEqual(result.index.tolist(), expected.index.tolist())
+        # a point far outside town still finds its neighbours
+        far = self.index.nearest(36.5, -99.0, k=3)
+        self.assertEqual(far.index.tolist(), brute_distances(self.df, 36.5, -99.0).nsmallest(3).index.tolist())
+
+    def test_hotspots(self):
+        counts = self.index.hotspots()
+        self.assertEqual(counts['count'].sum(), len(self.index))
+        self.assertTrue(counts['count'].is_monotonic_decreasing)
+        blocks = self.index.hotspots(block_size=1000, top=5)
+        self.assertEqual(len(blocks), 5)
+        self.assertGreaterEqual(blocks['count'].iloc[0], counts['count'].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from assignment2 import fetch_weather_code_for_df
+from benchmarks.stubs import StubWeatherClient
+from weather_archive import WeatherArchive, cells_covering
+
+
+def hour_and_row_weather():
+    # the code is the hour of day, plus 24 for every third cell row so cells differ
+    return StubWeatherClient(lambda latitude, hours: np.arange(hours) % 24 + 24 * (round(latitude / 0.05) % 3))
+
+
+def expected_codes(df):
+    return df['Timestamp'].dt.hour + 24 * (np.round(df['Latitude'] / 0.05).astype(int) % 3)
+
+
+class TestWeatherArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.archive = WeatherArchive(os.path.join(self.tmp, 'weather'))
+        rng = np.random.default_rng(2)
+        self.df = pd.DataFrame({
+            'Timestamp': pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 20 * 24 * 60, 300), unit='min'),
+            'Latitude': rng.uniform(35.15, 35.30, 300),
+            'Longitude': rng.uniform(-97.50, -97.35, 300),
+        })
+        self.df['Date/Time'] = self.df['Timestamp'].dt.strftime('%m/%d/%Y %H:%M')
+        self.df.loc[[3, 7], 'Latitude'] = np.nan
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_fill_once_then_join_locally(self):
+        client = hour_and_row_weather()
+        written = self.archive.fill_for(self.df, client)
+        self.assertGreater(written, 0)
+        requests = len(client.calls)
+        # cells with the same missing range share requests
+        self.assertLess(requests, 10)
+        codes = self.archive.lookup(self.df)
+        usable = self.df['Latitude'].notna()
+        self.assertTrue((codes[usable].astype(int) == expected_codes(self.df[usable])).all())
+        self.assertTrue(codes[~usable].isna().all())
+        # everything is stored now, a new archive on the same directory makes no requests
+        self.assertEqual(WeatherArchive(self.archive.root).fill_for(self.df, client), 0)
+        self.assertEqual(len(client.calls), requests)
+
+    def test_bulk_fill_only_fetches_missing_days(self):
+        client = hour_and_row_weather()
+        cells = cells_covering()
+        self.assertIn((704, -1949), cells)
+        self.archive.fill(client, '2024-03-01', '2024-03-10', cells)
+        first = len(client.calls)
+        self.archive.fill(client, '2024-03-05', '2024-03-15', cells)
+        # only 03-11..03-15 were missing, one range for every cell
+        self.assertEqual({(call['start_date'], call['end_date']) for call in client.calls[first:]},
+                         {('2024-03-11', '2024-03-15')})
+        table = self.archive.table()
+        self.assertEqual(len(table), len(cells) * 15 * 24)
+        self.assertEqual(str(table['weather_code'].dtype), 'Int8')
+
+    def test_days_without_codes_are_fetched_again(self):
+        cells = [(704, -1949)]
+        # the archive has nothing for the last days yet, then it does
+        pending = StubWeatherClient(lambda latitude, hours: np.full(hours, np.nan))
+        self.assertEqual(self.archive.fill(pending, '2024-03-01', '2024-03-01', cells), 0)
+        partial = StubWeatherClient(lambda latitude, hours: np.where(np.arange(hours) < 12, 3, np.nan))
+        self.assertEqual(self.archive.fill(partial, '2024-03-01', '2024-03-01', cells), 12)
+        client = StubWeatherClient(lambda latitude, hours: np.full(hours, 61))
+        self.assertEqual(self.archive.fill(client, '2024-03-01', '2024-03-01', cells), 24)
+        self.assertEqual(len(client.calls), 1)
+        incident = pd.DataFrame({'Latitude': [35.2], 'Longitude': [-97.45],
+                                 'Timestamp': [pd.Timestamp('2024-03-01 18:20')]})
+        self.assertEqual(self.archive.lookup(incident).tolist(), [61])
+        self.assertEqual(self.archive.fill(client, '2024-03-01', '2024-03-01', cells), 0)
+
+    def test_fetch_weather_code_for_df_with_archive(self):
+        client = hour_and_row_weather()
+        fetch_weather_code_for_df(self.df, client=client, archive=self.archive)
+        batched = self.df.copy()
+        fetch_weather_code_for_df(batched, client=hour_and_row_weather())
+        pd.testing.assert_series_equal(self.df['WMO Code'], batched['WMO Code'])
+        calls = len(client.calls)
+        fetch_weather_code_for_df(self.df, client=client, archive=self.archive)
+        self.assertEqual(len(client.calls), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
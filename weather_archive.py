@@ -0,0 +1,194 @@
+import argparse
+import os
+import threading
+import uuid
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+WEATHER_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+# lat_min, lat_max, lon_min, lon_max around Norman city limits
+NORMAN_BBOX = (35.10, 35.35, -97.60, -97.20)
+ARCHIVE_SCHEMA = pa.schema([('cell_lat', pa.int32()), ('cell_lon', pa.int32()),
+                            ('hour', pa.timestamp('us')), ('weather_code', pa.int8())])
+
+
+def cell_keys(lat, lon, cell_size):
+    """Grid cell of every coordinate, the same snapping the batched weather lookup uses."""
+    return (np.round(np.asarray(lat, dtype=float) / cell_size).astype(np.int64),
+            np.round(np.asarray(lon, dtype=float) / cell_size).astype(np.int64))
+
+
+def cells_covering(bbox=NORMAN_BBOX, cell_size=0.05):
+    """Every (cell_lat, cell_lon) whose center lies inside bbox."""
+    lat_cells = range(int(np.ceil(bbox[0] / cell_size)), int(np.floor(bbox[1] / cell_size)) + 1)
+    lon_cells = range(int(np.ceil(bbox[2] / cell_size)), int(np.floor(bbox[3] / cell_size)) + 1)
+    return [(cell_lat, cell_lon) for cell_lat in lat_cells for cell_lon in lon_cells]
+
+
+def _day_runs(days, max_span_days):
+    # consecutive missing days become one date range, capped at max_span_days
+    runs = []
+    for day in sorted(days):
+        if runs and (day - runs[-1][1]).days == 1 and (day - runs[-1][0]).days < max_span_days:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+class WeatherArchive:
+    """Local archive of hourly weather codes per grid cell, stored as Parquet.
+
+    fill() downloads whole date ranges for many cells at once (only the (cell, day)
+    pairs not stored yet) and appends them as part files under root/month=YYYY-MM/.
+    lookup() attaches codes to incidents with one merge_asof on (cell, hour), so once a
+    range is filled, augmenting it again needs no network at all.
+    """
+
+    def __init__(self, root, cell_size=0.05, max_locations=50, max_span_days=366):
+        self.root = root
+        self.cell_size = cell_size
+        self.max_locations = max_locations
+        self.max_span_days = max_span_days
+        self.requests_made = 0
+        self._table = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _files(self):
+        return sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(self.root)
+                      for name in names if name.endswith('.parquet'))
+
+    def table(self):
+        """All stored hours as a frame sorted by hour, as merge_asof wants it (cached until the next fill)."""
+        with self._lock:
+            if self._table is None:
+                files = self._files()
+                if files:
+                    table = ds.dataset(files, format='parquet', schema=ARCHIVE_SCHEMA).to_table()
+                    frame = table.to_pandas()
+                    frame['weather_code'] = frame['weather_code'].astype('Int8')
+                else:
+                    frame = pd.DataFrame({'cell_lat': pd.Series(dtype='int32'), 'cell_lon': pd.Series(dtype='int32'),
+                                          'hour': pd.Series(dtype='datetime64[us]'),
+                                          'weather_code': pd.Series(dtype='Int8')})
+                frame = frame.drop_duplicates(['cell_lat', 'cell_lon', 'hour'], keep='last')
+                self._table = frame.sort_values(['hour', 'cell_lat', 'cell_lon'], ignore_index=True)
+            return self._table
+
+    def stored_days(self):
+        """Set of (cell_lat, cell_lon, day) whose 24 hours are all in the archive."""
+        frame = self.table()
+        days = frame['hour'].dt.normalize()
+        # a day the API only had some hours for (the last few days) is fetched again later
+        hours = frame.groupby([frame['cell_lat'], frame['cell_lon'], days.rename('day')]).size()
+        return set(hours[hours == 24].index)
+
+    def missing(self, cells, start, end):
+        """{(cell_lat, cell_lon): [missing days]} for cells over start..end (inclusive)."""
+        stored = self.stored_days()
+        days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D')
+        result = {}
+        for cell in cells:
+            gaps = [day for day in days if (cell[0], cell[1], day) not in stored]
+            if gaps:
+                result[tuple(cell)] = gaps
+        return result
+
+    def _write(self, frame):
+        for month, rows in frame.groupby(frame['hour'].dt.strftime('%Y-%m')):
+            directory = os.path.join(self.root, f"month={month}")
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_pandas(rows.reset_index(drop=True), schema=ARCHIVE_SCHEMA, preserve_index=False)
+            pq.write_table(table, os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet"))
+
+    def fill(self, client, start, end, cells=None):
+        """Download every missing (cell, day) for cells (default: the Norman grid) from start to end.
+
+        Returns the number of hours written.
+        """
+        cells = cells if cells is not None else cells_covering(cell_size=self.cell_size)
+        by_range = {}
+        for cell, days in self.missing(cells, start, end).items():
+            for run in _day_runs(days, self.max_span_days):
+                by_range.setdefault(run, []).append(cell)
+        frames = []
+        for (start_day, end_day), range_cells in by_range.items():
+            for i in range(0, len(range_cells), self.max_locations):
+                batch = range_cells[i:i + self.max_locations]
+                params = {
+                    "latitude": [round(cell[0] * self.cell_size, 6) for cell in batch],
+                    "longitude": [round(cell[1] * self.cell_size, 6) for cell in batch],
+                    "start_date": start_day.date().isoformat(),
+                    "end_date": end_day.date().isoformat(),
+                    "hourly": ["weather_code"]
+                }
+                responses = client.weather_api(WEATHER_ARCHIVE_URL, params=params)
+                self.requests_made += 1
+                hours = pd.date_range(start_day, end_day + pd.Timedelta(hours=23), freq='h')
+                for cell, response in zip(batch, responses or []):
+                    values = np.asarray(response.Hourly().Variables(0).ValuesAsNumpy(), dtype=float)[:len(hours)]
+                    codes = pd.array(values, dtype='Float64').astype('Int8')
+                    frames.append(pd.DataFrame({'cell_lat': np.int32(cell[0]), 'cell_lon': np.int32(cell[1]),
+                                                'hour': hours[:len(values)].astype('datetime64[us]'),
+                                                'weather_code': codes}))
+        if not frames:
+            return 0
+        written = pd.concat(frames, ignore_index=True)
+        # hours the archive has no code for yet aren't stored, so their days stay missing
+        written = written[written['weather_code'].notna()]
+        if written.empty:
+            return 0
+        self._write(written)
+        with self._lock:
+            self._table = None
+        return len(written)
+
+    def fill_for(self, df, client):
+        """Fill the cells the incidents in df fall in, from their first to their last day.
+
+        df needs Latitude, Longitude and the parsed Timestamp column.
+        """
+        lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+        when = pd.to_datetime(df['Timestamp'])
+        usable = ~(np.isnan(lat) | np.isnan(lon)) & when.notna().to_numpy()
+        if not usable.any():
+            return 0
+        cell_lat, cell_lon = cell_keys(lat[usable], lon[usable], self.cell_size)
+        cells = sorted(set(zip(cell_lat.tolist(), cell_lon.tolist())))
+        return self.fill(client, when[usable].min(), when[usable].max(), cells)
+
+    def lookup(self, df):
+        """Weather code at each incident's cell and hour (<NA> when not archived), indexed like df."""
+        lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+        when = pd.to_datetime(df['Timestamp']).to_numpy().astype('datetime64[us]')
+        usable = ~(np.isnan(lat) | np.isnan(lon) | np.isnat(when))
+        cell_lat, cell_lon = cell_keys(lat[usable], lon[usable], self.cell_size)
+        incidents = pd.DataFrame({'cell_lat': cell_lat.astype(np.int32), 'cell_lon': cell_lon.astype(np.int32),
+                                  'hour': when[usable], 'row': np.flatnonzero(usable)}).sort_values('hour')
+        archive = self.table()
+        # each incident takes the code of the hour it happened in (e.g. 14:35 -> 14:00)
+        joined = pd.merge_asof(incidents, archive, on='hour', by=['cell_lat', 'cell_lon'],
+                               direction='backward', tolerance=pd.Timedelta(minutes=59, seconds=59))
+        codes = pd.array(np.full(len(df), np.nan), dtype='Float64')
+        codes[joined['row'].to_numpy()] = joined['weather_code'].astype('Float64').to_numpy()
+        return pd.Series(codes, index=df.index, name='WMO Code')
+
+
+if __name__ == "__main__":
+    from assignment2 import get_weather_archive, get_weather_client
+
+    parser = argparse.ArgumentParser(description="Bulk-fill the local hourly weather archive for the Norman grid.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+    archive = get_weather_archive()
+    hours = archive.fill(get_weather_client(), args.start, args.end)
+    print(f"Stored {hours} cell-hours in {archive.requests_made} requests under {archive.root}")